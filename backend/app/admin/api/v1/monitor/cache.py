@@ -0,0 +1,18 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Query
+
+from backend.app.admin.schema.monitor import CacheMonitorInfo
+from backend.common.cache.local import local_cache_manager
+from backend.common.response.response_schema import ResponseSchemaModel, response_base
+from backend.common.security.jwt import DependsSuperUser
+
+router = APIRouter()
+
+
+@router.get('', summary='本地缓存监控', dependencies=[DependsSuperUser])
+async def get_cache_info(
+    top: Annotated[int, Query(ge=1, le=100, description='热点键数量')] = 20,
+) -> ResponseSchemaModel[CacheMonitorInfo]:
+    data = CacheMonitorInfo(**local_cache_manager.get_stats(top))
+    return response_base.success(data=data)
@@ -23,8 +23,11 @@ router = APIRouter()
 
 
 @router.get('/me', summary='获取当前用户信息', dependencies=[DependsJwtAuth])
-async def get_current_user(request: Request) -> ResponseSchemaModel[GetCurrentUserInfoWithRelationDetail]:
-    data = request.user.model_dump()
+async def get_current_user(
+    db: CurrentSession, request: Request
+) -> ResponseSchemaModel[GetCurrentUserInfoWithRelationDetail]:
+    user = await user_service.get_userinfo(db=db, pk=request.user.id)
+    data = GetUserInfoWithRelationDetail.model_validate(user).model_dump()
     return response_base.success(data=data)
 
 
@@ -127,7 +127,7 @@ class CRUDUser(CRUDPlus[User]):
         :return:
         """
         salt = bcrypt.gensalt()
-        obj.password = get_hash_password(obj.password, salt)
+        obj.password = await get_hash_password(obj.password, salt)
 
         dict_obj = obj.model_dump(exclude={'roles'})
         dict_obj.update({'salt': salt})
@@ -258,7 +258,7 @@ class CRUDUser(CRUDPlus[User]):
         :return:
         """
         salt = bcrypt.gensalt()
-        new_pwd = get_hash_password(password, salt)
+        new_pwd = await get_hash_password(password, salt)
         return await self.update_model(db, pk, {'password': new_pwd, 'salt': salt}, flush=True)
 
     async def set_super(self, db: AsyncSession, user_id: int, *, is_super: bool) -> int:
@@ -375,5 +375,80 @@ class CRUDUser(CRUDPlus[User]):
             ],
         )
 
+    async def get_join_role(self, db: AsyncSession, user_id: int) -> Any | None:
+        """
+        获取用户部门和角色关联信息，不包含角色的菜单和数据范围
+
+        :param db: 数据库会话
+        :param user_id: 用户 ID
+        :return:
+        """
+        result = await self.select_models(
+            db,
+            id=user_id,
+            join_conditions=[
+                JoinConfig(model=Dept, join_on=Dept.id == self.model.dept_id, fill_result=True),
+                JoinConfig(model=user_role, join_on=user_role.c.user_id == self.model.id),
+                JoinConfig(model=Role, join_on=Role.id == user_role.c.role_id, fill_result=True),
+            ],
+        )
+
+        return select_join_serialize(result, relationships=['User-m2o-Dept', 'User-m2m-Role'])
+
+    @staticmethod
+    async def get_menus(db: AsyncSession, user_id: int) -> Sequence[Menu]:
+        """
+        获取用户已启用角色的菜单
+
+        :param db: 数据库会话
+        :param user_id: 用户 ID
+        :return:
+        """
+        stmt = (
+            select(Menu)
+            .join(role_menu, Menu.id == role_menu.c.menu_id)
+            .join(Role, Role.id == role_menu.c.role_id)
+            .join(user_role, user_role.c.role_id == Role.id)
+            .where(user_role.c.user_id == user_id, Role.status == StatusType.enable)
+            .distinct()
+        )
+        result = await db.execute(stmt)
+        return result.scalars().all()
+
+    @staticmethod
+    async def get_data_rules(db: AsyncSession, user_id: int) -> tuple[bool, Sequence[DataRule]]:
+        """
+        获取用户已启用角色及数据范围的数据规则
+
+        :param db: 数据库会话
+        :param user_id: 用户 ID
+        :return: (是否过滤数据权限, 数据规则列表)，任一已启用角色未启用数据权限过滤时不过滤
+        """
+        role_stmt = (
+            select(Role.is_filter_scopes)
+            .join(user_role, user_role.c.role_id == Role.id)
+            .where(user_role.c.user_id == user_id, Role.status == StatusType.enable)
+        )
+        role_result = await db.execute(role_stmt)
+        if not all(role_result.scalars().all()):
+            return False, []
+
+        rule_stmt = (
+            select(DataRule)
+            .join(data_scope_rule, data_scope_rule.c.data_rule_id == DataRule.id)
+            .join(DataScope, DataScope.id == data_scope_rule.c.data_scope_id)
+            .join(role_data_scope, role_data_scope.c.data_scope_id == DataScope.id)
+            .join(Role, Role.id == role_data_scope.c.role_id)
+            .join(user_role, user_role.c.role_id == Role.id)
+            .where(
+                user_role.c.user_id == user_id,
+                Role.status == StatusType.enable,
+                DataScope.status == StatusType.enable,
+            )
+            .distinct()
+        )
+        rule_result = await db.execute(rule_stmt)
+        return True, rule_result.scalars().all()
+
 
 user_dao: CRUDUser = CRUDUser(User)
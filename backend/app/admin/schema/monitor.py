@@ -100,3 +100,32 @@ class RedisMonitorInfo(SchemaBase):
 
     info: RedisServerInfo = Field(description='服务器信息')
     stats: list[RedisCommandStat] = Field(description='命令统计')
+
+
+class CacheNamespaceInfo(SchemaBase):
+    """缓存命名空间信息"""
+
+    name: str = Field(description='缓存名称')
+    keys: int = Field(description='本地缓存键数量')
+    hits: int = Field(description='本地缓存命中次数')
+    memory: int = Field(description='本地缓存估算内存（bytes）')
+    quota: int | None = Field(None, description='本地缓存内存配额（bytes）')
+
+
+class CacheKeyInfo(SchemaBase):
+    """缓存键信息"""
+
+    key: str = Field(description='缓存键')
+    hits: int = Field(description='命中次数')
+    size: int = Field(description='估算大小（bytes）')
+
+
+class CacheMonitorInfo(SchemaBase):
+    """缓存监控信息"""
+
+    size: int = Field(description='本地缓存键总数')
+    maxsize: int = Field(description='本地缓存最大容量')
+    memory: int = Field(description='本地缓存估算内存（bytes）')
+    max_memory: int = Field(description='本地缓存内存上限（bytes），0 表示不限制')
+    namespaces: list[CacheNamespaceInfo] = Field(description='命名空间统计')
+    top_keys: list[CacheKeyInfo] = Field(description='热点键')
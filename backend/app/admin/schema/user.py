@@ -100,6 +100,21 @@ class GetUserInfoWithRelationDetail(GetUserInfoDetail):
     roles: list[GetRoleWithRelationDetail] = Field(description='角色列表')
 
 
+class GetUserPrincipalDetail(SchemaBase):
+    """用户认证主体"""
+
+    id: int = Field(description='用户 ID')
+    uuid: str = Field(description='用户 UUID')
+    username: str = Field(description='用户名')
+    nickname: str = Field(description='昵称')
+    dept_id: int | None = Field(None, description='部门 ID')
+    status: StatusType = Field(description='状态')
+    is_superuser: bool = Field(description='是否超级管理员')
+    is_staff: bool = Field(description='是否管理员')
+    is_multi_login: bool = Field(description='是否允许多端登录')
+    role_ids: list[int] = Field([], description='已启用的角色 ID 列表')
+
+
 class GetCurrentUserInfoWithRelationDetail(GetUserInfoWithRelationDetail):
     """当前用户信息关联详情"""
 
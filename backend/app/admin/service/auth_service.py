@@ -10,6 +10,7 @@ from backend.app.admin.schema.token import GetLoginToken, GetNewToken
 from backend.app.admin.schema.user import AuthLoginParam
 from backend.app.admin.service.login_log_service import login_log_service
 from backend.app.admin.service.user_password_history_service import password_security_service
+from backend.app.admin.utils.cache import user_cache_manager
 from backend.app.admin.utils.password_security import password_verify
 from backend.common.context import ctx
 from backend.common.enums import LoginLogStatusType, StatusType
@@ -22,7 +23,9 @@ from backend.common.security.jwt import (
     create_new_token,
     create_refresh_token,
     get_token,
+    get_user_sessions,
     jwt_decode,
+    revoke_token,
 )
 from backend.core.conf import settings
 from backend.database.db import uuid4_str
@@ -50,7 +53,7 @@ class AuthService:
 
         await password_security_service.check_status(user.id, user.status)
 
-        if user.password is None or not password_verify(password, user.password):
+        if user.password is None or not await password_verify(password, user.password):
             await password_security_service.handle_login_failure(db, user.id)
             raise errors.AuthorizationError(msg='用户名或密码有误')
 
@@ -189,12 +192,8 @@ class AuthService:
                 if menu.status == StatusType.enable and menu.perms:
                     codes.update(menu.perms.split(','))
         else:
-            roles = [role for role in request.user.roles if role.status == StatusType.enable]
-            if roles:
-                for role in roles:
-                    for menu in role.menus:
-                        if menu.status == StatusType.enable and menu.perms:
-                            codes.update(menu.perms.split(','))
+            user_menus = await user_cache_manager.get_menus(user_id=request.user.id)
+            codes.update(user_menus.perms)
 
         return list(codes)
 
@@ -218,11 +217,15 @@ class AuthService:
             raise errors.NotFoundError(msg='用户不存在')
         if not user.status:
             raise errors.AuthorizationError(msg='用户已被锁定, 请联系统管理员')
-        token_keys = await redis_client.get_prefix(f'{settings.TOKEN_REDIS_PREFIX}:{user.id}:*')
-        if not user.is_multi_login and [
-            key for key in token_keys if not key.endswith(f':{token_payload.session_uuid}')
-        ]:
-            raise errors.ForbiddenError(msg='此用户已在异地登录，请重新登录并及时修改密码')
+        if not user.is_multi_login:
+            session_uuids = await get_user_sessions(user.id)
+            token_keys = [
+                f'{settings.TOKEN_REDIS_PREFIX}:{user.id}:{session_uuid}'
+                for session_uuid in session_uuids
+                if session_uuid != token_payload.session_uuid
+            ]
+            if token_keys and await redis_client.exists(*token_keys):
+                raise errors.ForbiddenError(msg='此用户已在异地登录，请重新登录并及时修改密码')
         new_token = await create_new_token(
             refresh_token,
             token_payload.session_uuid,
@@ -265,16 +268,14 @@ class AuthService:
             token_payload = jwt_decode(token)
             user_id = token_payload.user_id
             session_uuid = token_payload.session_uuid
+            username = getattr(request.user, 'username', None)
             refresh_token = request.cookies.get(settings.COOKIE_REFRESH_TOKEN_KEY)
         except errors.TokenError:
             return
         finally:
             response.delete_cookie(settings.COOKIE_REFRESH_TOKEN_KEY)
 
-        await redis_client.delete(f'{settings.TOKEN_REDIS_PREFIX}:{user_id}:{session_uuid}')
-        await redis_client.delete(f'{settings.TOKEN_EXTRA_INFO_REDIS_PREFIX}:{user_id}:{session_uuid}')
-        if refresh_token:
-            await redis_client.delete(f'{settings.TOKEN_REFRESH_REDIS_PREFIX}:{user_id}:{session_uuid}')
+        await revoke_token(user_id, session_uuid, username=username, refresh=bool(refresh_token))
 
 
 auth_service: AuthService = AuthService()
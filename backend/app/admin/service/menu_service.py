@@ -7,7 +7,6 @@ from backend.app.admin.crud.crud_menu import menu_dao
 from backend.app.admin.model import Menu
 from backend.app.admin.schema.menu import CreateMenuParam, UpdateMenuParam
 from backend.app.admin.utils.cache import user_cache_manager
-from backend.common.enums import StatusType
 from backend.common.exception import errors
 from backend.utils.build_tree import get_tree_data, get_vben5_tree_data
 
@@ -58,12 +57,9 @@ class MenuService:
         if request.user.is_superuser:
             menu_data = await menu_dao.get_sidebar(db, None)
         else:
-            roles = [role for role in request.user.roles if role.status == StatusType.enable]
-            menu_ids = set()
-            if roles:
-                for role in roles:
-                    menu_ids.update(menu.id for menu in role.menus)
-                menu_data = await menu_dao.get_sidebar(db, list(menu_ids))
+            user_menus = await user_cache_manager.get_menus(user_id=request.user.id)
+            if user_menus.menu_ids:
+                menu_data = await menu_dao.get_sidebar(db, user_menus.menu_ids)
 
         if menu_data:
             return get_vben5_tree_data(menu_data)
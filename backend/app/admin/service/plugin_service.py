@@ -12,7 +12,7 @@ from backend.common.enums import PluginType, StatusType
 from backend.common.exception import errors
 from backend.core.conf import settings
 from backend.core.path_conf import PLUGIN_DIR
-from backend.database.redis import redis_client
+from backend.database.redis import redis_background_client, redis_client
 from backend.plugin.core import get_required_plugins
 from backend.plugin.installer import install_git_plugin, install_zip_plugin, remove_plugin, zip_plugin
 from backend.plugin.requirements import uninstall_requirements_async
@@ -27,7 +27,11 @@ class PluginService:
         """获取所有插件"""
 
         changed_key = f'{settings.PLUGIN_REDIS_PREFIX}:changed'
-        keys = [key for key in await redis_client.get_prefix(f'{settings.PLUGIN_REDIS_PREFIX}:') if key != changed_key]
+        keys = [
+            key
+            for key in await redis_background_client.get_prefix(f'{settings.PLUGIN_REDIS_PREFIX}:')
+            if key != changed_key
+        ]
         if not keys:
             return []
 
@@ -37,8 +37,10 @@ class UserPasswordHistoryService:
                 remaining_minutes = math.ceil((locked_until - now).total_seconds() / 60)
                 raise errors.AuthorizationError(msg=f'账号已被锁定，请在 {remaining_minutes} 分钟后重试')
 
-            await redis_client.delete(f'{settings.USER_LOCK_REDIS_PREFIX}:{user_id}')
-            await redis_client.delete(f'{settings.LOGIN_FAILURE_PREFIX}:{user_id}')
+            await redis_client.delete(
+                f'{settings.USER_LOCK_REDIS_PREFIX}:{user_id}',
+                f'{settings.LOGIN_FAILURE_PREFIX}:{user_id}',
+            )
 
     @staticmethod
     async def handle_login_failure(db: AsyncSession, user_id: int) -> None:
@@ -57,19 +59,22 @@ class UserPasswordHistoryService:
         failure_count = await redis_client.get(f'{settings.LOGIN_FAILURE_PREFIX}:{user_id}')
         failure_count = int(failure_count) if failure_count else 0
         failure_count += 1
-        await redis_client.setex(
-            f'{settings.LOGIN_FAILURE_PREFIX}:{user_id}',
-            settings.USER_LOCK_SECONDS,
-            str(failure_count),
-        )
-
-        if failure_count >= settings.USER_LOCK_THRESHOLD:
-            locked_until = timezone.now() + timedelta(seconds=settings.USER_LOCK_SECONDS)
-            await redis_client.setex(
-                f'{settings.USER_LOCK_REDIS_PREFIX}:{user_id}',
+        locked = failure_count >= settings.USER_LOCK_THRESHOLD
+        async with redis_client.batch() as pipe:
+            pipe.setex(
+                f'{settings.LOGIN_FAILURE_PREFIX}:{user_id}',
                 settings.USER_LOCK_SECONDS,
-                timezone.to_str(locked_until),
+                str(failure_count),
             )
+            if locked:
+                locked_until = timezone.now() + timedelta(seconds=settings.USER_LOCK_SECONDS)
+                pipe.setex(
+                    f'{settings.USER_LOCK_REDIS_PREFIX}:{user_id}',
+                    settings.USER_LOCK_SECONDS,
+                    timezone.to_str(locked_until),
+                )
+
+        if locked:
             raise errors.AuthorizationError(msg='登录失败次数过多，账号已被锁定')
 
     @staticmethod
@@ -108,8 +113,10 @@ class UserPasswordHistoryService:
         :param user_id: 用户 ID
         :return:
         """
-        await redis_client.delete(f'{settings.USER_LOCK_REDIS_PREFIX}:{user_id}')
-        await redis_client.delete(f'{settings.LOGIN_FAILURE_PREFIX}:{user_id}')
+        await redis_client.delete(
+            f'{settings.USER_LOCK_REDIS_PREFIX}:{user_id}',
+            f'{settings.LOGIN_FAILURE_PREFIX}:{user_id}',
+        )
 
     @staticmethod
     async def save_password_history(db: AsyncSession, obj: CreateUserPasswordHistoryParam) -> None:
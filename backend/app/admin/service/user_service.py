@@ -15,13 +15,14 @@ from backend.app.admin.schema.user import (
 )
 from backend.app.admin.schema.user_password_history import CreateUserPasswordHistoryParam
 from backend.app.admin.service.user_password_history_service import password_security_service
+from backend.app.admin.utils.cache import user_cache_manager
 from backend.app.admin.utils.password_security import password_verify, validate_new_password
 from backend.common.context import ctx
 from backend.common.enums import UserPermissionType
 from backend.common.exception import errors
 from backend.common.pagination import paging_data
 from backend.common.response.response_code import CustomErrorCode
-from backend.common.security.jwt import get_token, jwt_decode
+from backend.common.security.jwt import get_token, jwt_decode, revoke_user_sessions
 from backend.core.conf import settings
 from backend.database.redis import redis_client
 from backend.utils.serializers import select_join_serialize
@@ -123,7 +124,7 @@ class UserService:
             if {role.id for role in roles} != set(obj.roles):
                 raise errors.NotFoundError(msg='角色不存在')
         count = await user_dao.update(db, user.id, obj)
-        await redis_client.delete(f'{settings.JWT_USER_REDIS_PREFIX}:{user.id}')
+        await user_cache_manager.clear([user.id])
         return count
 
     @staticmethod
@@ -171,20 +172,17 @@ class UserService:
                 if pk == user.id:
                     # 系统管理员修改自身时，除当前 token 外，其他 token 失效
                     if not new_multi_login:
-                        key_prefix = f'{settings.TOKEN_REDIS_PREFIX}:{user.id}'
-                        await redis_client.delete_prefix(
-                            key_prefix,
-                            exclude=f'{key_prefix}:{token_payload.session_uuid}',
+                        await revoke_user_sessions(
+                            user.id, username=user.username, exclude=token_payload.session_uuid, refresh=False
                         )
                 else:
                     # 系统管理员修改他人时，他人 token 全部失效
                     if not new_multi_login:
-                        key_prefix = f'{settings.TOKEN_REDIS_PREFIX}:{user.id}'
-                        await redis_client.delete_prefix(key_prefix)
+                        await revoke_user_sessions(user.id, username=user.username, refresh=False)
             case _:
                 raise errors.RequestError(msg='权限类型不存在')
 
-        await redis_client.delete(f'{settings.JWT_USER_REDIS_PREFIX}:{user.id}')
+        await user_cache_manager.clear([user.id])
         return count
 
     @staticmethod
@@ -207,9 +205,8 @@ class UserService:
         history_obj = CreateUserPasswordHistoryParam(user_id=user.id, password=user.password)
         await password_security_service.save_password_history(db, history_obj)
         await user_dao.update_password_changed_time(db, user.id)
-        await redis_client.delete_prefix(f'{settings.TOKEN_REDIS_PREFIX}:{user.id}')
-        await redis_client.delete_prefix(f'{settings.TOKEN_REFRESH_REDIS_PREFIX}:{user.id}')
-        await redis_client.delete_prefix(f'{settings.JWT_USER_REDIS_PREFIX}:{user.id}')
+        await revoke_user_sessions(user.id, username=user.username)
+        await user_cache_manager.clear([user.id])
         return count
 
     @staticmethod
@@ -223,7 +220,7 @@ class UserService:
         :return:
         """
         count = await user_dao.update_nickname(db, user_id, nickname)
-        await redis_client.delete(f'{settings.JWT_USER_REDIS_PREFIX}:{user_id}')
+        await user_cache_manager.clear([user_id])
         return count
 
     @staticmethod
@@ -237,7 +234,7 @@ class UserService:
         :return:
         """
         count = await user_dao.update_avatar(db, user_id, avatar)
-        await redis_client.delete(f'{settings.JWT_USER_REDIS_PREFIX}:{user_id}')
+        await user_cache_manager.clear([user_id])
         return count
 
     @staticmethod
@@ -258,7 +255,7 @@ class UserService:
             raise errors.CustomError(error=CustomErrorCode.CAPTCHA_ERROR)
         await redis_client.delete(f'{settings.EMAIL_CAPTCHA_REDIS_PREFIX}:{ctx.ip}')
         count = await user_dao.update_email(db, user_id, email)
-        await redis_client.delete(f'{settings.JWT_USER_REDIS_PREFIX}:{user_id}')
+        await user_cache_manager.clear([user_id])
         return count
 
     @staticmethod
@@ -273,7 +270,7 @@ class UserService:
         """
         user = await user_dao.get(db, user_id)
 
-        if user.password and not password_verify(obj.old_password, user.password):
+        if user.password and not await password_verify(obj.old_password, user.password):
             raise errors.RequestError(msg='原密码错误')
 
         if obj.new_password != obj.confirm_password:
@@ -285,9 +282,8 @@ class UserService:
         history_obj = CreateUserPasswordHistoryParam(user_id=user.id, password=user.password)
         await password_security_service.save_password_history(db, history_obj)
         await user_dao.update_password_changed_time(db, user.id)
-        await redis_client.delete_prefix(f'{settings.TOKEN_REDIS_PREFIX}:{user_id}')
-        await redis_client.delete_prefix(f'{settings.TOKEN_REFRESH_REDIS_PREFIX}:{user_id}')
-        await redis_client.delete_prefix(f'{settings.JWT_USER_REDIS_PREFIX}:{user_id}')
+        await revoke_user_sessions(user_id, username=user.username)
+        await user_cache_manager.clear([user_id])
         return count
 
     @staticmethod
@@ -303,9 +299,8 @@ class UserService:
         if not user:
             raise errors.NotFoundError(msg='用户不存在')
         count = await user_dao.delete(db, user.id)
-        await redis_client.delete_prefix(f'{settings.TOKEN_REDIS_PREFIX}:{user.id}')
-        await redis_client.delete_prefix(f'{settings.TOKEN_REFRESH_REDIS_PREFIX}:{user.id}')
-        await redis_client.delete_prefix(f'{settings.JWT_USER_REDIS_PREFIX}:{user.id}')
+        await revoke_user_sessions(user.id, username=user.username)
+        await user_cache_manager.clear([user.id])
         return count
 
 
@@ -1,10 +1,18 @@
 from collections.abc import Sequence
+from typing import Any
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from backend.app.admin.crud.crud_user import user_dao
 from backend.app.admin.model import data_scope_rule, role_data_scope, role_menu, user_role
+from backend.common.cache.codec import CacheCodec
+from backend.common.cache.decorator import cached, delete_cache
+from backend.common.dataclasses import UserMenuPermission
+from backend.common.enums import StatusType
+from backend.common.security.jwt import invalidate_token_cache
 from backend.core.conf import settings
+from backend.database.db import async_db_session
 from backend.database.redis import redis_client
 
 
@@ -21,6 +29,58 @@ class UserCacheManager:
         """
         if user_ids:
             await redis_client.delete(*[f'{settings.JWT_USER_REDIS_PREFIX}:{user_id}' for user_id in user_ids])
+            await delete_cache(settings.CACHE_USER_MENU_REDIS_PREFIX, *user_ids)
+            await delete_cache(settings.CACHE_USER_DATA_RULE_REDIS_PREFIX, *user_ids)
+            for user_id in user_ids:
+                await invalidate_token_cache(user_id)
+
+    @staticmethod
+    @cached(
+        settings.CACHE_USER_MENU_REDIS_PREFIX,
+        key='user_id',
+        codec=CacheCodec(format='msgpack', decode_type=UserMenuPermission),
+    )
+    async def get_menus(*, user_id: int) -> UserMenuPermission:
+        """
+        获取用户菜单权限，按需加载，避免认证主体包含完整的角色菜单
+
+        权限标识在加载时拆分为集合，本地缓存直接保存解码后的集合，鉴权时无需再次处理
+
+        :param user_id: 用户 ID
+        :return: 已启用角色的菜单 ID 及已启用菜单的权限标识
+        """
+        async with async_db_session() as db:
+            menus = await user_dao.get_menus(db, user_id)
+        perms = set()
+        for menu in menus:
+            if menu.perms and menu.status == StatusType.enable:
+                perms.update(menu.perms.split(','))
+        return UserMenuPermission(menu_ids=[menu.id for menu in menus], perms=frozenset(perms))
+
+    @staticmethod
+    @cached(settings.CACHE_USER_DATA_RULE_REDIS_PREFIX, key='user_id')
+    async def get_data_rules(*, user_id: int) -> dict[str, Any]:
+        """
+        获取用户数据权限规则，按需加载
+
+        :param user_id: 用户 ID
+        :return: {'filter_scopes': 是否过滤数据权限, 'rules': 已启用数据范围的数据规则列表}
+        """
+        async with async_db_session() as db:
+            filter_scopes, rules = await user_dao.get_data_rules(db, user_id)
+        return {
+            'filter_scopes': filter_scopes,
+            'rules': [
+                {
+                    'model': rule.model,
+                    'column': rule.column,
+                    'operator': rule.operator,
+                    'expression': rule.expression,
+                    'value': rule.value,
+                }
+                for rule in rules
+            ],
+        }
 
     async def clear_by_role_id(self, db: AsyncSession, role_ids: list[int]) -> None:
         """
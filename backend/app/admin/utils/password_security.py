@@ -1,17 +1,90 @@
+import asyncio
+import threading
+
+from collections.abc import Callable, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Any, TypeVar
+
 from pwdlib import PasswordHash
 from pwdlib.hashers.bcrypt import BcryptHasher
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.app.admin.crud.crud_user_password_history import user_password_history_dao
 from backend.common.exception import errors
+from backend.common.observability.prometheus.password import inc_password_hash_rejected, observe_password_hash_tasks
 from backend.core.conf import settings
 from backend.utils.dynamic_config import load_user_security_config
 from backend.utils.pattern_validate import is_has_letter, is_has_number, is_has_special_char
 
+T = TypeVar('T')
+
 password_hash = PasswordHash((BcryptHasher(),))
 
 
-def get_hash_password(password: str, salt: bytes | None) -> str:
+class PasswordHashExecutor:
+    """
+    密码哈希执行器
+
+    bcrypt 计算期间释放 GIL，在独立的有界线程池中执行，避免阻塞事件循环，并与其他线程池任务隔离；
+    排队任务数超过上限时直接拒绝，避免登录突增时请求无限堆积
+    """
+
+    def __init__(self) -> None:
+        self._executor: ThreadPoolExecutor | None = None
+        self._tasks: int = 0
+        self._lock = threading.Lock()
+
+    def _observe(self) -> None:
+        """记录线程池任务数"""
+        running = min(self._tasks, settings.USER_PASSWORD_HASH_MAX_WORKERS)
+        observe_password_hash_tasks(running=running, queued=self._tasks - running)
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        在线程池中执行哈希计算
+
+        :param func: 执行函数
+        :param args: 位置参数
+        :return:
+        """
+        if self._tasks >= settings.USER_PASSWORD_HASH_MAX_WORKERS + settings.USER_PASSWORD_HASH_MAX_QUEUE_SIZE:
+            inc_password_hash_rejected()
+            raise errors.ServiceUnavailableError(msg='服务繁忙，请稍后重试')
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=settings.USER_PASSWORD_HASH_MAX_WORKERS, thread_name_prefix='password_hash'
+            )
+
+        with self._lock:
+            self._tasks += 1
+            self._observe()
+        try:
+            future = self._executor.submit(func, *args)
+        except Exception:
+            self._done(None)
+            raise
+        # 请求取消时线程中的计算仍会继续，任务完成后才释放计数
+        future.add_done_callback(self._done)
+        return await asyncio.wrap_future(future)
+
+    def _done(self, _future: Future | None) -> None:
+        """
+        线程池任务完成回调
+
+        :param _future: 线程池任务
+        :return:
+        """
+        with self._lock:
+            self._tasks -= 1
+            self._observe()
+
+
+password_hash_executor: PasswordHashExecutor = PasswordHashExecutor()
+
+
+async def get_hash_password(password: str, salt: bytes | None) -> str:
     """
     使用哈希算法加密密码
 
@@ -19,10 +92,10 @@ def get_hash_password(password: str, salt: bytes | None) -> str:
     :param salt: 盐值
     :return:
     """
-    return password_hash.hash(password, salt=salt)
+    return await password_hash_executor.run(partial(password_hash.hash, password, salt=salt))
 
 
-def password_verify(plain_password: str, hashed_password: str) -> bool:
+async def password_verify(plain_password: str, hashed_password: str) -> bool:
     """
     密码验证
 
@@ -30,7 +103,18 @@ def password_verify(plain_password: str, hashed_password: str) -> bool:
     :param hashed_password: 哈希密码
     :return:
     """
-    return password_hash.verify(plain_password, hashed_password)
+    return await password_hash_executor.run(password_hash.verify, plain_password, hashed_password)
+
+
+def _password_verify_any(plain_password: str, hashed_passwords: Sequence[str]) -> bool:
+    """
+    验证密码是否与任一哈希密码匹配
+
+    :param plain_password: 待验证的密码
+    :param hashed_passwords: 哈希密码列表
+    :return:
+    """
+    return any(password_hash.verify(plain_password, hashed_password) for hashed_password in hashed_passwords)
 
 
 async def validate_new_password(db: AsyncSession, user_id: int, new_password: str) -> None:
@@ -61,8 +145,7 @@ async def validate_new_password(db: AsyncSession, user_id: int, new_password: st
 
     password_history = await user_password_history_dao.get_by_user_id(db, user_id)
 
-    for hist in password_history[: settings.USER_PASSWORD_HISTORY_CHECK_COUNT]:
-        if password_verify(new_password, hist.password):
-            raise errors.RequestError(
-                msg=f'新密码不能与最近 {settings.USER_PASSWORD_HISTORY_CHECK_COUNT} 次使用的密码相同'
-            )
+    # 在同一个线程池任务中依次验证历史密码，避免多次调度
+    hashed_passwords = [hist.password for hist in password_history[: settings.USER_PASSWORD_HISTORY_CHECK_COUNT]]
+    if hashed_passwords and await password_hash_executor.run(_password_verify_any, new_password, hashed_passwords):
+        raise errors.RequestError(msg=f'新密码不能与最近 {settings.USER_PASSWORD_HISTORY_CHECK_COUNT} 次使用的密码相同')
@@ -261,6 +261,9 @@ async def init(db: AsyncSession, redis: RedisCli) -> None:
                 settings.TOKEN_EXTRA_INFO_REDIS_PREFIX,
                 settings.TOKEN_REDIS_PREFIX,
                 settings.TOKEN_REFRESH_REDIS_PREFIX,
+                settings.TOKEN_SESSION_REDIS_PREFIX,
+                settings.TOKEN_ONLINE_SESSION_REDIS_PREFIX,
+                settings.TOKEN_REVOKED_REDIS_PREFIX,
             ]:
                 await redis.delete_prefix(prefix)
 
@@ -0,0 +1,199 @@
+import dataclasses
+import importlib
+
+from typing import Any, Literal
+
+from msgspec import Raw, Struct, ValidationError, field, json, msgpack
+
+from backend.common.exception import errors
+from backend.core.conf import settings
+
+# 可刷新缓存条目标识
+CACHE_ENTRY_MARKER = '__fba_cache_entry__'
+
+# 二进制缓存值头部标识，JSON 文本不会以 NUL 字节开头，未压缩的 JSON 缓存值保持原样以兼容已有缓存
+_BINARY_HEADER = b'\x00'
+
+_FORMATS = ('json', 'msgpack')
+_COMPRESSIONS = (None, 'zstd', 'lz4')
+# 压缩算法依赖，通过 cache-compression 可选依赖安装
+_COMPRESSION_MODULES = {'zstd': 'zstandard', 'lz4': 'lz4.frame'}
+
+_ENCODERS = {'json': json.Encoder(), 'msgpack': msgpack.Encoder()}
+_DECODERS = {'json': json, 'msgpack': msgpack}
+
+
+class _CacheEntry(Struct):
+    """可刷新缓存条目"""
+
+    marker: bool = field(name=CACHE_ENTRY_MARKER)
+    value: Raw
+    expire: float | None
+    delta: float
+
+
+def _import_compression(compression: str) -> Any:
+    """
+    导入压缩算法依赖
+
+    :param compression: 压缩算法
+    :return:
+    """
+    try:
+        return importlib.import_module(_COMPRESSION_MODULES[compression])
+    except ImportError:
+        raise errors.ServerError(
+            msg=f'缓存 {compression} 压缩依赖未安装，请安装 fastapi-best-architecture[cache-compression]'
+        )
+
+
+def _compress(data: bytes, compression: str) -> bytes:
+    """
+    压缩缓存值
+
+    :param data: 缓存值
+    :param compression: 压缩算法
+    :return:
+    """
+    module = _import_compression(compression)
+    if compression == 'zstd':
+        return module.ZstdCompressor().compress(data)
+    return module.compress(data)
+
+
+def _decompress(data: bytes, compression: str) -> bytes:
+    """
+    解压缓存值
+
+    :param data: 压缩后的缓存值
+    :param compression: 压缩算法
+    :return:
+    """
+    module = _import_compression(compression)
+    if compression == 'zstd':
+        return module.ZstdDecompressor().decompress(data)
+    return module.decompress(data)
+
+
+@dataclasses.dataclass(slots=True, frozen=True)
+class CacheCodec:
+    """
+    缓存编解码器
+
+    二进制缓存值以 NUL 字节和格式标识开头，解码时根据头部自动识别格式与压缩算法，
+    因此修改缓存编解码器后已有缓存仍可正常读取
+
+    :param format: 序列化格式，msgpack 体积更小、解码更快
+    :param compression: 压缩算法，需安装 cache-compression 可选依赖
+    :param compress_threshold: 压缩阈值（bytes），为空时使用 CACHE_COMPRESS_THRESHOLD
+    :param decode_type: 解码类型，可指定为 msgspec Struct 等类型以直接解码为对象
+    """
+
+    format: Literal['json', 'msgpack'] = 'json'
+    compression: Literal['zstd', 'lz4'] | None = None
+    compress_threshold: int | None = None
+    decode_type: Any = Any
+
+    def __post_init__(self) -> None:
+        """校验编解码器配置，缓存编解码器在启动时创建，依赖缺失时提前失败而非在请求中失败"""
+        if self.format not in _FORMATS:
+            raise errors.ServerError(msg=f'不支持的缓存序列化格式: {self.format}')
+        if self.compression not in _COMPRESSIONS:
+            raise errors.ServerError(msg=f'不支持的缓存压缩算法: {self.compression}')
+        if self.compression is not None:
+            _import_compression(self.compression)
+
+    def encode(self, obj: Any) -> bytes:
+        """
+        序列化缓存值
+
+        :param obj: 缓存值
+        :return:
+        """
+        return _ENCODERS[self.format].encode(obj)
+
+    def encode_entry(self, data: bytes, *, expire: float | None, delta: float) -> bytes:
+        """
+        序列化可刷新缓存条目
+
+        :param data: 已序列化的缓存值
+        :param expire: 软过期时间戳
+        :param delta: 加载耗时（秒）
+        :return:
+        """
+        return _ENCODERS[self.format].encode(_CacheEntry(marker=True, value=Raw(data), expire=expire, delta=delta))
+
+    def pack(self, data: bytes) -> bytes:
+        """
+        打包缓存值，超过压缩阈值时压缩
+
+        :param data: 已序列化的缓存值
+        :return:
+        """
+        threshold = (
+            self.compress_threshold if self.compress_threshold is not None else settings.CACHE_COMPRESS_THRESHOLD
+        )
+        compression = self.compression if self.compression and len(data) >= threshold else None
+        if self.format == 'json' and compression is None:
+            return data
+
+        if compression is not None:
+            data = _compress(data, compression)
+        flag = _FORMATS.index(self.format) | _COMPRESSIONS.index(compression) << 4
+        return _BINARY_HEADER + bytes((flag,)) + data
+
+    def decode(self, value: bytes | str, *, entry: bool = False, packed: bool = True) -> Any:
+        """
+        反序列化缓存值
+
+        :param value: 缓存值
+        :param entry: 是否优先按可刷新缓存条目解码
+        :param packed: 缓存值是否已打包，未打包时按当前序列化格式解码
+        :return:
+        """
+        if isinstance(value, str):
+            value = value.encode()
+
+        fmt = 'json' if packed else self.format
+        if packed and value.startswith(_BINARY_HEADER):
+            flag = value[1]
+            fmt = _FORMATS[flag & 0x0F]
+            compression = _COMPRESSIONS[flag >> 4]
+            value = value[2:]
+            if compression is not None:
+                value = _decompress(value, compression)
+
+        decoder = _DECODERS[fmt]
+        if entry:
+            try:
+                cache_entry = decoder.decode(value, type=_CacheEntry)
+            except ValidationError:
+                pass
+            else:
+                return {
+                    CACHE_ENTRY_MARKER: True,
+                    'value': self._decode_value(decoder, cache_entry.value),
+                    'expire': cache_entry.expire,
+                    'delta': cache_entry.delta,
+                }
+
+        return self._decode_value(decoder, value)
+
+    def _decode_value(self, decoder: Any, value: bytes | Raw) -> Any:
+        """
+        按解码类型反序列化缓存值，类型不匹配时（如解码类型变更前写入的缓存）回退为普通解码
+
+        :param decoder: 解码模块
+        :param value: 缓存值
+        :return:
+        """
+        if self.decode_type is Any:
+            return decoder.decode(value)
+        try:
+            return decoder.decode(value, type=self.decode_type)
+        except ValidationError:
+            return decoder.decode(value)
+
+
+# 默认缓存编解码器
+default_cache_codec = CacheCodec()
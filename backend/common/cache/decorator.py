@@ -1,22 +1,77 @@
+import asyncio
+import dataclasses
 import functools
+import itertools
+import math
+import random
+import time
 
-from collections.abc import Callable, Sequence
+from collections.abc import Awaitable, Callable, Sequence
 from typing import Any, ParamSpec, TypeVar
 
-from msgspec import json
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
+from backend.common.cache.codec import CACHE_ENTRY_MARKER, CacheCodec, default_cache_codec
 from backend.common.cache.local import local_cache_manager
 from backend.common.cache.pubsub import cache_pubsub_manager
+from backend.common.cache.shard import cache_shard_manager, get_index_key
+from backend.common.cache.singleflight import single_flight_manager
 from backend.common.context import ctx
 from backend.common.exception import errors
 from backend.common.log import log
+from backend.common.observability.prometheus.cache import (
+    inc_cache_invalidation,
+    inc_cache_request,
+    observe_cache_load_cost_time,
+    observe_cache_value_size,
+)
 from backend.core.conf import settings
-from backend.database.redis import redis_client
+from backend.database.db import async_db_session
+from backend.database.redis import RedisCircuitOpenError, RedisCli, redis_cache_client
 from backend.utils.serializers import select_columns_serialize, select_list_serialize
 
 P = ParamSpec('P')
 T = TypeVar('T')
 
+# 空值缓存标识
+_CACHE_TOMBSTONE_MARKER = '__fba_cache_tombstone__'
+
+# 从命名空间索引中移除已不存在的缓存 Key，检查与移除原子执行，避免误删并发写入的 Key
+# KEYS[1]: 命名空间索引，ARGV: 待检查的缓存 Key
+_PRUNE_INDEX_SCRIPT = """
+local removed = 0
+for _, cache_key in ipairs(ARGV) do
+    if redis.call('EXISTS', cache_key) == 0 then
+        removed = removed + redis.call('SREM', KEYS[1], cache_key)
+    end
+end
+return removed
+"""
+_prune_index_script = redis_cache_client.register_script(_PRUNE_INDEX_SCRIPT)
+
+# 各命名空间索引最后一次清理的时间
+_index_pruned_at: dict[str, float] = {}
+
+# 事务提交后执行的后台任务
+_background_tasks: set[asyncio.Task] = set()
+
+
+@dataclasses.dataclass(slots=True, frozen=True)
+class _CacheOptions:
+    name: str
+    lock: bool = False
+    soft_ttl: int | None = None
+    early_refresh: bool = False
+    codec: CacheCodec = default_cache_codec
+    negative_ttl: int | None = None
+    negative_exceptions: tuple[type[errors.BaseExceptionError], ...] = ()
+
+    @property
+    def refreshable(self) -> bool:
+        return self.soft_ttl is not None or self.early_refresh
+
 
 def _build_cache_key(
     name: str,
@@ -55,16 +110,17 @@ def _build_cache_key(
     return name
 
 
-def _serialize_result(result: Any) -> bytes:
+def _serialize_result(result: Any, codec: CacheCodec = default_cache_codec) -> bytes:
     """
     序列化缓存结果
 
     :param result: 需要进行序列化的结果
+    :param codec: 缓存编解码器
     :return:
     """
     # SQLAlchemy 查询表
     if hasattr(result, '__table__'):
-        return json.encode(select_columns_serialize(result))
+        return codec.encode(select_columns_serialize(result))
 
     # SQLAlchemy 查询列表
     if (
@@ -73,23 +129,44 @@ def _serialize_result(result: Any) -> bytes:
         and len(result) > 0
         and hasattr(result[0], '__table__')
     ):
-        return json.encode(select_list_serialize(result))
+        return codec.encode(select_list_serialize(result))
 
     # 基本类型
-    return json.encode(result)
+    return codec.encode(result)
 
 
-def _deserialize_result(value: bytes) -> Any:
+def _deserialize_result(value: bytes, options: _CacheOptions | None = None, *, packed: bool = True) -> Any:
     """
     反序列化缓存结果
 
     :param value: 缓存结果
+    :param options: 缓存选项
+    :param packed: 缓存结果是否已打包
     :return:
     """
+    codec = options.codec if options else default_cache_codec
     try:
-        return json.decode(value)
+        return codec.decode(value, entry=bool(options and options.refreshable), packed=packed)
     except Exception:
-        return value
+        return value.decode() if isinstance(value, bytes) else value
+
+
+def _detach_result(result: Any, options: _CacheOptions) -> Any:
+    """
+    获取可在请求间共享的缓存结果，SQLAlchemy 对象绑定于加载方的数据库会话，转换为反序列化后的副本
+
+    :param result: 缓存结果
+    :param options: 缓存选项
+    :return:
+    """
+    if hasattr(result, '__table__') or (
+        isinstance(result, Sequence)
+        and not isinstance(result, (str, bytes))
+        and len(result) > 0
+        and hasattr(result[0], '__table__')
+    ):
+        return options.codec.decode(_serialize_result(result, options.codec), packed=False)
+    return result
 
 
 def user_key_builder() -> str:
@@ -100,65 +177,771 @@ def user_key_builder() -> str:
     return str(user_id)
 
 
+def _wrap_entry(serialized_result: bytes, *, options: _CacheOptions, delta: float) -> bytes:
+    """
+    包装可刷新缓存条目，附带软过期时间与加载耗时
+
+    :param serialized_result: 已序列化的缓存结果
+    :param options: 缓存选项，soft_ttl 为空时以 L2 过期时间作为刷新基准
+    :param delta: 加载耗时（秒）
+    :return:
+    """
+    ttl = options.soft_ttl or settings.CACHE_REDIS_TTL
+    expire = time.time() + ttl if ttl else None
+    return options.codec.encode_entry(serialized_result, expire=expire, delta=delta)
+
+
+def _unwrap_entry(value: Any) -> tuple[Any, float | None, float] | None:
+    """
+    解包可刷新缓存条目
+
+    :param value: 缓存结果
+    :return: (缓存值, 软过期时间戳, 加载耗时)，非可刷新缓存条目时返回 None
+    """
+    if isinstance(value, dict) and value.get(CACHE_ENTRY_MARKER):
+        return value['value'], value['expire'], value['delta']
+    return None
+
+
+def _is_stale(expire: float | None, delta: float, *, early_refresh: bool) -> bool:
+    """
+    判断缓存条目是否需要刷新
+
+    启用提前刷新时采用 XFetch 算法，越接近过期时间、加载耗时越长，提前刷新的概率越高，
+    使各节点的刷新时间自然错开
+
+    :param expire: 软过期时间戳
+    :param delta: 加载耗时（秒）
+    :param early_refresh: 是否启用概率提前刷新
+    :return:
+    """
+    if expire is None:
+        return False
+    now = time.time()
+    if early_refresh:
+        now -= delta * settings.CACHE_EARLY_REFRESH_BETA * math.log(1 - random.random())
+    return now >= expire
+
+
+def _is_tombstone(value: Any) -> bool:
+    """
+    判断缓存结果是否为空值标记
+
+    :param value: 缓存结果
+    :return:
+    """
+    return isinstance(value, dict) and value.get(_CACHE_TOMBSTONE_MARKER) is True
+
+
+def _resolve_tombstone(tombstone: dict[str, Any], options: _CacheOptions) -> None:
+    """
+    还原空值标记，记录的是异常时重新抛出该异常，否则返回 None
+
+    :param tombstone: 空值标记
+    :param options: 缓存选项
+    :return:
+    """
+    for exc_type in options.negative_exceptions:
+        if exc_type.__name__ == tombstone['error']:
+            raise exc_type(msg=tombstone['msg'])
+
+
+def _get_local_cache(cache_key: str) -> Any:
+    """
+    获取 L1 缓存，已过期的空值标记视为未命中
+
+    :param cache_key: 缓存 Key
+    :return:
+    """
+    local_value = local_cache_manager.get(cache_key)
+    if _is_tombstone(local_value) and local_value['expire'] <= time.time():
+        local_cache_manager.delete(cache_key)
+        return None
+    return local_value
+
+
+async def _get_cache(cache_key: str, options: _CacheOptions) -> Any:
+    """
+    获取缓存（L1 -> L2）
+
+    :param cache_key: 缓存 Key
+    :param options: 缓存选项
+    :return:
+    """
+    name = options.name
+
+    # L1: 本地缓存
+    if settings.CACHE_LOCAL_ENABLED:
+        local_value = _get_local_cache(cache_key)
+        if local_value is not None:
+            inc_cache_request(cache_name=name, result='l1_hit')
+            return local_value
+
+    # L2: Redis 缓存
+    try:
+        redis_value = await cache_shard_manager.get_raw(cache_key)
+        if redis_value is not None:
+            result = _deserialize_result(redis_value, options)
+            # 回填 L1
+            if settings.CACHE_LOCAL_ENABLED:
+                local_cache_manager.set(cache_key, result, size=len(redis_value))
+            inc_cache_request(cache_name=name, result='l2_hit')
+            return result
+    except Exception as e:
+        if not isinstance(e, RedisCircuitOpenError):
+            log.warning(f'[Cache] GET error: {e}')
+
+    inc_cache_request(cache_name=name, result='miss')
+    return None
+
+
+async def _set_redis_cache(serialized_results: dict[str, bytes], *, name: str, ttl: int | None) -> None:
+    """
+    按分片通过一次 pipeline 写入 L2 缓存，并登记到该分片的命名空间索引
+
+    :param serialized_results: {缓存 Key: 已打包的缓存结果}
+    :param name: 缓存名称
+    :param ttl: 过期时间（秒）
+    :return:
+    """
+
+    async def set_shard(client: RedisCli, cache_keys: list[str]) -> None:
+        # 熔断期间跳过 L2 写入
+        if not client.available:
+            return
+        async with cache_shard_manager.guard(client), client.batch() as pipe:
+            for cache_key in cache_keys:
+                if ttl:
+                    pipe.setex(cache_key, ttl, serialized_results[cache_key])
+                else:
+                    pipe.set(cache_key, serialized_results[cache_key])
+            if settings.CACHE_INDEX_ENABLED:
+                index_key = get_index_key(name)
+                pipe.sadd(index_key, *cache_keys)
+                if settings.CACHE_REDIS_TTL:
+                    pipe.expire(index_key, settings.CACHE_REDIS_TTL)
+
+    groups = cache_shard_manager.group_keys(list(serialized_results))
+    cache_shard_manager.record_write(name, list(serialized_results))
+    await asyncio.gather(*itertools.starmap(set_shard, groups.items()))
+
+    # 索引随写入持续续期，定期清理自然过期的成员
+    if settings.CACHE_INDEX_ENABLED:
+        now = time.monotonic()
+        if now - _index_pruned_at.get(name, -math.inf) >= settings.CACHE_INDEX_PRUNE_INTERVAL:
+            _index_pruned_at[name] = now
+            single_flight_manager.submit(f'prune:{name}', lambda: _prune_index(name))
+
+
+async def _prune_shard_index(client: RedisCli, name: str, batch_size: int) -> None:
+    """
+    清理单个分片中命名空间索引内已不存在的缓存 Key
+
+    :param client: 分片 Redis 客户端
+    :param name: 缓存名称
+    :param batch_size: 批量检查的大小
+    :return:
+    """
+    index_key = get_index_key(name)
+    batch_keys = []
+    async for cache_key in client.sscan_iter(index_key, count=batch_size):
+        batch_keys.append(cache_key)
+        if len(batch_keys) >= batch_size:
+            await _prune_index_script(keys=[index_key], args=batch_keys, client=client)
+            batch_keys.clear()
+    if batch_keys:
+        await _prune_index_script(keys=[index_key], args=batch_keys, client=client)
+
+
+async def _prune_index(name: str, batch_size: int = 1000) -> None:
+    """
+    清理命名空间索引中已过期或已删除的缓存 Key（所有可用分片）
+
+    :param name: 缓存名称
+    :param batch_size: 批量检查的大小
+    :return:
+    """
+
+    async def prune_shard(client: RedisCli) -> None:
+        async with cache_shard_manager.guard(client):
+            await _prune_shard_index(client, name, batch_size)
+
+    try:
+        await asyncio.gather(*(prune_shard(client) for client in cache_shard_manager.clients))
+    except Exception as e:
+        if not isinstance(e, RedisCircuitOpenError):
+            log.warning(f'[Cache] PRUNE INDEX error: {e}')
+
+
+def _pack_results(results: dict[str, Any], *, options: _CacheOptions, delta: float) -> dict[str, bytes]:
+    """
+    序列化并打包缓存结果，同时回填 L1
+
+    :param results: {缓存 Key: 缓存结果}
+    :param options: 缓存选项
+    :param delta: 加载耗时（秒）
+    :return:
+    """
+    serialized_results = {}
+    for cache_key, result in results.items():
+        serialized_result = _serialize_result(result, options.codec)
+        if options.refreshable:
+            serialized_result = _wrap_entry(serialized_result, options=options, delta=delta)
+        packed_result = options.codec.pack(serialized_result)
+        serialized_results[cache_key] = packed_result
+        observe_cache_value_size(cache_name=options.name, size=len(packed_result))
+
+        # 回填 L1
+        if settings.CACHE_LOCAL_ENABLED:
+            local_cache_manager.set(
+                cache_key,
+                _deserialize_result(serialized_result, options, packed=False),
+                size=len(packed_result),
+            )
+    return serialized_results
+
+
+async def _set_cache_many(results: dict[str, Any], *, options: _CacheOptions, delta: float) -> None:
+    """
+    批量回填缓存（L1 + L2），L2 通过一次 pipeline 写入
+
+    :param results: {缓存 Key: 缓存结果}
+    :param options: 缓存选项
+    :param delta: 加载耗时（秒）
+    :return:
+    """
+    try:
+        serialized_results = _pack_results(results, options=options, delta=delta)
+        await _set_redis_cache(serialized_results, name=options.name, ttl=settings.CACHE_REDIS_TTL)
+    except Exception as e:
+        log.warning(f'[Cache] SET error: {e}')
+
+
+async def _set_cache(cache_key: str, result: Any, *, options: _CacheOptions, delta: float) -> None:
+    """
+    回填缓存（L1 + L2）
+
+    :param cache_key: 缓存 Key
+    :param result: 缓存结果
+    :param options: 缓存选项
+    :param delta: 加载耗时（秒）
+    :return:
+    """
+    await _set_cache_many({cache_key: result}, options=options, delta=delta)
+
+
+async def _set_tombstone(cache_key: str, error: Exception | None, *, options: _CacheOptions) -> None:
+    """
+    写入空值标记（L1 + L2），过期时间为 negative_ttl
+
+    :param cache_key: 缓存 Key
+    :param error: 加载数据时抛出的异常，结果为 None 时为空
+    :param options: 缓存选项
+    :return:
+    """
+    tombstone = {
+        _CACHE_TOMBSTONE_MARKER: True,
+        'error': type(error).__name__ if error is not None else None,
+        'msg': getattr(error, 'msg', None),
+        'expire': time.time() + options.negative_ttl,
+    }
+    try:
+        serialized_result = options.codec.pack(options.codec.encode(tombstone))
+        if settings.CACHE_LOCAL_ENABLED:
+            local_cache_manager.set(cache_key, tombstone, size=len(serialized_result))
+        await _set_redis_cache({cache_key: serialized_result}, name=options.name, ttl=options.negative_ttl)
+    except Exception as e:
+        log.warning(f'[Cache] SET tombstone error: {e}')
+
+
+async def _load_and_set_cache(cache_key: str, loader: Callable[[], Awaitable[T]], *, options: _CacheOptions) -> T:
+    """
+    加载数据并回填缓存
+
+    :param cache_key: 缓存 Key
+    :param loader: 数据加载函数
+    :param options: 缓存选项
+    :return:
+    """
+    start_time = time.perf_counter()
+    try:
+        result = await loader()
+    except options.negative_exceptions as e:
+        await _set_tombstone(cache_key, e, options=options)
+        raise
+    delta = time.perf_counter() - start_time
+    observe_cache_load_cost_time(cache_name=options.name, elapsed=delta)
+    if result is not None:
+        await _set_cache(cache_key, result, options=options, delta=delta)
+    elif options.negative_ttl:
+        await _set_tombstone(cache_key, None, options=options)
+    return result
+
+
+async def _load_with_lock(cache_key: str, loader: Callable[[], Awaitable[T]], *, options: _CacheOptions) -> T:
+    """
+    通过 Redis 租约加载数据，仅持有租约的节点执行加载，其余节点短暂轮询 L2
+
+    :param cache_key: 缓存 Key
+    :param loader: 数据加载函数
+    :param options: 缓存选项
+    :return:
+    """
+    lock = redis_cache_client.lock(
+        f'{settings.CACHE_LOCK_REDIS_PREFIX}:{cache_key}',
+        timeout=settings.CACHE_LOCK_TIMEOUT,
+        blocking=False,
+    )
+    try:
+        acquired = await lock.acquire()
+    except Exception as e:
+        if not isinstance(e, RedisCircuitOpenError):
+            log.warning(f'[Cache] LOCK error: {e}')
+        return await _load_and_set_cache(cache_key, loader, options=options)
+
+    if acquired:
+        try:
+            # 获取租约期间其他节点可能已完成回填
+            result = await _get_cache(cache_key, options)
+            if result is not None:
+                entry = _unwrap_entry(result)
+                if entry is None or not _is_stale(entry[1], entry[2], early_refresh=False):
+                    return result
+            return await _load_and_set_cache(cache_key, loader, options=options)
+        finally:
+            try:
+                if await lock.owned():
+                    await lock.release()
+            except Exception as e:
+                log.warning(f'[Cache] UNLOCK error: {e}')
+
+    # 等待持有租约的节点回填 L2
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.CACHE_LOCK_WAIT_TIMEOUT
+    while loop.time() < deadline:
+        await asyncio.sleep(settings.CACHE_LOCK_POLL_INTERVAL)
+        result = await _get_cache(cache_key, options)
+        if result is not None:
+            return result
+
+    # 等待超时，自行加载
+    return await _load_and_set_cache(cache_key, loader, options=options)
+
+
 def cached(  # noqa: C901
     name: str,
     *,
     key: str | None = None,
     key_builder: Callable[..., str] | None = None,
+    lock: bool = False,
+    soft_ttl: int | None = None,
+    early_refresh: bool = False,
+    codec: CacheCodec | None = None,
+    negative_ttl: int | None = None,
+    negative_exceptions: tuple[type[errors.BaseExceptionError], ...] = (),
 ) -> Callable[[Callable[P, T]], Callable[P, T]]:
     """
     缓存装饰器
 
+    进程内合并相同 Key 的并发加载时，仅加载方获得方法返回的原始结果，SQLAlchemy 对象对其余等待者以反序列化后的副本返回
+
+    启用 soft_ttl 或 early_refresh 后，缓存超过软过期时间时将立即返回旧值，并在后台刷新缓存，
+    后台刷新时如果方法参数中存在 db，将使用独立的数据库会话
+
+    设置 negative_ttl 后，方法返回 None 或抛出 negative_exceptions 中的异常时将缓存空值标记，
+    过期前再次调用直接返回 None 或重新抛出该异常，空值标记同样通过 cache_invalidate 失效
+
     :param name: 缓存名称（通常为缓存 Key 前缀）
     :param key: 从方法参数中获取指定参数名的值作为缓存 Key，与 key_builder 互斥
     :param key_builder: 自定义 Key 生成函数，与 key 互斥
+    :param lock: 缓存未命中时是否通过 Redis 租约保证仅一个节点加载数据
+    :param soft_ttl: 软过期时间（秒），应小于 CACHE_REDIS_TTL
+    :param early_refresh: 是否在过期前按概率提前刷新（XFetch）
+    :param codec: 缓存编解码器，默认为 JSON 编码
+    :param negative_ttl: 空值缓存过期时间（秒），为空时不缓存空值
+    :param negative_exceptions: 需要缓存空值的异常类型，异常需支持 msg 参数
     :return:
     """
     if key is not None and key_builder is not None:
         raise errors.ServerError(msg='缓存 key 和 key_builder 不能同时使用')
+    if negative_exceptions and not negative_ttl:
+        raise errors.ServerError(msg='缓存 negative_exceptions 需要同时设置 negative_ttl')
+
+    options = _CacheOptions(
+        name=name,
+        lock=lock,
+        soft_ttl=soft_ttl,
+        early_refresh=early_refresh,
+        codec=codec or default_cache_codec,
+        negative_ttl=negative_ttl,
+        negative_exceptions=negative_exceptions,
+    )
+    # 指定解码类型的缓存值无法按 msgpack 还原，不写入快照
+    local_cache_manager.register_namespace(name, snapshot=options.codec.decode_type is Any)
 
     def decorator(func: Callable[P, T]) -> Callable[P, T]:  # noqa: C901
         @functools.wraps(func)
-        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:  # noqa: C901
             cache_key = _build_cache_key(name, key, key_builder, *args, **kwargs)
 
+            async def load(**call_kwargs: Any) -> T:
+                async def loader() -> T:
+                    return await func(*args, **call_kwargs)
+
+                if options.lock:
+                    return await _load_with_lock(cache_key, loader, options=options)
+                return await _load_and_set_cache(cache_key, loader, options=options)
+
+            async def refresh() -> None:
+                try:
+                    # 其他节点可能已完成刷新，直接回填 L1
+                    redis_value = await cache_shard_manager.get_raw(cache_key)
+                    if redis_value is not None:
+                        redis_result = _deserialize_result(redis_value, options)
+                        entry = _unwrap_entry(redis_result)
+                        if entry is not None and not _is_stale(entry[1], entry[2], early_refresh=False):
+                            if settings.CACHE_LOCAL_ENABLED:
+                                local_cache_manager.set(cache_key, redis_result, size=len(redis_value))
+                            return
+
+                    if 'db' in kwargs:
+                        async with async_db_session() as db:
+                            await load(**{**kwargs, 'db': db})
+                    else:
+                        await load(**kwargs)
+                except Exception as e:
+                    log.warning(f'[Cache] REFRESH error: {e}')
+
+            result = await _get_cache(cache_key, options)
+            if result is not None:
+                if _is_tombstone(result):
+                    return _resolve_tombstone(result, options)
+
+                entry = _unwrap_entry(result)
+                if entry is None:
+                    return result
+
+                value, expire, delta = entry
+                if options.refreshable and _is_stale(expire, delta, early_refresh=options.early_refresh):
+                    single_flight_manager.submit(f'refresh:{cache_key}', refresh)
+                return value
+
+            # 缓存未命中
+            if settings.CACHE_SINGLE_FLIGHT_ENABLED:
+                leader = False
+
+                async def load_shared() -> tuple[T, Any]:
+                    nonlocal leader
+                    leader = True
+                    loaded = await load(**kwargs)
+                    return loaded, _detach_result(loaded, options)
+
+                result, shared = await single_flight_manager.do(cache_key, load_shared)
+                if not leader:
+                    result = shared
+            else:
+                result = await load(**kwargs)
+
+            # 并发等待者可能从 L2 获取到可刷新缓存条目或空值标记
+            if _is_tombstone(result):
+                return _resolve_tombstone(result, options)
+            entry = _unwrap_entry(result)
+            return entry[0] if entry is not None else result
+
+        return wrapper
+
+    return decorator
+
+
+def cached_many(  # noqa: C901
+    name: str,
+    *,
+    key: str,
+    key_builder: Callable[[Any], str] | None = None,
+    soft_ttl: int | None = None,
+    early_refresh: bool = False,
+    codec: CacheCodec | None = None,
+) -> Callable[[Callable[P, T]], Callable[P, T]]:
+    """
+    批量缓存装饰器
+
+    被装饰方法通过 key 指定的列表参数接收需要查询的项，并返回 {项: 结果} 字典；依次从 L1、L2（MGET）获取缓存，
+    剩余未命中的项仅调用一次被装饰方法批量加载，并通过 pipeline 回填，结果中不存在的项不会被缓存
+
+    :param name: 缓存名称（通常为缓存 Key 前缀）
+    :param key: 列表参数名
+    :param key_builder: 单项 Key 生成函数，默认使用项本身，与 cached 保持一致时可共享缓存
+    :param soft_ttl: 软过期时间（秒），应小于 CACHE_REDIS_TTL
+    :param early_refresh: 是否在过期前按概率提前刷新（XFetch）
+    :param codec: 缓存编解码器，默认为 JSON 编码，与 cached 共享缓存时应保持一致
+    :return:
+    """
+    options = _CacheOptions(
+        name=name,
+        soft_ttl=soft_ttl,
+        early_refresh=early_refresh,
+        codec=codec or default_cache_codec,
+    )
+    # 指定解码类型的缓存值无法按 msgpack 还原，不写入快照
+    local_cache_manager.register_namespace(name, snapshot=options.codec.decode_type is Any)
+
+    def decorator(func: Callable[P, T]) -> Callable[P, T]:  # noqa: C901
+        @functools.wraps(func)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:  # noqa: C901
+            items = kwargs.get(key)
+            if items is None:
+                raise errors.ServerError(msg=f'缓存键构建失败，参数 "{key}" 不存在或值为空')
+
+            items = list(dict.fromkeys(items))
+            cache_keys = {item: f'{name}:{key_builder(item) if key_builder else item}' for item in items}
+
+            async def load(load_items: list[Any], **call_kwargs: Any) -> dict[Any, Any]:
+                start_time = time.perf_counter()
+                loaded = await func(*args, **{**call_kwargs, key: load_items})
+                delta = time.perf_counter() - start_time
+                observe_cache_load_cost_time(cache_name=name, elapsed=delta)
+                loaded = {item: value for item, value in loaded.items() if item in cache_keys and value is not None}
+                if loaded:
+                    await _set_cache_many(
+                        {cache_keys[item]: value for item, value in loaded.items()},
+                        options=options,
+                        delta=delta,
+                    )
+                return loaded
+
+            async def refresh(refresh_items: list[Any]) -> None:
+                try:
+                    if 'db' in kwargs:
+                        async with async_db_session() as db:
+                            await load(refresh_items, **{**kwargs, 'db': db})
+                    else:
+                        await load(refresh_items, **kwargs)
+                except Exception as e:
+                    log.warning(f'[Cache] REFRESH error: {e}')
+
             # L1: 本地缓存
-            if settings.CACHE_LOCAL_ENABLED:
-                local_value = local_cache_manager.get(cache_key)
+            results: dict[Any, Any] = {}
+            missing_items = []
+            for item in items:
+                local_value = _get_local_cache(cache_keys[item]) if settings.CACHE_LOCAL_ENABLED else None
                 if local_value is not None:
-                    return local_value
+                    inc_cache_request(cache_name=name, result='l1_hit')
+                    results[item] = local_value
+                else:
+                    missing_items.append(item)
 
             # L2: Redis 缓存
-            try:
-                redis_value = await redis_client.get(cache_key)
-                if redis_value is not None:
-                    result = _deserialize_result(redis_value)
-                    # 回填 L1
-                    if settings.CACHE_LOCAL_ENABLED:
-                        local_cache_manager.set(cache_key, result)
-                    return result
-            except Exception as e:
-                log.warning(f'[Cache] GET error: {e}')
+            if missing_items:
+                try:
+                    redis_values = await cache_shard_manager.mget_raw([cache_keys[item] for item in missing_items])
+                except Exception as e:
+                    if not isinstance(e, RedisCircuitOpenError):
+                        log.warning(f'[Cache] MGET error: {e}')
+                else:
+                    remaining_items = []
+                    for item, redis_value in zip(missing_items, redis_values, strict=True):
+                        if redis_value is None:
+                            remaining_items.append(item)
+                            continue
+                        result = _deserialize_result(redis_value, options)
+                        # 回填 L1
+                        if settings.CACHE_LOCAL_ENABLED:
+                            local_cache_manager.set(cache_keys[item], result, size=len(redis_value))
+                        inc_cache_request(cache_name=name, result='l2_hit')
+                        results[item] = result
+                    missing_items = remaining_items
+
+            for _ in missing_items:
+                inc_cache_request(cache_name=name, result='miss')
+
+            # 解包可刷新缓存条目，cached 写入的空值标记视为不存在
+            stale_items = []
+            for item in [item for item, result in results.items() if _is_tombstone(result)]:
+                del results[item]
+            for item, result in results.items():
+                entry = _unwrap_entry(result)
+                if entry is None:
+                    continue
+                value, expire, delta = entry
+                results[item] = value
+                if options.refreshable and _is_stale(expire, delta, early_refresh=options.early_refresh):
+                    stale_items.append(item)
+
+            if stale_items:
+                single_flight_manager.submit(
+                    f'refresh:{",".join(cache_keys[item] for item in stale_items)}',
+                    lambda: refresh(stale_items),
+                )
+
+            # 缓存未命中，批量加载
+            if missing_items:
+                results.update(await load(missing_items, **kwargs))
+
+            return {item: results[item] for item in items if item in results}
+
+        return wrapper
+
+    return decorator
+
+
+def _as_items(items: Any) -> list[Any]:
+    """
+    将 cache_put 加载函数的返回值转换为对象列表
+
+    :param items: 单个对象或对象列表，为 None 时返回空列表
+    :return:
+    """
+    if items is None:
+        return []
+    if not isinstance(items, Sequence) or isinstance(items, (str, bytes)):
+        return [items]
+    return list(items)
+
+
+async def _put_cache(
+    items: list[Any],
+    *,
+    options: _CacheOptions,
+    key_builder: Callable[[Any], Any],
+    evict_keys: set[Any],
+    delta: float,
+) -> None:
+    """
+    写入缓存（L1 + L2），失效受影响的列表缓存，并广播新值
+
+    :param items: 加载的对象列表
+    :param options: 缓存选项
+    :param key_builder: 根据加载的对象生成缓存 Key（不含缓存名称）
+    :param evict_keys: 需失效的缓存 Key（不含缓存名称），None 将被忽略
+    :param delta: 加载耗时（秒）
+    :return:
+    """
+    name = options.name
+    results = {f'{name}:{key_builder(item)}': item for item in items}
+
+    stale_keys = [key for key in evict_keys if key is not None and f'{name}:{key}' not in results]
+    if stale_keys:
+        await delete_cache(name, *stale_keys)
+
+    if not results:
+        return
+
+    serialized_results = _pack_results(results, options=options, delta=delta)
+    await _set_redis_cache(serialized_results, name=name, ttl=settings.CACHE_REDIS_TTL)
+
+    # 广播新值（通知其他节点更新本地缓存），指定解码类型时其他节点无法还原，回退为失效
+    if settings.CACHE_LOCAL_ENABLED:
+        for cache_key, serialized_result in serialized_results.items():
+            if options.codec.decode_type is Any:
+                await cache_pubsub_manager.publish_put(cache_key, serialized_result, entry=options.refreshable)
+            else:
+                await cache_pubsub_manager.publish_invalidation(cache_key)
+
+
+async def _invalidate_namespace(name: str) -> None:
+    """
+    失效缓存命名空间（L1 + L2），并通知其他节点
+
+    :param name: 缓存名称
+    :return:
+    """
+    try:
+        if settings.CACHE_LOCAL_ENABLED:
+            local_cache_manager.delete_prefix(name)
+            await cache_pubsub_manager.publish_invalidation(name, is_delete_prefix=True)
+        await cache_shard_manager.delete_namespace(name)
+        inc_cache_invalidation(cache_name=name, invalidate_type='prefix')
+    except Exception as e:
+        log.error(f'[Cache] INVALIDATE error: {e}')
+
+
+def _run_after_commit(db: AsyncSession, func: Callable[[], Awaitable[None]]) -> None:
+    """
+    数据库事务提交后在后台执行，事务回滚时不执行
+
+    :param db: 数据库会话
+    :param func: 执行函数
+    :return:
+    """
+
+    def after_commit(_session: Session) -> None:
+        task = asyncio.get_running_loop().create_task(func())
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
+    event.listen(db.sync_session, 'after_commit', after_commit, once=True)
+
+
+def cache_put(
+    name: str,
+    *,
+    loader: Callable[..., Awaitable[Any]],
+    key_builder: Callable[[Any], Any],
+    evict_key_builder: Callable[[Any], Any] | None = None,
+    soft_ttl: int | None = None,
+    early_refresh: bool = False,
+    codec: CacheCodec | None = None,
+) -> Callable[[Callable[P, T]], Callable[P, T]]:
+    """
+    缓存写入装饰器
+
+    方法参数中的 db 所在事务提交后，通过 loader 使用独立的数据库会话重新加载受影响的数据，写入 L1、L2
+    并将新值广播到其他节点的本地缓存，更新后的首次读取不会未命中；事务回滚时不写入缓存。
+    db 不在事务中时，方法执行后立即写入。写入失败时回退为失效整个命名空间
+
+    同一命名空间下无法按 Key 更新的列表缓存通过 evict_key_builder 失效，方法执行前后加载的对象所对应的 Key 均会失效
+
+    :param name: 缓存名称（通常为缓存 Key 前缀）
+    :param loader: 数据加载函数，接收与被装饰方法相同的参数，返回单个对象或对象列表，返回 None 时不写入
+    :param key_builder: 根据加载的对象生成缓存 Key（不含缓存名称）
+    :param evict_key_builder: 根据加载的对象生成需失效的缓存 Key（不含缓存名称），返回 None 时不失效
+    :param soft_ttl: 软过期时间（秒），需与对应 cached 保持一致
+    :param early_refresh: 是否在过期前按概率提前刷新（XFetch），需与对应 cached 保持一致
+    :param codec: 缓存编解码器，需与对应 cached 保持一致
+    :return:
+    """
+    options = _CacheOptions(
+        name=name,
+        soft_ttl=soft_ttl,
+        early_refresh=early_refresh,
+        codec=codec or default_cache_codec,
+    )
+
+    def decorator(func: Callable[P, T]) -> Callable[P, T]:
+        @functools.wraps(func)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+            # 更新前的对象所对应的列表缓存同样需要失效
+            evict_keys = set()
+            if evict_key_builder is not None:
+                evict_keys.update(evict_key_builder(item) for item in _as_items(await loader(*args, **kwargs)))
 
-            # 缓存未命中
             result = await func(*args, **kwargs)
 
-            if result is not None:
-                try:
-                    serialized_result = _serialize_result(result)
-                    deserialized_result = _deserialize_result(serialized_result)
+            async def put(**call_kwargs: Any) -> None:
+                start_time = time.perf_counter()
+                items = _as_items(await loader(*args, **call_kwargs))
+                delta = time.perf_counter() - start_time
+                if evict_key_builder is not None:
+                    evict_keys.update(evict_key_builder(item) for item in items)
+                await _put_cache(items, options=options, key_builder=key_builder, evict_keys=evict_keys, delta=delta)
 
-                    # 回填 L1
-                    if settings.CACHE_LOCAL_ENABLED:
-                        local_cache_manager.set(cache_key, deserialized_result)
+            async def put_after_commit() -> None:
+                try:
+                    async with async_db_session() as db:
+                        await put(**{**kwargs, 'db': db})
+                except Exception as e:
+                    log.error(f'[Cache] PUT error: {e}')
+                    await _invalidate_namespace(name)
 
-                    # 回填 L2
-                    if settings.CACHE_REDIS_TTL:
-                        await redis_client.setex(cache_key, settings.CACHE_REDIS_TTL, serialized_result)
-                    else:
-                        await redis_client.set(cache_key, serialized_result)
+            db = kwargs.get('db')
+            if isinstance(db, AsyncSession) and db.in_transaction():
+                _run_after_commit(db, put_after_commit)
+            else:
+                try:
+                    await put(**kwargs)
                 except Exception as e:
-                    log.warning(f'[Cache] SET error: {e}')
+                    log.error(f'[Cache] PUT error: {e}')
+                    await _invalidate_namespace(name)
 
             return result
 
@@ -167,6 +950,27 @@ def cached(  # noqa: C901
     return decorator
 
 
+async def delete_cache(name: str, *keys: Any) -> None:
+    """
+    删除指定缓存，用于失效 Key 无法从方法参数构建的场景
+
+    :param name: 缓存名称（通常为缓存 Key 前缀）
+    :param keys: 缓存 Key（不含缓存名称）
+    :return:
+    """
+    cache_keys = [f'{name}:{key}' for key in keys]
+    if not cache_keys:
+        return
+
+    if settings.CACHE_LOCAL_ENABLED:
+        for cache_key in cache_keys:
+            local_cache_manager.delete(cache_key)
+            await cache_pubsub_manager.publish_invalidation(cache_key)
+
+    await cache_shard_manager.delete_keys(name, cache_keys)
+    inc_cache_invalidation(cache_name=name, invalidate_type='key')
+
+
 def cache_invalidate(  # noqa: C901
     name: str,
     *,
@@ -214,9 +1018,11 @@ def cache_invalidate(  # noqa: C901
 
                 # L2 缓存失效
                 if invalidate_key == name:
-                    await redis_client.delete_prefix(invalidate_key)
+                    await cache_shard_manager.delete_namespace(invalidate_key)
                 else:
-                    await redis_client.delete(invalidate_key)
+                    await cache_shard_manager.delete_keys(name, [invalidate_key])
+
+                inc_cache_invalidation(cache_name=name, invalidate_type='prefix' if invalidate_key == name else 'key')
 
             except Exception as e:
                 log.error(f'[Cache] INVALIDATE error: {e}')
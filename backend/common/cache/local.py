@@ -1,31 +1,302 @@
+import heapq
+import operator
+import time
+
+from collections.abc import Iterator
 from typing import Any
 
 import cachebox
 
 from backend.core.conf import settings
 
+_UINT64_MASK = 0xFFFFFFFFFFFFFFFF
+
+
+class _FrequencySketch:
+    """
+    访问频率估算（Count-Min Sketch）
+
+    每个计数器上限为 15，累计记录次数达到采样阈值后所有计数器减半，使频率随时间衰减
+    """
+
+    _seeds = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0x27D4EB2F165667C5)
+    _halve_table = bytes(i >> 1 for i in range(256))
+
+    def __init__(self, capacity: int) -> None:
+        width = 1 << max(capacity, 16).bit_length()
+        self._mask = width - 1
+        self._tables = [bytearray(width) for _ in self._seeds]
+        self._sample_size = width * 10
+        self._additions = 0
+
+    def _indexes(self, key: str) -> Iterator[int]:
+        """计算 Key 在各行中的计数器位置"""
+        h = hash(key) & _UINT64_MASK
+        for seed in self._seeds:
+            yield ((h * seed) & _UINT64_MASK) >> 32 & self._mask
+
+    def increment(self, key: str) -> None:
+        """
+        记录一次访问
+
+        :param key: 缓存 Key
+        :return:
+        """
+        for table, index in zip(self._tables, self._indexes(key), strict=True):
+            if table[index] < 15:
+                table[index] += 1
+        self._additions += 1
+        if self._additions >= self._sample_size:
+            self._tables = [table.translate(self._halve_table) for table in self._tables]
+            self._additions //= 2
+
+    def frequency(self, key: str) -> int:
+        """
+        获取估算访问频率
+
+        :param key: 缓存 Key
+        :return:
+        """
+        return min(table[index] for table, index in zip(self._tables, self._indexes(key), strict=True))
+
 
 class LocalCacheManager:
-    """本地缓存管理器"""
+    """
+    本地缓存管理器
+
+    维护按 ':' 分段的前缀索引，前缀删除仅处理匹配的 Key；淘汰和过期的 Key 无回调通知，
+    将在前缀删除时惰性清理，并在索引明显大于缓存时整体重建
+
+    按缓存值序列化后的大小估算内存，超过全局内存上限或命名空间配额时按写入顺序淘汰；
+    新 Key 需要淘汰其他 Key 时，仅当其访问频率高于待淘汰 Key 时才写入（TinyLFU 准入）
+    """
+
+    def __init__(self, maxsize: int | None = None, *, ttl: float | None = None, max_memory: int | None = None) -> None:
+        """
+        初始化本地缓存管理器
 
-    def __init__(self) -> None:
-        self.hot_cache: cachebox.TTLCache = cachebox.TTLCache(
-            settings.CACHE_LOCAL_MAXSIZE, ttl=settings.CACHE_LOCAL_TTL
-        )
+        :param maxsize: 最大缓存数量，为空时使用 CACHE_LOCAL_MAXSIZE
+        :param ttl: 默认过期时间（秒），为空时使用 CACHE_LOCAL_TTL
+        :param max_memory: 估算内存上限（bytes），为空时使用 CACHE_LOCAL_MAX_MEMORY
+        :return:
+        """
+        maxsize = maxsize or settings.CACHE_LOCAL_MAXSIZE
+        self.ttl = ttl or settings.CACHE_LOCAL_TTL
+        self.max_memory = settings.CACHE_LOCAL_MAX_MEMORY if max_memory is None else max_memory
+        self.hot_cache: cachebox.VTTLCache = cachebox.VTTLCache(maxsize)
+        self._prefix_index: dict[str, set[str]] = {}
+        self._indexed_keys: set[str] = set()
+        self._hits: dict[str, int] = {}
+        # 按写入顺序记录，用于选择淘汰的 Key
+        self._sizes: dict[str, int] = {}
+        self._memory: int = 0
+        self._key_namespaces: dict[str, str] = {}
+        self._namespace_keys: dict[str, dict[str, None]] = {}
+        self._namespace_memory: dict[str, int] = {}
+        self._sketch = _FrequencySketch(maxsize)
+        self.namespaces: set[str] = set(settings.CACHE_LOCAL_NAMESPACE_QUOTAS)
+        # 不写入快照的命名空间
+        self._snapshot_excluded: set[str] = set()
+        # 失效通知中断期间绕过本地缓存，避免读取到其他节点已失效的缓存
+        self.bypass: bool = False
+
+    @staticmethod
+    def _iter_prefixes(key: str) -> Iterator[str]:
+        """
+        遍历 Key 的所有分段前缀（包含 Key 本身）
+
+        :param key: 缓存 Key
+        :return:
+        """
+        index = key.find(':')
+        while index != -1:
+            yield key[:index]
+            index = key.find(':', index + 1)
+        yield key
+
+    def _index_add(self, key: str) -> None:
+        """添加 Key 到前缀索引"""
+        if key in self._indexed_keys:
+            return
+        self._indexed_keys.add(key)
+        for prefix in self._iter_prefixes(key):
+            self._prefix_index.setdefault(prefix, set()).add(key)
+
+    def _index_remove(self, key: str) -> None:
+        """从前缀索引中移除 Key"""
+        if key not in self._indexed_keys:
+            return
+        self._indexed_keys.discard(key)
+        self._hits.pop(key, None)
+        self._account_remove(key)
+        for prefix in self._iter_prefixes(key):
+            keys = self._prefix_index.get(prefix)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._prefix_index[prefix]
+
+    def _maybe_rebuild_index(self) -> None:
+        """索引中残留的淘汰或过期 Key 过多时重建索引"""
+        if len(self._indexed_keys) <= max(len(self.hot_cache) * 2, settings.CACHE_LOCAL_INDEX_REBUILD_MIN):
+            return
+        keys = list(self.hot_cache.keys())
+        self._prefix_index.clear()
+        self._indexed_keys.clear()
+        for key in keys:
+            self._index_add(key)
+        self._hits = {key: hits for key, hits in self._hits.items() if key in self._indexed_keys}
+        for key in [key for key in self._sizes if key not in self._indexed_keys]:
+            self._account_remove(key)
+
+    def _match_namespace(self, key: str) -> str:
+        """
+        匹配 Key 所属的命名空间（最长匹配），未匹配时返回空字符串
+
+        :param key: 缓存 Key
+        :return:
+        """
+        namespace = ''
+        for prefix in self._iter_prefixes(key):
+            if prefix in self.namespaces:
+                namespace = prefix
+        return namespace
+
+    def _account_add(self, key: str, size: int) -> None:
+        """记录 Key 的估算内存"""
+        namespace = self._match_namespace(key)
+        self._sizes[key] = size
+        self._memory += size
+        self._key_namespaces[key] = namespace
+        self._namespace_keys.setdefault(namespace, {})[key] = None
+        self._namespace_memory[namespace] = self._namespace_memory.get(namespace, 0) + size
+
+    def _account_remove(self, key: str) -> None:
+        """移除 Key 的估算内存"""
+        size = self._sizes.pop(key, 0)
+        self._memory -= size
+        namespace = self._key_namespaces.pop(key, None)
+        if namespace is None:
+            return
+        keys = self._namespace_keys[namespace]
+        keys.pop(key, None)
+        if keys:
+            self._namespace_memory[namespace] -= size
+        else:
+            del self._namespace_keys[namespace]
+            del self._namespace_memory[namespace]
+
+    def _next_victim(self, namespace: str, size: int) -> str | None:
+        """
+        获取写入新值前需淘汰的 Key，优先淘汰超出配额的命名空间中最早写入的 Key
+
+        :param namespace: 新值所属命名空间
+        :param size: 新值估算大小
+        :return: 无需淘汰或没有可淘汰的 Key 时返回 None
+        """
+        quota = settings.CACHE_LOCAL_NAMESPACE_QUOTAS.get(namespace)
+        if quota and self._namespace_memory.get(namespace, 0) + size > quota:
+            keys = self._namespace_keys.get(namespace)
+            if keys:
+                return next(iter(keys))
+        if self.max_memory and self._memory + size > self.max_memory:
+            return next(iter(self._sizes), None)
+        return None
+
+    def _fits(self, namespace: str, size: int) -> bool:
+        """
+        判断缓存值是否未超过全局内存上限和命名空间配额
+
+        :param namespace: 缓存值所属命名空间
+        :param size: 缓存值估算大小
+        :return:
+        """
+        quota = settings.CACHE_LOCAL_NAMESPACE_QUOTAS.get(namespace)
+        return not ((quota and size > quota) or (self.max_memory and size > self.max_memory))
+
+    def _admit(self, key: str, namespace: str, size: int) -> bool:
+        """
+        判断新 Key 是否允许写入
+
+        :param key: 缓存 Key
+        :param namespace: 缓存值所属命名空间
+        :param size: 缓存值估算大小
+        :return:
+        """
+        while (victim := self._next_victim(namespace, size)) is not None:
+            # 已被 VTTLCache 淘汰或过期的 Key 直接清理，无需比较
+            if victim not in self.hot_cache:
+                self._index_remove(victim)
+                continue
+            return self._sketch.frequency(key) > self._sketch.frequency(victim)
+        return True
+
+    def _evict(self, namespace: str, size: int) -> None:
+        """
+        淘汰 Key 直至新值可以写入
+
+        :param namespace: 缓存值所属命名空间
+        :param size: 缓存值估算大小
+        :return:
+        """
+        while (victim := self._next_victim(namespace, size)) is not None:
+            self.delete(victim)
+
+    def register_namespace(self, name: str, *, snapshot: bool = True) -> None:
+        """
+        登记缓存命名空间，用于统计
+
+        :param name: 缓存名称
+        :param snapshot: 是否写入快照，缓存值无法按 msgpack 还原（如指定解码类型）时需关闭
+        :return:
+        """
+        self.namespaces.add(name)
+        if not snapshot:
+            self._snapshot_excluded.add(name)
 
     def get(self, key: str) -> Any:
         """获取缓存"""
+        if self.bypass:
+            return None
+        self._sketch.increment(key)
         try:
-            return self.hot_cache[key]
+            value = self.hot_cache[key]
         except KeyError:
             return None
+        self._hits[key] = self._hits.get(key, 0) + 1
+        return value
+
+    def set(self, key: str, value: Any, *, size: int = 0, ttl: float | None = None) -> None:
+        """
+        设置缓存
 
-    def set(self, key: str, value: Any) -> None:
-        """设置缓存"""
-        self.hot_cache[key] = value
+        :param key: 缓存 Key
+        :param value: 缓存值
+        :param size: 缓存值序列化后的大小（bytes），用于内存估算
+        :param ttl: 过期时间（秒），为空时使用默认过期时间
+        :return:
+        """
+        if self.bypass:
+            return
+        namespace = self._match_namespace(key)
+        if not self._fits(namespace, size):
+            # 超过上限的新值不写入，已有的旧值同时移除
+            self.delete(key)
+            return
+        if key in self._indexed_keys:
+            # 更新已有 Key 时先移除旧值的估算内存，并移至写入顺序末尾
+            self._account_remove(key)
+        elif not self._admit(key, namespace, size):
+            return
+        self._evict(namespace, size)
+        self.hot_cache.insert(key, value, ttl=ttl or self.ttl)
+        self._index_add(key)
+        self._account_add(key, size)
+        self._maybe_rebuild_index()
 
     def delete(self, key: str) -> bool:
         """删除缓存"""
+        self._index_remove(key)
         try:
             del self.hot_cache[key]
         except KeyError:
@@ -35,22 +306,99 @@ class LocalCacheManager:
     def clear(self) -> None:
         """清空缓存"""
         self.hot_cache.clear()
+        self._prefix_index.clear()
+        self._indexed_keys.clear()
+        self._hits.clear()
+        self._sizes.clear()
+        self._memory = 0
+        self._key_namespaces.clear()
+        self._namespace_keys.clear()
+        self._namespace_memory.clear()
 
     def delete_prefix(self, prefix: str, exclude: str | list[str] | None = None) -> None:
         """
         删除指定前缀的缓存
 
-        :param prefix: 要删除的键前缀
+        :param prefix: 要删除的键前缀，按 ':' 分段匹配
         :param exclude: 要排除的键或键列表
         :return:
         """
         exclude_set = set(exclude) if isinstance(exclude, list) else {exclude} if isinstance(exclude, str) else set()
-        for key in list(self.hot_cache.keys()):
-            if key.startswith(prefix) and key not in exclude_set:
-                try:
-                    del self.hot_cache[key]
-                except KeyError:
-                    pass
+        keys = self._prefix_index.get(prefix.rstrip(':'))
+        if not keys:
+            return
+        for key in list(keys):
+            if key not in exclude_set:
+                self.delete(key)
+
+    def dump(self) -> list[tuple[str, Any, float, int]]:
+        """
+        导出本地缓存，跳过不写入快照的命名空间及未登记命名空间的缓存
+
+        :return: [(缓存 Key, 缓存值, 过期时间戳, 估算大小)]
+        """
+        now = time.time()
+        excluded = self._snapshot_excluded | {''}
+        return [
+            (key, value, now + expire, self._sizes.get(key, 0))
+            for key, value, expire in self.hot_cache.items_with_expire()
+            if self._match_namespace(key) not in excluded
+        ]
+
+    def load(self, entries: list[tuple[str, Any, float, int]]) -> int:
+        """
+        导入本地缓存，按过期时间戳恢复剩余过期时间，跳过已过期的缓存
+
+        :param entries: [(缓存 Key, 缓存值, 过期时间戳, 估算大小)]
+        :return: 导入的缓存数量
+        """
+        count = 0
+        for key, value, expire_at, size in entries:
+            ttl = expire_at - time.time()
+            if ttl > 0:
+                self.set(key, value, size=size, ttl=ttl)
+                count += 1
+        return count
+
+    def get_stats(self, top: int = 20) -> dict[str, Any]:
+        """
+        获取本地缓存统计信息
+
+        :param top: 返回访问次数最多的 Key 数量
+        :return:
+        """
+        namespaces = []
+        for name in sorted(self.namespaces):
+            keys = self._prefix_index.get(name, set())
+            namespaces.append({
+                'name': name,
+                'keys': len(keys),
+                'hits': sum(self._hits.get(key, 0) for key in keys),
+                'memory': sum(self._sizes.get(key, 0) for key in keys),
+                'quota': settings.CACHE_LOCAL_NAMESPACE_QUOTAS.get(name),
+            })
+
+        top_keys = [
+            {'key': key, 'hits': hits, 'size': self._sizes.get(key, 0)}
+            for key, hits in heapq.nlargest(top, self._hits.items(), key=operator.itemgetter(1))
+            if key in self.hot_cache
+        ]
+
+        return {
+            'size': len(self.hot_cache),
+            'maxsize': self.hot_cache.maxsize,
+            'memory': self._memory,
+            'max_memory': self.max_memory,
+            'namespaces': namespaces,
+            'top_keys': top_keys,
+        }
 
 
 local_cache_manager = LocalCacheManager()
+
+# 已验证 token 的缓存，与通用本地缓存隔离，避免认证请求的大量 token 挤占业务缓存
+token_cache_manager = LocalCacheManager(
+    settings.TOKEN_LOCAL_CACHE_MAXSIZE,
+    ttl=settings.TOKEN_LOCAL_CACHE_TTL,
+    max_memory=settings.TOKEN_LOCAL_CACHE_MAX_MEMORY,
+)
@@ -1,101 +1,365 @@
 import asyncio
+import base64
+import itertools
 import json
+import uuid
 
-from backend.common.cache.local import local_cache_manager
+from redis.exceptions import ResponseError
+
+from backend.common.cache.codec import default_cache_codec
+from backend.common.cache.local import local_cache_manager, token_cache_manager
+from backend.common.cache.shard import cache_shard_manager
 from backend.common.log import log
 from backend.core.conf import settings
-from backend.database.redis import RedisCli, redis_client
+from backend.database.redis import RedisCli, redis_cache_client
 
 
 class CachePubSubManager:
-    """缓存 Pub/Sub 管理器"""
+    """
+    缓存失效通知管理器
+
+    失效通知写入 Redis Stream，各节点记录最后消费的消息 ID，重连后从该 ID 继续消费以补齐遗漏的通知；
+    若遗漏的通知已被裁剪，则清空本地缓存。短时间内的多次失效会合并为一条消息发布；
+    缓存写入通知携带新值，其他节点直接更新本地缓存
+    """
 
     _pubsub_task: asyncio.Task | None = None
+    _flush_task: asyncio.Task | None = None
+    _node_id: str = uuid.uuid4().hex
+    _pending_keys: set[str] = set()
+    _pending_prefixes: set[str] = set()
+    _pending_puts: dict[str, tuple[str, bool]] = {}
+    _last_id: str | None = None
 
-    @staticmethod
-    async def publish_invalidation(key: str, *, is_delete_prefix: bool) -> None:
+    @classmethod
+    async def publish_invalidation(cls, key: str, *, is_delete_prefix: bool = False) -> None:
         """
-        发布缓存失效通知
+        发布缓存失效通知（合并窗口内的通知将批量发布）
 
         :param key: 缓存键
         :param is_delete_prefix: 是否删除符合前缀的所有缓存
         :return:
         """
+        if is_delete_prefix:
+            cls._pending_prefixes.add(key)
+            cls._pending_puts = {
+                put_key: put
+                for put_key, put in cls._pending_puts.items()
+                if not (put_key == key or put_key.startswith(f'{key}:'))
+            }
+        else:
+            cls._pending_keys.add(key)
+            cls._pending_puts.pop(key, None)
+
+        cls._schedule_flush()
+
+    @classmethod
+    async def publish_put(cls, key: str, value: bytes, *, entry: bool = False) -> None:
+        """
+        发布缓存写入通知，超过 CACHE_PUT_BROADCAST_MAX_SIZE 的新值仅发布失效通知
+
+        :param key: 缓存键
+        :param value: 已打包的缓存值
+        :param entry: 是否为可刷新缓存条目
+        :return:
+        """
+        if len(value) > settings.CACHE_PUT_BROADCAST_MAX_SIZE:
+            await cls.publish_invalidation(key)
+            return
+
+        cls._pending_keys.discard(key)
+        cls._pending_puts[key] = (base64.b64encode(value).decode(), entry)
+        cls._schedule_flush()
+
+    @classmethod
+    def _schedule_flush(cls) -> None:
+        """在合并窗口结束后发布"""
+        if cls._flush_task is None or cls._flush_task.done():
+            cls._flush_task = asyncio.create_task(cls._flush_later())
+
+    @staticmethod
+    def _get_retry_delay(attempts: int) -> float:
+        """
+        获取重连或重新发布的延迟，按指数增长
+
+        :param attempts: 连续失败次数
+        :return:
+        """
+        return min(
+            settings.CACHE_PUBSUB_RECONNECT_DELAY * 2 ** (attempts - 1), settings.CACHE_PUBSUB_RECONNECT_MAX_DELAY
+        )
+
+    @classmethod
+    async def _flush_later(cls) -> None:
+        """等待合并窗口结束后发布，发布失败时按指数退避重试"""
+        await asyncio.sleep(settings.CACHE_INVALIDATION_BATCH_INTERVAL)
+        attempts = 0
+        while not await cls.flush():
+            attempts += 1
+            await asyncio.sleep(cls._get_retry_delay(attempts))
+
+    @classmethod
+    def _requeue(cls, prefixes: set[str], keys: set[str], puts: dict[str, tuple[str, bool]]) -> None:
+        """
+        将发布失败的通知放回待发布队列，与此后新增的通知合并
+
+        :param prefixes: 失效前缀
+        :param keys: 失效键
+        :param puts: 缓存写入
+        :return:
+        """
+        newer_prefixes = cls._pending_prefixes
+
+        def is_covered(key: str) -> bool:
+            return any(key == prefix or key.startswith(f'{prefix}:') for prefix in newer_prefixes)
+
+        # 此后新增的失效和写入通知更新，优先保留
+        cls._pending_puts = {
+            key: put
+            for key, put in puts.items()
+            if key not in cls._pending_keys and key not in cls._pending_puts and not is_covered(key)
+        } | cls._pending_puts
+        cls._pending_keys |= {key for key in keys if key not in cls._pending_puts}
+        cls._pending_prefixes = prefixes | newer_prefixes
+
+    @classmethod
+    async def flush(cls) -> bool:
+        """
+        发布合并后的缓存失效通知，失败时通知放回待发布队列
+
+        :return: 是否已发布或无需发布
+        """
+        prefixes = cls._pending_prefixes
+        keys = cls._pending_keys
+        puts = cls._pending_puts
+        cls._pending_prefixes = set()
+        cls._pending_keys = set()
+        cls._pending_puts = {}
+        if not prefixes and not keys and not puts:
+            return True
+
+        # 已被前缀覆盖的键无需重复通知
+        keys = {key for key in keys if not any(key == prefix or key.startswith(f'{prefix}:') for prefix in prefixes)}
+
+        try:
+            await redis_cache_client.xadd(
+                settings.CACHE_INVALIDATION_STREAM,
+                {
+                    'node': cls._node_id,
+                    'keys': json.dumps(sorted(keys)),
+                    'prefixes': json.dumps(sorted(prefixes)),
+                    'puts': json.dumps(puts),
+                },
+                maxlen=settings.CACHE_INVALIDATION_STREAM_MAXLEN,
+                approximate=True,
+            )
+        except Exception as e:
+            log.warning(f'[CachePubSub] 发布通知失败，稍后重试: {e}')
+            cls._requeue(prefixes, keys, puts)
+            return False
+        return True
+
+    @staticmethod
+    def _parse_stream_id(stream_id: str) -> tuple[int, int]:
+        """
+        解析 Stream 消息 ID
+
+        :param stream_id: 消息 ID
+        :return:
+        """
+        timestamp, _, sequence = stream_id.partition('-')
+        return int(timestamp), int(sequence or 0)
+
+    @classmethod
+    async def _is_missed(cls, stream_client: RedisCli, last_id: str) -> bool:
+        """
+        检查最后消费的通知 ID 之后是否有通知已被删除或裁剪
+
+        :param stream_client: Redis 客户端
+        :param last_id: 最后消费的通知 ID
+        :return:
+        """
+        try:
+            info = await stream_client.xinfo_stream(settings.CACHE_INVALIDATION_STREAM)
+        except ResponseError:
+            # Stream 不存在时无法确认期间是否有过通知
+            return last_id != '0-0'
+
+        last = cls._parse_stream_id(last_id)
+        # 之后没有新的通知
+        if cls._parse_stream_id(info['last-generated-id']) <= last:
+            return False
+        # XDEL 删除的最大 ID（Redis 7.0+）
+        max_deleted_id = info.get('max-deleted-entry-id')
+        if max_deleted_id is not None and cls._parse_stream_id(max_deleted_id) > last:
+            return True
+        # 按长度裁剪不会更新 max-deleted-entry-id，首条通知晚于最后消费的 ID 时视为已裁剪
+        first_entry = info.get('first-entry')
+        return first_entry is None or cls._parse_stream_id(first_entry[0]) > last
+
+    @classmethod
+    def _handle_message(cls, fields: dict[str, str]) -> None:
+        """
+        处理缓存失效通知
+
+        :param fields: 消息内容
+        :return:
+        """
+        # 发布节点已在本地完成失效
+        if fields.get('node') == cls._node_id:
+            return
+        prefixes = json.loads(fields.get('prefixes', '[]'))
+        keys = json.loads(fields.get('keys', '[]'))
+        puts = json.loads(fields.get('puts', '{}'))
+        # 已验证 token 的缓存同样通过失效通知同步
+        for manager in (local_cache_manager, token_cache_manager):
+            for prefix in prefixes:
+                manager.delete_prefix(prefix)
+            for key in keys:
+                manager.delete(key)
+        for key, (value, entry) in puts.items():
+            cls._apply_put(key, value, entry=entry)
+
+        # 其他节点的失效和写入同样无法送达已摘除的分片
+        if cache_shard_manager.degraded:
+            for prefix in prefixes:
+                cache_shard_manager.record_invalidation(prefix)
+            for key in itertools.chain(keys, puts):
+                cls._record_shard_invalidation(key)
+
+    @staticmethod
+    def _record_shard_invalidation(key: str) -> None:
+        """
+        记录已摘除分片错过的缓存失效，按最长匹配的缓存命名空间登记
+
+        :param key: 缓存键
+        :return:
+        """
+        name = max(
+            (namespace for namespace in local_cache_manager.namespaces if key.startswith(f'{namespace}:')),
+            key=len,
+            default=None,
+        )
+        if name is not None:
+            cache_shard_manager.record_invalidation(name, [key])
+
+    @staticmethod
+    def _apply_put(key: str, value: str, *, entry: bool) -> None:
+        """
+        将缓存写入通知携带的新值写入本地缓存，解码失败时删除本地缓存
+
+        :param key: 缓存键
+        :param value: base64 编码的缓存值
+        :param entry: 是否为可刷新缓存条目
+        :return:
+        """
         try:
-            message = json.dumps({'key': key, 'is_delete_prefix': is_delete_prefix})
-            await redis_client.publish(settings.CACHE_PUBSUB_CHANNEL, message)
+            data = base64.b64decode(value)
+            local_cache_manager.set(key, default_cache_codec.decode(data, entry=entry), size=len(data))
         except Exception as e:
-            log.warning(f'[CachePubSub] 发布通知失败: {e}')
+            log.warning(f'[CachePubSub] 缓存写入通知解码失败: {e}')
+            local_cache_manager.delete(key)
 
     @staticmethod
-    async def subscribe_and_listen() -> None:  # noqa: C901
-        """订阅并监听缓存失效通知"""
+    def _set_local_cache_bypass(*, bypass: bool) -> None:
+        """
+        设置是否绕过本地缓存
+
+        :param bypass: 是否绕过
+        :return:
+        """
+        local_cache_manager.bypass = bypass
+        token_cache_manager.bypass = bypass
+
+    @classmethod
+    async def subscribe_and_listen(cls) -> None:  # noqa: C901
+        """订阅并监听缓存失效通知，断开后按指数退避持续重连"""
         reconnect_attempts = 0
 
-        while reconnect_attempts < settings.CACHE_PUBSUB_MAX_RECONNECT_ATTEMPTS:
-            pubsub_client: RedisCli | None = None
-            pubsub = None
+        while True:
+            stream_client: RedisCli | None = None
 
             try:
-                # 使用独立连接
-                pubsub_client = RedisCli()
-                pubsub = pubsub_client.pubsub()
-                await pubsub.subscribe(settings.CACHE_PUBSUB_CHANNEL)
+                # 使用独立连接，阻塞读取不适用熔断
+                stream_client = RedisCli(circuit_breaker=False, pool_name='cache_stream', max_connections=1)
+
+                if cls._last_id is None:
+                    # 首次订阅，从当前最新消息之后开始消费
+                    latest = await stream_client.xrevrange(settings.CACHE_INVALIDATION_STREAM, count=1)
+                    cls._last_id = latest[0][0] if latest else '0-0'
+                # 重连或从快照恢复后，检查遗漏的通知是否已被删除或裁剪
+                elif await cls._is_missed(stream_client, cls._last_id):
+                    log.warning('[CachePubSub] 部分失效通知已被裁剪，清空本地缓存')
+                    local_cache_manager.clear()
+                    token_cache_manager.clear()
 
-                # 发布订阅成功
+                # 订阅成功，之后消费的通知包含断开期间遗漏的通知
                 reconnect_attempts = 0
+                cls._set_local_cache_bypass(bypass=False)
 
-                async for message in pubsub.listen():
-                    if message['type'] == 'message':
-                        try:
-                            data = json.loads(message['data'])
-                            key = data['key']
-                            if not data['is_delete_prefix']:
-                                local_cache_manager.delete(key)
-                            else:
-                                local_cache_manager.delete_prefix(key)
-                        except json.JSONDecodeError as e:
-                            log.warning(f'[CachePubSub] 消息格式错误 {e}')
-                        except Exception as e:
-                            log.error(f'[CachePubSub] 处理通知失败: {e}')
+                while True:
+                    response = await stream_client.xread(
+                        {settings.CACHE_INVALIDATION_STREAM: cls._last_id},
+                        count=settings.CACHE_INVALIDATION_BATCH_SIZE,
+                        block=1000,  # 需小于 REDIS_TIMEOUT
+                    )
+                    for _, messages in response:
+                        for message_id, fields in messages:
+                            try:
+                                cls._handle_message(fields)
+                            except json.JSONDecodeError as e:
+                                log.warning(f'[CachePubSub] 消息格式错误 {e}')
+                            except Exception as e:
+                                log.error(f'[CachePubSub] 处理通知失败: {e}')
+                            cls._last_id = message_id
 
             except asyncio.CancelledError:
                 break
             except Exception as e:
+                # 断开期间无法收到其他节点的失效通知
+                cls._set_local_cache_bypass(bypass=True)
                 reconnect_attempts += 1
-                log.error(
-                    f'[CachePubSub] 订阅异常 ({reconnect_attempts}/{settings.CACHE_PUBSUB_MAX_RECONNECT_ATTEMPTS}): {e}'
-                )
-
-                if reconnect_attempts >= settings.CACHE_PUBSUB_MAX_RECONNECT_ATTEMPTS:
-                    log.error('[CachePubSub] 达到最大重连次数，停止订阅')
-                    break
-
-                await asyncio.sleep(settings.CACHE_PUBSUB_RECONNECT_DELAY)
+                delay = cls._get_retry_delay(reconnect_attempts)
+                log.error(f'[CachePubSub] 订阅异常，{delay} 秒后第 {reconnect_attempts} 次重连: {e}')
+                await asyncio.sleep(delay)
             finally:
-                if pubsub_client:
-                    try:
-                        await pubsub_client.aclose()
-                    except Exception:
-                        pass
-                if pubsub:
+                if stream_client:
                     try:
-                        await pubsub.aclose()
+                        await stream_client.aclose()
                     except Exception:
                         pass
 
     @classmethod
-    def start_listener(cls) -> None:
-        """启动缓存 Pub/Sub 监听器"""
+    def get_last_id(cls) -> str | None:
+        """获取最后消费的失效通知 ID"""
+        return cls._last_id
+
+    @classmethod
+    def start_listener(cls, last_id: str | None = None) -> None:
+        """
+        启动缓存 Pub/Sub 监听器
+
+        :param last_id: 从指定的失效通知 ID 之后开始消费，为空时从最新通知之后开始
+        :return:
+        """
         if not settings.CACHE_LOCAL_ENABLED:
             return
 
         if cls._pubsub_task is None or cls._pubsub_task.done():
+            cls._last_id = last_id
+            # 订阅成功前无法确认本地缓存是否有效
+            cls._set_local_cache_bypass(bypass=True)
             cls._pubsub_task = asyncio.create_task(cls.subscribe_and_listen())
 
     @classmethod
     async def stop_listener(cls) -> None:
         """停止缓存 Pub/Sub 监听器"""
+        # 发布尚未发出的失效通知
+        if cls._flush_task is not None and not cls._flush_task.done():
+            cls._flush_task.cancel()
+        await cls.flush()
+        cls._flush_task = None
+
         if cls._pubsub_task is None:
             return
 
@@ -0,0 +1,408 @@
+import asyncio
+import hashlib
+import itertools
+import uuid
+
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from urllib.parse import unquote, urlparse
+
+from redis.exceptions import ConnectionError, ResponseError, TimeoutError
+
+from backend.common.log import log
+from backend.core.conf import settings
+from backend.database.redis import RedisCircuitOpenError, RedisCli, RedisPoolTimeoutError, redis_cache_client
+
+
+def get_index_key(name: str) -> str:
+    """
+    获取缓存命名空间索引 Key
+
+    :param name: 缓存名称
+    :return:
+    """
+    return f'{settings.CACHE_INDEX_REDIS_PREFIX}:{name}'
+
+
+async def delete_shard_keys(client: RedisCli, name: str, cache_keys: list[str]) -> None:
+    """
+    删除单个分片中的缓存，并从命名空间索引中移除
+
+    :param client: 分片 Redis 客户端
+    :param name: 缓存名称
+    :param cache_keys: 缓存 Key 列表
+    :return:
+    """
+    async with client.batch() as pipe:
+        pipe.delete(*cache_keys)
+        if settings.CACHE_INDEX_ENABLED:
+            pipe.srem(get_index_key(name), *cache_keys)
+
+
+async def delete_shard_namespace(client: RedisCli, name: str, batch_size: int = 1000) -> None:
+    """
+    删除单个分片中缓存命名空间下的所有缓存
+
+    :param client: 分片 Redis 客户端
+    :param name: 缓存名称
+    :param batch_size: 批量删除的大小
+    :return:
+    """
+    if not settings.CACHE_INDEX_ENABLED:
+        await client.delete_prefix(name)
+        return
+
+    # 先将索引原子地移走，失效期间新写入的缓存将登记到新索引中
+    index_key = get_index_key(name)
+    flush_key = f'{index_key}:flush:{uuid.uuid4().hex}'
+    try:
+        await client.rename(index_key, flush_key)
+    except ResponseError:
+        # 索引不存在
+        pass
+    else:
+        batch_keys = []
+        async for cache_key in client.sscan_iter(flush_key, count=batch_size):
+            batch_keys.append(cache_key)
+            if len(batch_keys) >= batch_size:
+                await client.delete(*batch_keys)
+                batch_keys.clear()
+        if batch_keys:
+            await client.delete(*batch_keys)
+
+        await client.delete(flush_key)
+
+    # 启用索引前写入的缓存未登记到索引中，首次失效时回退为 SCAN 前缀匹配
+    scanned_key = f'{index_key}:scanned'
+    if not await client.exists(scanned_key):
+        await client.delete_prefix(name)
+        await client.set(scanned_key, 1)
+
+
+class CacheShardManager:
+    """
+    缓存 L2 分片管理器
+
+    未配置分片时缓存读写使用主 Redis 的缓存连接池；配置分片后按 Rendezvous 哈希将缓存 Key 分配到各分片，
+    分片连续连接异常达到阈值时暂时摘除，其 Key 由得分次高的分片接管。摘除期间记录该分片错过的失效和写入，
+    分片恢复后按命名空间索引删除这些缓存再重新加入。租约锁、失效通知、Token 等仍使用主 Redis
+    """
+
+    def __init__(self) -> None:
+        self._shards: list[tuple[bytes, RedisCli]] = []
+        self._names: dict[RedisCli, str] = {}
+        for url in settings.CACHE_REDIS_SHARDS:
+            name, client = self._create_client(url)
+            self._shards.append((name.encode(), client))
+            self._names[client] = name
+        self._down: set[RedisCli] = set()
+        self._failures: dict[RedisCli, int] = {}
+        # 摘除期间错过的失效和写入 {分片: {缓存名称: 缓存 Key 集合，为 None 时失效整个命名空间}}
+        self._missed: dict[RedisCli, dict[str, set[str] | None]] = {}
+        self._health_task: asyncio.Task | None = None
+
+    @staticmethod
+    def _create_client(url: str) -> tuple[str, RedisCli]:
+        """
+        根据分片地址创建 Redis 客户端
+
+        :param url: 分片地址，如 redis://:password@127.0.0.1:6379/0，TLS 连接使用 rediss://，ACL 用户名写在密码前
+        :return: (分片名称, Redis 客户端)，分片名称不含密码，同时作为哈希标识
+        """
+        parsed = urlparse(url)
+        host = parsed.hostname or settings.REDIS_HOST
+        port = parsed.port or 6379
+        db = int(parsed.path.lstrip('/') or 0)
+        name = f'{host}:{port}/{db}'
+        client = RedisCli(
+            host=host,
+            port=port,
+            password=unquote(parsed.password) if parsed.password else '',
+            db=db,
+            username=unquote(parsed.username) if parsed.username else None,
+            ssl=parsed.scheme == 'rediss',
+            pool_name=f'cache:{name}',
+            max_connections=settings.REDIS_POOL_MAX_CONNECTIONS.get('cache'),
+        )
+        return name, client
+
+    @property
+    def enabled(self) -> bool:
+        """是否启用分片"""
+        return bool(self._shards)
+
+    @property
+    def degraded(self) -> bool:
+        """是否有已摘除的分片"""
+        return bool(self._down)
+
+    @property
+    def clients(self) -> list[RedisCli]:
+        """可用的缓存 Redis 客户端"""
+        if not self._shards:
+            return [redis_cache_client]
+        return [client for _, client in self._shards if client not in self._down]
+
+    def _rank(self, key: str, *, include_down: bool = False) -> RedisCli | None:
+        """
+        按 Rendezvous 哈希获取缓存 Key 所属的分片
+
+        :param key: 缓存 Key
+        :param include_down: 是否包含已摘除的分片
+        :return: 没有可用分片时返回 None
+        """
+        encoded_key = key.encode()
+        client = None
+        best_score = -1
+        for name, shard in self._shards:
+            if not include_down and shard in self._down:
+                continue
+            score = int.from_bytes(hashlib.blake2b(name + encoded_key, digest_size=8).digest(), 'big')
+            if score > best_score:
+                client, best_score = shard, score
+        return client
+
+    def get_client(self, key: str) -> RedisCli:
+        """
+        获取缓存 Key 所在的 Redis 客户端
+
+        :param key: 缓存 Key
+        :return:
+        """
+        if not self._shards:
+            return redis_cache_client
+
+        client = self._rank(key)
+        if client is None:
+            raise ConnectionError('缓存分片均不可用')
+        return client
+
+    def group_keys(self, keys: list[str]) -> dict[RedisCli, list[str]]:
+        """
+        按所在 Redis 客户端分组缓存 Key
+
+        :param keys: 缓存 Key 列表
+        :return:
+        """
+        groups: dict[RedisCli, list[str]] = {}
+        for key in keys:
+            groups.setdefault(self.get_client(key), []).append(key)
+        return groups
+
+    def _mark_down(self, client: RedisCli, reason: str) -> None:
+        """
+        摘除分片，开始记录其错过的失效和写入
+
+        :param client: 分片 Redis 客户端
+        :param reason: 摘除原因
+        :return:
+        """
+        if client is redis_cache_client or client in self._down:
+            return
+        self._down.add(client)
+        self._missed.setdefault(client, {})
+        log.warning(f'[CacheShard] 分片 {self._names[client]} {reason}，暂时摘除')
+
+    def _record(self, client: RedisCli, name: str, cache_keys: list[str] | None) -> None:
+        """
+        记录已摘除分片错过的缓存，数量超过上限时改为失效整个命名空间
+
+        :param client: 分片 Redis 客户端
+        :param name: 缓存名称
+        :param cache_keys: 缓存 Key 列表，为 None 时失效整个命名空间
+        :return:
+        """
+        missed = self._missed.setdefault(client, {})
+        if name in missed and missed[name] is None:
+            return
+        if cache_keys is None:
+            missed[name] = None
+            return
+        keys = missed.setdefault(name, set())
+        keys.update(cache_keys)
+        if len(keys) > settings.CACHE_REDIS_SHARD_MISSED_KEYS_MAX:
+            missed[name] = None
+
+    def record_invalidation(self, name: str, cache_keys: list[str] | None = None) -> None:
+        """
+        记录所有已摘除分片错过的失效
+
+        :param name: 缓存名称
+        :param cache_keys: 缓存 Key 列表，为 None 时失效整个命名空间
+        :return:
+        """
+        for client in self._down:
+            self._record(client, name, cache_keys)
+
+    def record_write(self, name: str, cache_keys: list[str]) -> None:
+        """
+        记录写入到接管分片的缓存，所属分片恢复后其中的旧值需要删除
+
+        :param name: 缓存名称
+        :param cache_keys: 缓存 Key 列表
+        :return:
+        """
+        if not self._down:
+            return
+        for cache_key in cache_keys:
+            client = self._rank(cache_key, include_down=True)
+            if client in self._down:
+                self._record(client, name, [cache_key])
+
+    @asynccontextmanager
+    async def guard(self, client: RedisCli) -> AsyncGenerator[None, None]:
+        """
+        执行分片命令，连续连接异常达到阈值时摘除该分片，熔断拒绝和连接池等待超时不计入
+
+        :param client: Redis 客户端
+        :return:
+        """
+        try:
+            yield
+        except (RedisCircuitOpenError, RedisPoolTimeoutError):
+            raise
+        except (ConnectionError, TimeoutError):
+            failures = self._failures.get(client, 0) + 1
+            self._failures[client] = failures
+            if failures >= settings.CACHE_REDIS_SHARD_FAILURE_THRESHOLD:
+                self._mark_down(client, f'连续 {failures} 次连接异常')
+            raise
+        else:
+            self._failures.pop(client, None)
+
+    async def get_raw(self, key: str) -> bytes | None:
+        """
+        获取未解码的缓存值
+
+        :param key: 缓存 Key
+        :return:
+        """
+        client = self.get_client(key)
+        async with self.guard(client):
+            return await client.get_raw(key)
+
+    async def mget_raw(self, keys: list[str]) -> list[bytes | None]:
+        """
+        批量获取未解码的缓存值，每个分片执行一次 MGET
+
+        :param keys: 缓存 Key 列表
+        :return: 与 keys 顺序一致的缓存值列表
+        """
+        groups = self.group_keys(keys)
+
+        async def mget(client: RedisCli, group: list[str]) -> dict[str, bytes | None]:
+            async with self.guard(client):
+                return dict(zip(group, await client.mget_raw(group), strict=True))
+
+        values: dict[str, bytes | None] = {}
+        for result in await asyncio.gather(*itertools.starmap(mget, groups.items())):
+            values.update(result)
+        return [values[key] for key in keys]
+
+    async def delete_keys(self, name: str, cache_keys: list[str]) -> None:
+        """
+        删除缓存并从命名空间索引中移除，各节点的分片可用状态可能不一致，因此在所有可用分片上执行
+
+        :param name: 缓存名称
+        :param cache_keys: 缓存 Key 列表
+        :return:
+        """
+        self.record_invalidation(name, cache_keys)
+
+        async def delete(client: RedisCli) -> None:
+            async with self.guard(client):
+                await delete_shard_keys(client, name, cache_keys)
+
+        await asyncio.gather(*(delete(client) for client in self.clients))
+
+    async def delete_namespace(self, name: str, batch_size: int = 1000) -> None:
+        """
+        删除缓存命名空间下的所有缓存（所有可用分片）
+
+        启用命名空间索引时仅遍历索引中登记的 Key，否则回退为 SCAN 前缀匹配
+
+        :param name: 缓存名称
+        :param batch_size: 批量删除的大小
+        :return:
+        """
+        self.record_invalidation(name)
+
+        async def delete(client: RedisCli) -> None:
+            async with self.guard(client):
+                await delete_shard_namespace(client, name, batch_size)
+
+        await asyncio.gather(*(delete(client) for client in self.clients))
+
+    async def _ping(self, client: RedisCli) -> None:
+        """
+        检查分片连接，连接失败时摘除
+
+        :param client: 分片 Redis 客户端
+        :return:
+        """
+        try:
+            await client.ping()
+        except Exception as e:
+            self._mark_down(client, f'连接失败: {e}')
+
+    async def _recover(self, client: RedisCli) -> None:
+        """
+        恢复已摘除的分片，删除其错过失效和写入的缓存后重新加入
+
+        :param client: 分片 Redis 客户端
+        :return:
+        """
+        missed = self._missed.setdefault(client, {})
+        try:
+            await client.ping()
+            # 恢复期间新记录的缓存同样需要处理
+            while missed:
+                name, cache_keys = missed.popitem()
+                try:
+                    if cache_keys is None:
+                        await delete_shard_namespace(client, name)
+                    else:
+                        keys = list(cache_keys)
+                        for i in range(0, len(keys), 1000):
+                            await delete_shard_keys(client, name, keys[i : i + 1000])
+                except Exception:
+                    self._record(client, name, None if cache_keys is None else list(cache_keys))
+                    raise
+        except Exception:
+            return
+        self._down.discard(client)
+        self._failures.pop(client, None)
+        self._missed.pop(client, None)
+        log.info(f'[CacheShard] 分片 {self._names[client]} 已恢复')
+
+    async def _check_health(self) -> None:
+        """定期检查已摘除的分片"""
+        while True:
+            await asyncio.sleep(settings.CACHE_REDIS_SHARD_HEALTH_CHECK_INTERVAL)
+            await asyncio.gather(*(self._recover(client) for client in list(self._down)))
+
+    async def init(self) -> None:
+        """初始化缓存分片，不可用的分片将被摘除"""
+        if not self._shards:
+            return
+
+        await asyncio.gather(*(self._ping(client) for _, client in self._shards))
+
+        if self._health_task is None or self._health_task.done():
+            self._health_task = asyncio.create_task(self._check_health())
+
+    async def close(self) -> None:
+        """关闭缓存分片"""
+        if self._health_task is not None and not self._health_task.done():
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+        self._health_task = None
+
+        for _, client in self._shards:
+            await client.aclose()
+
+
+cache_shard_manager = CacheShardManager()
@@ -0,0 +1,59 @@
+import asyncio
+
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+T = TypeVar('T')
+
+
+class SingleFlightManager:
+    """单飞（请求合并）管理器，同一进程内相同 Key 的并发加载只执行一次"""
+
+    def __init__(self) -> None:
+        self._calls: dict[str, asyncio.Task] = {}
+
+    def _done(self, key: str, task: asyncio.Task) -> None:
+        """
+        加载任务完成回调
+
+        :param key: 合并 Key
+        :param task: 加载任务
+        :return:
+        """
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+        # 消费任务异常，避免所有等待者取消后出现未获取异常警告
+        if not task.cancelled():
+            task.exception()
+
+    def submit(self, key: str, func: Callable[[], Awaitable[T]]) -> asyncio.Task:
+        """
+        提交加载函数，相同 Key 已有加载任务时直接返回该任务
+
+        :param key: 合并 Key
+        :param func: 加载函数
+        :return:
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        return task
+
+    async def do(self, key: str, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        执行加载函数，相同 Key 的并发调用共享同一结果
+
+        :param key: 合并 Key
+        :param func: 加载函数
+        :return:
+        """
+        task = self.submit(key, func)
+
+        # 等待者被取消时不影响加载任务，其余等待者仍可获取结果
+        return await asyncio.shield(task)
+
+
+single_flight_manager = SingleFlightManager()
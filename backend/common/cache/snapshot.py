@@ -0,0 +1,176 @@
+import os
+import time
+
+from pathlib import Path
+from typing import Any
+
+from msgspec import Raw, Struct, msgpack
+
+from backend.common.cache.local import local_cache_manager
+from backend.common.cache.pubsub import cache_pubsub_manager
+from backend.common.log import log
+from backend.core.conf import settings
+from backend.core.path_conf import CACHE_SNAPSHOT_FILE
+
+
+class _Snapshot(Struct):
+    """本地缓存快照"""
+
+    version: int
+    stream: str
+    last_id: str
+    created_time: float
+    # [(缓存 Key, msgpack 编码的缓存值, 过期时间戳, 估算大小)]
+    entries: list[tuple[str, Raw, float, int]]
+
+
+def _encode_value(value: Any) -> Raw | None:
+    """
+    按 msgpack 编码缓存值
+
+    :param value: 缓存值
+    :return: 无法编码时返回 None
+    """
+    try:
+        return Raw(msgpack.encode(value))
+    except TypeError:
+        return None
+
+
+class CacheSnapshotManager:
+    """
+    本地缓存快照管理器
+
+    快照记录保存时最后消费的失效通知 ID 作为缓存代数，恢复后监听器从该 ID 继续消费，
+    重放节点停止期间的失效通知；若期间的通知已被裁剪，监听器将清空本地缓存
+
+    快照使用 msgpack 编码，仅包含可按 msgpack 还原的缓存值；每个进程保存各自的快照文件，
+    启动时每个进程认领一个快照恢复
+    """
+
+    _version: int = 2
+
+    def __init__(self, path: Path = CACHE_SNAPSHOT_FILE) -> None:
+        self.path = path
+
+    def _iter_snapshot_files(self) -> list[Path]:
+        """
+        获取所有进程保存的快照文件，按修改时间倒序
+
+        :return:
+        """
+        prefix = f'{self.path.name}.'
+        files = []
+        for file in self.path.parent.glob(f'{prefix}*'):
+            if file.name.removeprefix(prefix).isdigit():
+                try:
+                    files.append((file.stat().st_mtime, file))
+                except FileNotFoundError:
+                    continue
+        return [file for _, file in sorted(files, reverse=True)]
+
+    def _claim(self) -> bytes | None:
+        """
+        认领最新的快照文件并读取，认领后删除，过期的快照文件同时清理
+
+        :return: 快照内容，没有可用快照时返回 None
+        """
+        data = None
+        for file in self._iter_snapshot_files():
+            claimed = file.with_name(f'{self.path.name}.{os.getpid()}.restoring')
+            try:
+                expired = time.time() - file.stat().st_mtime > settings.CACHE_LOCAL_TTL
+                # 已认领快照后保留其余未过期的快照供其他进程恢复
+                if data is not None and not expired:
+                    continue
+                # 通过重命名认领，避免多个进程恢复同一个快照
+                file.rename(claimed)
+            except FileNotFoundError:
+                continue
+
+            try:
+                if data is None and not expired:
+                    data = claimed.read_bytes()
+            except Exception as e:
+                log.warning(f'[CacheSnapshot] 读取快照失败: {e}')
+            finally:
+                claimed.unlink(missing_ok=True)
+        return data
+
+    def save(self) -> None:
+        """保存本地缓存快照"""
+        if not settings.CACHE_LOCAL_ENABLED or not settings.CACHE_LOCAL_SNAPSHOT_ENABLED:
+            return
+
+        # 未消费过失效通知时无法确认缓存代数
+        last_id = cache_pubsub_manager.get_last_id()
+        if last_id is None:
+            return
+
+        entries = [
+            (key, encoded, expire_at, size)
+            for key, value, expire_at, size in local_cache_manager.dump()
+            if (encoded := _encode_value(value)) is not None
+        ]
+
+        snapshot = _Snapshot(
+            version=self._version,
+            stream=settings.CACHE_INVALIDATION_STREAM,
+            last_id=last_id,
+            created_time=time.time(),
+            entries=entries,
+        )
+        path = self.path.with_name(f'{self.path.name}.{os.getpid()}')
+        tmp_path = path.with_name(f'{path.name}.tmp')
+        try:
+            tmp_path.write_bytes(msgpack.encode(snapshot))
+            tmp_path.replace(path)
+        except Exception as e:
+            log.warning(f'[CacheSnapshot] 保存快照失败: {e}')
+            tmp_path.unlink(missing_ok=True)
+        else:
+            log.info(f'[CacheSnapshot] 已保存 {len(entries)} 条本地缓存')
+
+    def restore(self) -> str | None:
+        """
+        恢复本地缓存快照
+
+        :return: 快照对应的失效通知 ID，未恢复时返回 None
+        """
+        if not settings.CACHE_LOCAL_ENABLED or not settings.CACHE_LOCAL_SNAPSHOT_ENABLED:
+            return None
+
+        # 旧版本快照不再读取
+        self.path.unlink(missing_ok=True)
+
+        data = self._claim()
+        if data is None:
+            return None
+
+        try:
+            snapshot = msgpack.decode(data, type=_Snapshot)
+        except Exception as e:
+            log.warning(f'[CacheSnapshot] 读取快照失败: {e}')
+            return None
+
+        if snapshot.version != self._version or snapshot.stream != settings.CACHE_INVALIDATION_STREAM:
+            return None
+
+        elapsed = time.time() - snapshot.created_time
+        if elapsed < 0 or elapsed > settings.CACHE_LOCAL_TTL:
+            return None
+
+        try:
+            count = local_cache_manager.load([
+                (key, msgpack.decode(value), expire_at, size) for key, value, expire_at, size in snapshot.entries
+            ])
+        except Exception as e:
+            log.warning(f'[CacheSnapshot] 恢复快照失败: {e}')
+            local_cache_manager.clear()
+            return None
+
+        log.info(f'[CacheSnapshot] 已恢复 {count} 条本地缓存')
+        return snapshot.last_id
+
+
+cache_snapshot_manager = CacheSnapshotManager()
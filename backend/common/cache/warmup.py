@@ -0,0 +1,97 @@
+import asyncio
+import time
+
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from backend.common.enums import CacheWarmupStatus
+from backend.common.log import log
+from backend.core.conf import settings
+from backend.database.db import async_db_session
+
+WarmupLoader = Callable[..., Awaitable[Any]]
+
+
+class CacheWarmupManager:
+    """
+    缓存预热管理器
+
+    服务通过 register 注册预热加载函数，应用启动后以有限并发执行，全部完成（无论成功与否）后视为就绪
+    """
+
+    def __init__(self) -> None:
+        self._loaders: dict[str, WarmupLoader] = {}
+        self._status: dict[str, CacheWarmupStatus] = {}
+        self._task: asyncio.Task | None = None
+        self.ready: bool = False
+
+    def register(self, name: str, loader: WarmupLoader) -> None:
+        """
+        注册预热加载函数
+
+        :param name: 预热任务名称
+        :param loader: 预热加载函数，通过关键字参数 db 接收独立的数据库会话
+        :return:
+        """
+        self._loaders[name] = loader
+        self._status[name] = CacheWarmupStatus.pending
+
+    async def _run_loader(self, name: str, loader: WarmupLoader, semaphore: asyncio.Semaphore) -> None:
+        """
+        执行预热加载函数
+
+        :param name: 预热任务名称
+        :param loader: 预热加载函数
+        :param semaphore: 并发控制信号量
+        :return:
+        """
+        async with semaphore:
+            start_time = time.perf_counter()
+            try:
+                async with async_db_session() as db:
+                    await asyncio.wait_for(loader(db=db), settings.CACHE_WARMUP_TIMEOUT)
+            except Exception as e:
+                self._status[name] = CacheWarmupStatus.failed
+                log.warning(f'[CacheWarmup] {name} 预热失败: {e!r}')
+            else:
+                self._status[name] = CacheWarmupStatus.success
+                log.info(f'[CacheWarmup] {name} 预热完成，耗时 {round((time.perf_counter() - start_time) * 1000, 3)}ms')
+
+    async def run(self) -> None:
+        """执行所有预热加载函数"""
+        semaphore = asyncio.Semaphore(settings.CACHE_WARMUP_CONCURRENCY)
+        try:
+            await asyncio.gather(*(self._run_loader(name, loader, semaphore) for name, loader in self._loaders.items()))
+        finally:
+            self.ready = True
+
+    def start(self) -> None:
+        """后台启动缓存预热"""
+        if not settings.CACHE_WARMUP_ENABLED or not self._loaders:
+            self.ready = True
+            return
+
+        if self._task is None or self._task.done():
+            self.ready = False
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """停止缓存预热"""
+        if self._task is None:
+            return
+
+        if not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+        self._task = None
+
+    def get_status(self) -> dict[str, str]:
+        """获取各预热任务状态"""
+        return {name: status.value for name, status in self._status.items()}
+
+
+cache_warmup_manager = CacheWarmupManager()
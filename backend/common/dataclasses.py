@@ -62,6 +62,12 @@ class TokenPayload:
     expire_time: datetime
 
 
+@dataclasses.dataclass
+class UserMenuPermission:
+    menu_ids: list[int]
+    perms: frozenset[str]
+
+
 @dataclasses.dataclass
 class UploadUrl:
     url: str
@@ -153,3 +153,19 @@ class LifespanStage(IntEnum):
     core = 0
     plugin = 1
     tail = 2
+
+
+class CacheWarmupStatus(StrEnum):
+    """缓存预热状态"""
+
+    pending = 'pending'
+    success = 'success'
+    failed = 'failed'
+
+
+class RedisCircuitState(StrEnum):
+    """Redis 熔断器状态"""
+
+    closed = 'closed'
+    open = 'open'
+    half_open = 'half_open'
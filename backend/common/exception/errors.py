@@ -91,6 +91,21 @@ class GatewayError(BaseExceptionError):
         super().__init__(msg=msg, data=data, background=background)
 
 
+class ServiceUnavailableError(BaseExceptionError):
+    """服务不可用异常"""
+
+    code = StandardResponseCode.HTTP_503
+
+    def __init__(
+        self,
+        *,
+        msg: str = 'Service Unavailable',
+        data: Any = None,
+        background: BackgroundTask | None = None,
+    ) -> None:
+        super().__init__(msg=msg, data=data, background=background)
+
+
 class AuthorizationError(BaseExceptionError):
     """授权异常"""
 
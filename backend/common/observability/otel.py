@@ -23,7 +23,13 @@ from backend.common.log import log, request_id_filter
 from backend.common.observability.prometheus.config import PROMETHEUS_APP_NAME
 from backend.core.conf import settings
 from backend.database.db import async_engine
-from backend.database.redis import redis_client
+from backend.database.redis import (
+    redis_auth_client,
+    redis_background_client,
+    redis_cache_client,
+    redis_client,
+    redis_limiter_client,
+)
 
 
 def init_resource(service_name: str) -> Resource:
@@ -116,6 +122,7 @@ def init_otel(app: FastAPI) -> None:
     AsyncioInstrumentor().instrument()
     HTTPXClientInstrumentor().instrument()
     LoggingInstrumentor().instrument(set_logging_format=True)
-    RedisInstrumentor.instrument_client(client=redis_client)  # type: ignore
+    for client in (redis_client, redis_auth_client, redis_cache_client, redis_limiter_client, redis_background_client):
+        RedisInstrumentor.instrument_client(client=client)  # type: ignore
     SQLAlchemyInstrumentor().instrument(engine=async_engine.sync_engine)
     FastAPIInstrumentor.instrument_app(app)
@@ -0,0 +1,52 @@
+from prometheus_client import Counter, Histogram
+
+from backend.common.observability.prometheus.config import PROMETHEUS_APP_NAME
+
+_PROMETHEUS_CACHE_REQUEST_COUNTER = Counter(
+    name='fba_cache_request_total',
+    documentation='按缓存名称和结果（l1_hit/l2_hit/miss）统计缓存请求总数',
+    labelnames=['app_name', 'cache_name', 'result'],
+)
+
+_PROMETHEUS_CACHE_LOAD_COST_TIME_HISTOGRAM = Histogram(
+    name='fba_cache_load_cost_time',
+    documentation='按缓存名称统计缓存未命中时数据加载耗时直方图（ms）',
+    labelnames=['app_name', 'cache_name'],
+)
+
+_PROMETHEUS_CACHE_VALUE_SIZE_HISTOGRAM = Histogram(
+    name='fba_cache_value_size',
+    documentation='按缓存名称统计缓存序列化后大小直方图（bytes）',
+    labelnames=['app_name', 'cache_name'],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
+
+_PROMETHEUS_CACHE_INVALIDATION_COUNTER = Counter(
+    name='fba_cache_invalidation_total',
+    documentation='按缓存名称和失效类型（key/prefix）统计缓存失效总数',
+    labelnames=['app_name', 'cache_name', 'invalidate_type'],
+)
+
+
+def inc_cache_request(*, cache_name: str, result: str) -> None:
+    """记录缓存请求总数"""
+    _PROMETHEUS_CACHE_REQUEST_COUNTER.labels(app_name=PROMETHEUS_APP_NAME, cache_name=cache_name, result=result).inc()
+
+
+def observe_cache_load_cost_time(*, cache_name: str, elapsed: float) -> None:
+    """记录缓存数据加载耗时"""
+    _PROMETHEUS_CACHE_LOAD_COST_TIME_HISTOGRAM.labels(app_name=PROMETHEUS_APP_NAME, cache_name=cache_name).observe(
+        round(elapsed * 1000, 3)
+    )
+
+
+def observe_cache_value_size(*, cache_name: str, size: int) -> None:
+    """记录缓存序列化后大小"""
+    _PROMETHEUS_CACHE_VALUE_SIZE_HISTOGRAM.labels(app_name=PROMETHEUS_APP_NAME, cache_name=cache_name).observe(size)
+
+
+def inc_cache_invalidation(*, cache_name: str, invalidate_type: str) -> None:
+    """记录缓存失效总数"""
+    _PROMETHEUS_CACHE_INVALIDATION_COUNTER.labels(
+        app_name=PROMETHEUS_APP_NAME, cache_name=cache_name, invalidate_type=invalidate_type
+    ).inc()
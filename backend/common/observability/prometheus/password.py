@@ -0,0 +1,26 @@
+from prometheus_client import Counter, Gauge
+
+from backend.common.observability.prometheus.config import PROMETHEUS_APP_NAME
+
+_PROMETHEUS_PASSWORD_HASH_TASKS_GAUGE = Gauge(
+    name='fba_password_hash_tasks',
+    documentation='密码哈希线程池任务数',
+    labelnames=['app_name', 'state'],
+)
+
+_PROMETHEUS_PASSWORD_HASH_REJECTED_COUNTER = Counter(
+    name='fba_password_hash_rejected_total',
+    documentation='密码哈希线程池排队已满拒绝总数',
+    labelnames=['app_name'],
+)
+
+
+def observe_password_hash_tasks(*, running: int, queued: int) -> None:
+    """记录密码哈希线程池任务数"""
+    _PROMETHEUS_PASSWORD_HASH_TASKS_GAUGE.labels(app_name=PROMETHEUS_APP_NAME, state='running').set(running)
+    _PROMETHEUS_PASSWORD_HASH_TASKS_GAUGE.labels(app_name=PROMETHEUS_APP_NAME, state='queued').set(queued)
+
+
+def inc_password_hash_rejected() -> None:
+    """记录密码哈希线程池拒绝"""
+    _PROMETHEUS_PASSWORD_HASH_REJECTED_COUNTER.labels(app_name=PROMETHEUS_APP_NAME).inc()
@@ -0,0 +1,47 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+from backend.common.observability.prometheus.config import PROMETHEUS_APP_NAME
+
+_PROMETHEUS_REDIS_POOL_CONNECTIONS_GAUGE = Gauge(
+    name='fba_redis_pool_connections',
+    documentation='按连接池名称统计 Redis 连接池状态',
+    labelnames=['app_name', 'pool_name', 'state'],
+)
+
+_PROMETHEUS_REDIS_POOL_WAIT_TIME_HISTOGRAM = Histogram(
+    name='fba_redis_pool_wait_time',
+    documentation='按连接池名称统计 Redis 连接获取等待耗时直方图（ms）',
+    labelnames=['app_name', 'pool_name'],
+    buckets=(0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000),
+)
+
+_PROMETHEUS_REDIS_POOL_TIMEOUT_COUNTER = Counter(
+    name='fba_redis_pool_timeout_total',
+    documentation='按连接池名称统计 Redis 连接获取超时总数',
+    labelnames=['app_name', 'pool_name'],
+)
+
+
+def observe_redis_pool_connections(*, pool_name: str, max_size: int, in_use: int, idle: int) -> None:
+    """记录 Redis 连接池状态"""
+    _PROMETHEUS_REDIS_POOL_CONNECTIONS_GAUGE.labels(app_name=PROMETHEUS_APP_NAME, pool_name=pool_name, state='max').set(
+        max_size
+    )
+    _PROMETHEUS_REDIS_POOL_CONNECTIONS_GAUGE.labels(
+        app_name=PROMETHEUS_APP_NAME, pool_name=pool_name, state='in_use'
+    ).set(in_use)
+    _PROMETHEUS_REDIS_POOL_CONNECTIONS_GAUGE.labels(
+        app_name=PROMETHEUS_APP_NAME, pool_name=pool_name, state='idle'
+    ).set(idle)
+
+
+def observe_redis_pool_wait_time(*, pool_name: str, elapsed: float) -> None:
+    """记录 Redis 连接获取等待耗时"""
+    _PROMETHEUS_REDIS_POOL_WAIT_TIME_HISTOGRAM.labels(app_name=PROMETHEUS_APP_NAME, pool_name=pool_name).observe(
+        round(elapsed * 1000, 3)
+    )
+
+
+def inc_redis_pool_timeout(*, pool_name: str) -> None:
+    """记录 Redis 连接获取超时"""
+    _PROMETHEUS_REDIS_POOL_TIMEOUT_COUNTER.labels(app_name=PROMETHEUS_APP_NAME, pool_name=pool_name).inc()
@@ -1,11 +1,11 @@
 from __future__ import annotations
 
-from collections.abc import Sequence
+from collections.abc import Awaitable, Callable, Sequence
 from math import ceil
 from typing import TYPE_CHECKING, Any, Generic, TypeVar
 
 from fastapi import Depends, Query
-from fastapi_pagination import pagination_ctx
+from fastapi_pagination import pagination_ctx, resolve_params
 from fastapi_pagination.bases import AbstractPage, AbstractParams, RawParams
 from fastapi_pagination.cursor import CursorParams
 from fastapi_pagination.ext.sqlalchemy import apaginate
@@ -178,6 +178,21 @@ async def cursor_paging_data(db: AsyncSession, select: Select, **kwargs) -> dict
     return page_data
 
 
+async def paging_fetch(fetch: Callable[[int, int], Awaitable[tuple[int, list]]]) -> dict[str, Any]:
+    """
+    基于自定义数据源创建分页数据，适用于 Redis 等非 SQLAlchemy 数据源
+
+    :param fetch: 数据获取函数，接收偏移量和数量，返回数据总条数及当前页数据列表
+    :return:
+    """
+    params: _CustomPageParams = resolve_params()
+    raw_params = params.to_raw_params()
+    total, items = await fetch(raw_params.offset, raw_params.limit)
+    paginated_data = _CustomPage.create(items, params, total=total)
+    page_data = paginated_data.model_dump()
+    return page_data
+
+
 # 分页依赖注入
 DependsPagination = Depends(pagination_ctx(_CustomPage))
 DependsCursorPagination = Depends(pagination_ctx(_CustomCursorPage))
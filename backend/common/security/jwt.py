@@ -1,30 +1,88 @@
+import hashlib
 import json
+import time
 import uuid
 
-from datetime import timedelta
+from datetime import datetime, timedelta
 from typing import Any
 
 from fastapi import Depends, Request
 from fastapi.security import HTTPBearer
 from fastapi.security.utils import get_authorization_scheme_param
-from jose import ExpiredSignatureError, JWTError, jwt
-from pydantic_core import from_json
+from jose import ExpiredSignatureError, JWTError, jwk, jwt
+from jose.backends.base import Key
+from pydantic import ValidationError
+from redis.commands.core import AsyncScript
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.authentication import UnauthenticatedUser
 
 from backend.app.admin.model import User
-from backend.app.admin.schema.user import GetUserInfoWithRelationDetail
+from backend.app.admin.schema.user import GetUserPrincipalDetail
+from backend.common.cache.local import token_cache_manager
+from backend.common.cache.pubsub import cache_pubsub_manager
 from backend.common.context import ctx
 from backend.common.dataclasses import AccessToken, NewToken, RefreshToken, TokenPayload
+from backend.common.enums import StatusType
 from backend.common.exception import errors
+from backend.common.security.revocation import token_revocation_manager
+from backend.common.security.token_script import (
+    ISSUE_ACCESS_TOKEN_SCRIPT,
+    ISSUE_REFRESH_TOKEN_SCRIPT,
+    REVOKE_SESSIONS_SCRIPT,
+    REVOKE_TOKEN_SCRIPT,
+    ROTATE_TOKEN_SCRIPT,
+)
 from backend.core.conf import settings
 from backend.database.db import async_db_session
-from backend.database.redis import redis_client
+from backend.database.redis import redis_auth_client
 from backend.utils.timezone import timezone
 
 # JWT dependency injection
 DependsJwtAuth = Depends(HTTPBearer())
 
+# Token 生命周期脚本，首次执行后通过 EVALSHA 调用
+_issue_access_token_script = redis_auth_client.register_script(ISSUE_ACCESS_TOKEN_SCRIPT)
+_issue_refresh_token_script = redis_auth_client.register_script(ISSUE_REFRESH_TOKEN_SCRIPT)
+_rotate_token_script = redis_auth_client.register_script(ROTATE_TOKEN_SCRIPT)
+_revoke_token_script = redis_auth_client.register_script(REVOKE_TOKEN_SCRIPT)
+_revoke_sessions_script = redis_auth_client.register_script(REVOKE_SESSIONS_SCRIPT)
+
+_request_path_exclude = frozenset(settings.TOKEN_REQUEST_PATH_EXCLUDE)
+_request_path_exclude_patterns = tuple(settings.TOKEN_REQUEST_PATH_EXCLUDE_PATTERN)
+
+
+def is_request_path_excluded(path: str) -> bool:
+    """
+    判断请求路径是否在 JWT / RBAC 路由白名单中
+
+    :param path: 请求路径
+    :return:
+    """
+    if path in _request_path_exclude:
+        return True
+    return any(pattern.match(path) for pattern in _request_path_exclude_patterns)
+
+
+def _load_stateless_keys() -> tuple[Key | None, dict[str, Key]]:
+    """
+    加载无状态模式的签名私钥和验签公钥，验签公钥包含当前私钥对应的公钥及轮换中的历史公钥
+
+    :return:
+    """
+    if not settings.TOKEN_STATELESS_ENABLED:
+        return None, {}
+    if not settings.TOKEN_STATELESS_KID or not settings.TOKEN_STATELESS_PRIVATE_KEY:
+        raise ValueError('启用无状态 Token 模式需配置 TOKEN_STATELESS_KID 和 TOKEN_STATELESS_PRIVATE_KEY')
+
+    algorithm = settings.TOKEN_STATELESS_ALGORITHM
+    signing_key = jwk.construct(settings.TOKEN_STATELESS_PRIVATE_KEY, algorithm)
+    verify_keys = {kid: jwk.construct(key, algorithm) for kid, key in settings.TOKEN_STATELESS_PUBLIC_KEYS.items()}
+    verify_keys[settings.TOKEN_STATELESS_KID] = signing_key.public_key()
+    return signing_key, verify_keys
+
+
+_stateless_signing_key, _stateless_verify_keys = _load_stateless_keys()
+
 
 def jwt_encode(payload: dict[str, Any]) -> str:
     """
@@ -33,9 +91,31 @@ def jwt_encode(payload: dict[str, Any]) -> str:
     :param payload: 载荷
     :return:
     """
+    if _stateless_signing_key is not None:
+        return jwt.encode(
+            payload,
+            _stateless_signing_key,
+            settings.TOKEN_STATELESS_ALGORITHM,
+            headers={'kid': settings.TOKEN_STATELESS_KID},
+        )
     return jwt.encode(payload, settings.TOKEN_SECRET_KEY, settings.TOKEN_ALGORITHM)
 
 
+def _get_verify_key(token: str) -> tuple[str | Key, str]:
+    """
+    获取 token 的验签密钥和算法，无状态模式下按 token 头部 kid 选择公钥
+
+    :param token: JWT token
+    :return:
+    """
+    if not settings.TOKEN_STATELESS_ENABLED:
+        return settings.TOKEN_SECRET_KEY, settings.TOKEN_ALGORITHM
+    key = _stateless_verify_keys.get(jwt.get_unverified_header(token).get('kid'))
+    if key is None:
+        raise errors.TokenError(msg='Token 无效')
+    return key, settings.TOKEN_STATELESS_ALGORITHM
+
+
 def jwt_decode(token: str) -> TokenPayload:
     """
     解析 JWT token
@@ -44,12 +124,8 @@ def jwt_decode(token: str) -> TokenPayload:
     :return:
     """
     try:
-        payload = jwt.decode(
-            token,
-            settings.TOKEN_SECRET_KEY,
-            algorithms=[settings.TOKEN_ALGORITHM],
-            options={'verify_exp': True},
-        )
+        key, algorithm = _get_verify_key(token)
+        payload = jwt.decode(token, key, algorithms=[algorithm], options={'verify_exp': True})
         session_uuid = payload.get('session_uuid')
         user_id = payload.get('sub')
         expire = payload.get('exp')
@@ -66,39 +142,168 @@ def jwt_decode(token: str) -> TokenPayload:
     )
 
 
-async def create_access_token(user_id: int, *, multi_login: bool, **kwargs) -> AccessToken:
+def _encode_token(user_id: int, session_uuid: str, expire_seconds: int) -> tuple[str, datetime]:
     """
-    生成加密 token
+    生成会话 token
 
     :param user_id: 用户 ID
-    :param multi_login: 是否允许多端登录
-    :param kwargs: token 额外信息
+    :param session_uuid: 会话 UUID
+    :param expire_seconds: 过期时间（秒）
     :return:
     """
-    expire = timezone.now() + timedelta(seconds=settings.TOKEN_EXPIRE_SECONDS)
-    session_uuid = str(uuid.uuid4())
-    access_token = jwt_encode({
+    expire = timezone.now() + timedelta(seconds=expire_seconds)
+    token = jwt_encode({
         'session_uuid': session_uuid,
         'exp': timezone.to_utc(expire).timestamp(),
         'sub': str(user_id),
     })
+    return token, expire
 
-    if not multi_login:
-        await redis_client.delete_prefix(f'{settings.TOKEN_REDIS_PREFIX}:{user_id}')
 
-    await redis_client.setex(
-        f'{settings.TOKEN_REDIS_PREFIX}:{user_id}:{session_uuid}',
-        settings.TOKEN_EXPIRE_SECONDS,
-        access_token,
+def _get_session_key(user_id: int) -> str:
+    """
+    获取用户会话索引 Key，索引为有序集合，成员为会话 UUID，分值为会话 token 的最晚过期时间戳
+
+    :param user_id: 用户 ID
+    :return:
+    """
+    return f'{settings.TOKEN_SESSION_REDIS_PREFIX}:{user_id}'
+
+
+def _get_online_session_key(username: str | None = None) -> str:
+    """
+    获取全局在线会话索引 Key，索引为有序集合，成员为 {user_id}:{session_uuid}，分值为访问 token 过期时间戳
+
+    :param username: 用户名，指定时返回该用户名的会话索引
+    :return:
+    """
+    if username is None:
+        return settings.TOKEN_ONLINE_SESSION_REDIS_PREFIX
+    return f'{settings.TOKEN_ONLINE_SESSION_REDIS_PREFIX}:username:{username}'
+
+
+async def _run_token_script(script: AsyncScript, user_id: int, *args: Any, username: str | None = None) -> Any:
+    """
+    执行 token 生命周期脚本
+
+    :param script: Lua 脚本
+    :param user_id: 用户 ID
+    :param args: 脚本参数
+    :param username: 用户名，指定时同时写入或移除用户名在线会话索引
+    :return:
+    """
+    keys = [_get_session_key(user_id), _get_online_session_key()]
+    if username:
+        keys.append(_get_online_session_key(username))
+    return await script(
+        keys=keys,
+        args=[
+            settings.TOKEN_REDIS_PREFIX,
+            settings.TOKEN_REFRESH_REDIS_PREFIX,
+            settings.TOKEN_EXTRA_INFO_REDIS_PREFIX,
+            user_id,
+            timezone.now().timestamp(),
+            settings.TOKEN_REFRESH_EXPIRE_SECONDS,
+            *args,
+        ],
+        client=redis_auth_client,
     )
 
-    # Token 附加信息单独存储
-    if kwargs:
-        await redis_client.setex(
-            f'{settings.TOKEN_EXTRA_INFO_REDIS_PREFIX}:{user_id}:{session_uuid}',
-            settings.TOKEN_EXPIRE_SECONDS,
-            json.dumps(kwargs, ensure_ascii=False),
-        )
+
+async def get_online_sessions(
+    *, username: str | None = None, offset: int = 0, limit: int = 20
+) -> tuple[int, list[tuple[int, str, datetime]]]:
+    """
+    分页获取在线会话，按过期时间倒序，读取时清理已过期及已失效的会话
+
+    :param username: 用户名
+    :param offset: 偏移量
+    :param limit: 数量
+    :return: 会话总数及当前页的 (用户 ID, 会话 UUID, 过期时间) 列表
+    """
+    key = _get_online_session_key(username)
+    await redis_auth_client.zremrangebyscore(key, '-inf', timezone.now().timestamp())
+
+    sessions = []
+    start = offset
+    while len(sessions) < limit:
+        members = await redis_auth_client.zrevrange(key, start, start + limit - len(sessions) - 1, withscores=True)
+        if not members:
+            break
+
+        # 已撤销但未移出索引的会话（如撤销时未指定用户名）在此清理，并继续读取以补足当前页
+        tokens = await redis_auth_client.mget(*[f'{settings.TOKEN_REDIS_PREFIX}:{member}' for member, _ in members])
+        stale_members = []
+        for (member, score), token in zip(members, tokens, strict=True):
+            if not token:
+                stale_members.append(member)
+                continue
+            user_id, session_uuid = member.split(':', 1)
+            sessions.append((int(user_id), session_uuid, timezone.from_datetime(timezone.to_utc(int(score)))))
+        if stale_members:
+            await redis_auth_client.zrem(key, *stale_members)
+        start += len(members) - len(stale_members)
+
+    total = await redis_auth_client.zcard(key)
+    return total, sessions
+
+
+async def get_user_sessions(user_id: int) -> list[str]:
+    """
+    获取用户未过期的会话 UUID
+
+    :param user_id: 用户 ID
+    :return:
+    """
+    return await redis_auth_client.zrangebyscore(_get_session_key(user_id), timezone.now().timestamp(), '+inf')
+
+
+async def revoke_user_sessions(
+    user_id: int, *, username: str | None = None, exclude: str | None = None, refresh: bool = True
+) -> None:
+    """
+    撤销用户会话，仅访问该用户的会话索引
+
+    :param user_id: 用户 ID
+    :param username: 用户名，指定时同时从用户名在线会话索引中移除
+    :param exclude: 保留的会话 UUID
+    :param refresh: 是否同时撤销刷新 token，撤销后会话从索引中移除
+    :return:
+    """
+    revoked = await _run_token_script(_revoke_sessions_script, user_id, exclude or '', int(refresh), username=username)
+    await token_revocation_manager.revoke(user_id, revoked)
+    await invalidate_token_cache(user_id)
+
+
+async def create_access_token(user_id: int, *, multi_login: bool, **kwargs) -> AccessToken:
+    """
+    生成加密 token
+
+    :param user_id: 用户 ID
+    :param multi_login: 是否允许多端登录
+    :param kwargs: token 额外信息
+    :return:
+    """
+    session_uuid = str(uuid.uuid4())
+    access_token, expire = _encode_token(user_id, session_uuid, settings.TOKEN_EXPIRE_SECONDS)
+
+    revoked = await _run_token_script(
+        _issue_access_token_script,
+        user_id,
+        session_uuid,
+        access_token,
+        settings.TOKEN_EXPIRE_SECONDS,
+        timezone.to_utc(expire).timestamp(),
+        # Token 附加信息单独存储
+        json.dumps(kwargs, ensure_ascii=False) if kwargs else '',
+        # 无论是否携带附加信息均写入在线会话索引，仅排除 swagger 登录生成的 token
+        int(not kwargs.get('swagger')),
+        int(multi_login),
+        username=kwargs.get('username'),
+    )
+    if revoked:
+        await token_revocation_manager.revoke(user_id, revoked)
+        await invalidate_token_cache(user_id)
 
     return AccessToken(access_token=access_token, access_token_expire_time=expire, session_uuid=session_uuid)
 
@@ -112,21 +317,20 @@ async def create_refresh_token(session_uuid: str, user_id: int, *, multi_login:
     :param multi_login: 是否允许多端登录
     :return:
     """
-    expire = timezone.now() + timedelta(seconds=settings.TOKEN_REFRESH_EXPIRE_SECONDS)
-    refresh_token = jwt_encode({
-        'session_uuid': session_uuid,
-        'exp': timezone.to_utc(expire).timestamp(),
-        'sub': str(user_id),
-    })
+    refresh_token, expire = _encode_token(user_id, session_uuid, settings.TOKEN_REFRESH_EXPIRE_SECONDS)
 
-    if not multi_login:
-        await redis_client.delete_prefix(f'{settings.TOKEN_REFRESH_REDIS_PREFIX}:{user_id}')
-
-    await redis_client.setex(
-        f'{settings.TOKEN_REFRESH_REDIS_PREFIX}:{user_id}:{session_uuid}',
-        settings.TOKEN_REFRESH_EXPIRE_SECONDS,
+    revoked = await _run_token_script(
+        _issue_refresh_token_script,
+        user_id,
+        session_uuid,
         refresh_token,
+        settings.TOKEN_REFRESH_EXPIRE_SECONDS,
+        timezone.to_utc(expire).timestamp(),
+        int(multi_login),
     )
+    if revoked:
+        await token_revocation_manager.revoke(user_id, revoked)
+        await invalidate_token_cache(user_id)
     return RefreshToken(refresh_token=refresh_token, refresh_token_expire_time=expire)
 
 
@@ -148,34 +352,97 @@ async def create_new_token(
     :param kwargs: token 附加信息
     :return:
     """
-    redis_refresh_token = await redis_client.get(f'{settings.TOKEN_REFRESH_REDIS_PREFIX}:{user_id}:{session_uuid}')
-    if not redis_refresh_token or redis_refresh_token != refresh_token:
-        raise errors.TokenError(msg='Refresh Token 已过期，请重新登录')
+    new_session_uuid = str(uuid.uuid4())
+    access_token, access_token_expire = _encode_token(user_id, new_session_uuid, settings.TOKEN_EXPIRE_SECONDS)
+    new_refresh_token, refresh_token_expire = _encode_token(
+        user_id, new_session_uuid, settings.TOKEN_REFRESH_EXPIRE_SECONDS
+    )
 
-    await redis_client.delete(f'{settings.TOKEN_REFRESH_REDIS_PREFIX}:{user_id}:{session_uuid}')
-    await redis_client.delete(f'{settings.TOKEN_REDIS_PREFIX}:{user_id}:{session_uuid}')
+    # 校验并删除旧 token 与签发新 token 原子执行，并发刷新时仅一个请求成功
+    revoked = await _run_token_script(
+        _rotate_token_script,
+        user_id,
+        session_uuid,
+        refresh_token,
+        new_session_uuid,
+        access_token,
+        settings.TOKEN_EXPIRE_SECONDS,
+        timezone.to_utc(access_token_expire).timestamp(),
+        json.dumps(kwargs, ensure_ascii=False) if kwargs else '',
+        int(not kwargs.get('swagger')),
+        new_refresh_token,
+        settings.TOKEN_REFRESH_EXPIRE_SECONDS,
+        timezone.to_utc(refresh_token_expire).timestamp(),
+        int(multi_login),
+        username=kwargs.get('username'),
+    )
+    if not revoked:
+        raise errors.TokenError(msg='Refresh Token 已过期，请重新登录')
 
-    new_access_token = await create_access_token(user_id, multi_login=multi_login, **kwargs)
-    new_refresh_token = await create_refresh_token(new_access_token.session_uuid, user_id, multi_login=multi_login)
+    await token_revocation_manager.revoke(user_id, revoked)
+    if multi_login:
+        await invalidate_token_cache(user_id, session_uuid)
+    else:
+        await invalidate_token_cache(user_id)
     return NewToken(
-        new_access_token=new_access_token.access_token,
-        new_access_token_expire_time=new_access_token.access_token_expire_time,
-        new_refresh_token=new_refresh_token.refresh_token,
-        new_refresh_token_expire_time=new_refresh_token.refresh_token_expire_time,
-        session_uuid=new_access_token.session_uuid,
+        new_access_token=access_token,
+        new_access_token_expire_time=access_token_expire,
+        new_refresh_token=new_refresh_token,
+        new_refresh_token_expire_time=refresh_token_expire,
+        session_uuid=new_session_uuid,
     )
 
 
-async def revoke_token(user_id: int, session_uuid: str) -> None:
+async def revoke_token(user_id: int, session_uuid: str, *, username: str | None = None, refresh: bool = False) -> None:
     """
     撤销 token
 
     :param user_id: 用户 ID
     :param session_uuid: 会话 ID
+    :param username: 用户名，指定时同时从用户名在线会话索引中移除
+    :param refresh: 是否同时撤销刷新 token
+    :return:
+    """
+    await _run_token_script(_revoke_token_script, user_id, session_uuid, int(refresh), username=username)
+    await token_revocation_manager.revoke(user_id, [session_uuid])
+    await invalidate_token_cache(user_id, session_uuid)
+
+
+def _get_token_cache_key(token: str) -> str | None:
+    """
+    获取已验证 token 的本地缓存 Key，按用户和会话分段以便前缀失效，末段为 token 摘要
+
+    :param token: JWT token
+    :return: 未启用或 token 格式错误时返回 None
+    """
+    if not settings.TOKEN_LOCAL_CACHE_ENABLED or not settings.CACHE_LOCAL_ENABLED:
+        return None
+    try:
+        # 仅用于定位缓存，命中要求摘要一致，即 token 与此前验证通过的完全相同
+        claims = jwt.get_unverified_claims(token)
+        user_id = int(claims['sub'])
+        session_uuid = claims['session_uuid']
+    except Exception:
+        return None
+    digest = hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+    return f'{settings.TOKEN_LOCAL_CACHE_PREFIX}:{user_id}:{session_uuid}:{digest}'
+
+
+async def invalidate_token_cache(user_id: int, session_uuid: str | None = None) -> None:
+    """
+    清理已验证 token 的本地缓存，并通知其他节点
+
+    :param user_id: 用户 ID
+    :param session_uuid: 会话 UUID，为空时清理该用户的所有会话
     :return:
     """
-    await redis_client.delete(f'{settings.TOKEN_REDIS_PREFIX}:{user_id}:{session_uuid}')
-    await redis_client.delete(f'{settings.TOKEN_EXTRA_INFO_REDIS_PREFIX}:{user_id}:{session_uuid}')
+    if not settings.TOKEN_LOCAL_CACHE_ENABLED or not settings.CACHE_LOCAL_ENABLED:
+        return
+    prefix = f'{settings.TOKEN_LOCAL_CACHE_PREFIX}:{user_id}'
+    if session_uuid:
+        prefix = f'{prefix}:{session_uuid}'
+    token_cache_manager.delete_prefix(prefix)
+    await cache_pubsub_manager.publish_invalidation(prefix, is_delete_prefix=True)
 
 
 def get_token(request: Request) -> str:
@@ -202,7 +469,7 @@ async def get_current_user(db: AsyncSession, pk: int) -> User:
     """
     from backend.app.admin.crud.crud_user import user_dao
 
-    user = await user_dao.get_join(db, user_id=pk)
+    user = await user_dao.get_join_role(db, user_id=pk)
     if not user:
         raise errors.TokenError(msg='Token 无效')
     if not user.status:
@@ -219,47 +486,128 @@ async def get_current_user(db: AsyncSession, pk: int) -> User:
     return user
 
 
-async def get_jwt_user(user_id: int) -> GetUserInfoWithRelationDetail:
+async def get_user_principal(db: AsyncSession, pk: int) -> GetUserPrincipalDetail:
+    """
+    获取用户认证主体，菜单和数据权限由鉴权时按需加载
+
+    :param db: 数据库会话
+    :param pk: 用户 ID
+    :return:
+    """
+    user = await get_current_user(db, pk)
+    return GetUserPrincipalDetail(
+        id=user.id,
+        uuid=user.uuid,
+        username=user.username,
+        nickname=user.nickname,
+        dept_id=user.dept_id,
+        status=user.status,
+        is_superuser=user.is_superuser,
+        is_staff=user.is_staff,
+        is_multi_login=user.is_multi_login,
+        role_ids=[role.id for role in user.roles or [] if role.status == StatusType.enable],
+    )
+
+
+async def get_jwt_user(user_id: int) -> GetUserPrincipalDetail:
     """
     获取 JWT 用户
 
-    :param user_id:
+    :param user_id: 用户 ID
     :return:
     """
-    cache_user = await redis_client.get(f'{settings.JWT_USER_REDIS_PREFIX}:{user_id}')
-    if not cache_user:
+    # Redis 熔断期间直接从数据库获取
+    if not redis_auth_client.available:
         async with async_db_session() as db:
-            current_user = await get_current_user(db, user_id)
-            user = GetUserInfoWithRelationDetail.model_validate(current_user)
-            await redis_client.setex(
-                f'{settings.JWT_USER_REDIS_PREFIX}:{user_id}',
-                settings.TOKEN_EXPIRE_SECONDS,
-                user.model_dump_json(),
-            )
-    else:
-        # TODO: 在恰当的时机，应替换为使用 model_validate_json
-        # https://docs.pydantic.dev/latest/concepts/json/#partial-json-parsing
-        user = GetUserInfoWithRelationDetail.model_validate(from_json(cache_user, allow_partial=True))
+            return await get_user_principal(db, user_id)
+
+    cache_user = await redis_auth_client.get(f'{settings.JWT_USER_REDIS_PREFIX}:{user_id}')
+    if cache_user:
+        try:
+            return GetUserPrincipalDetail.model_validate_json(cache_user)
+        except ValidationError:
+            # 旧版本缓存的完整用户信息，重新加载
+            pass
+
+    async with async_db_session() as db:
+        user = await get_user_principal(db, user_id)
+    await redis_auth_client.setex(
+        f'{settings.JWT_USER_REDIS_PREFIX}:{user_id}',
+        settings.TOKEN_EXPIRE_SECONDS,
+        user.model_dump_json(),
+    )
     return user
 
 
-async def jwt_authentication(token: str) -> GetUserInfoWithRelationDetail:
+async def _is_stateless_token_revoked(token_payload: TokenPayload) -> bool:
     """
-    JWT 认证
+    判断无状态模式下 token 所属会话是否已撤销
 
-    :param token: JWT token
+    :param token_payload: token 载荷
     :return:
     """
-    token_payload = jwt_decode(token)
-    ctx.user_id = token_payload.user_id
-    redis_token = await redis_client.get(f'{settings.TOKEN_REDIS_PREFIX}:{ctx.user_id}:{token_payload.session_uuid}')
+    return settings.TOKEN_STATELESS_ENABLED and await token_revocation_manager.check(
+        token_payload.user_id, token_payload.session_uuid
+    )
+
+
+async def _verify_token_session(token: str, token_payload: TokenPayload) -> int | None:
+    """
+    校验 token 所属会话是否有效
+
+    :param token: JWT token
+    :param token_payload: token 载荷
+    :return: 已验证 token 的本地缓存时间，Redis 熔断期间降级放行时返回 None
+    """
+    if settings.TOKEN_STATELESS_ENABLED:
+        # 无状态模式已在进程内完成验签，仅需检查撤销集合
+        if await _is_stateless_token_revoked(token_payload):
+            raise errors.TokenError(msg='Token 已失效')
+        return settings.TOKEN_STATELESS_LOCAL_CACHE_TTL
+
+    # Redis 熔断期间无法校验会话，按降级策略处理
+    if not redis_auth_client.available:
+        if settings.REDIS_DEGRADED_AUTH_POLICY == 'reject':
+            raise errors.ServiceUnavailableError(msg='服务暂时不可用，请稍后重试')
+        return None
+
+    redis_token = await redis_auth_client.get(
+        f'{settings.TOKEN_REDIS_PREFIX}:{ctx.user_id}:{token_payload.session_uuid}'
+    )
     if not redis_token:
         raise errors.TokenError(msg='Token 已过期')
 
     if token != redis_token:
         raise errors.TokenError(msg='Token 已失效')
+    return settings.TOKEN_LOCAL_CACHE_TTL
+
 
-    return await get_jwt_user(ctx.user_id)
+async def jwt_authentication(token: str) -> GetUserPrincipalDetail:
+    """
+    JWT 认证
+
+    :param token: JWT token
+    :return:
+    """
+    # 短时间内验证过的 token 直接使用本地缓存，跳过解码和 Redis 查询
+    cache_key = _get_token_cache_key(token)
+    if cache_key:
+        cached = token_cache_manager.get(cache_key)
+        if cached is not None:
+            token_payload, user, deadline = cached
+            if time.time() < deadline and not await _is_stateless_token_revoked(token_payload):
+                ctx.user_id = token_payload.user_id
+                return user
+
+    token_payload = jwt_decode(token)
+    ctx.user_id = token_payload.user_id
+
+    cache_ttl = await _verify_token_session(token, token_payload)
+    user = await get_jwt_user(ctx.user_id)
+    if cache_key and cache_ttl:
+        deadline = min(time.time() + cache_ttl, token_payload.expire_time.timestamp())
+        token_cache_manager.set(cache_key, (token_payload, user, deadline), size=len(user.model_dump_json()))
+    return user
 
 
 def superuser_verify(request: Request, _token: str = DependsJwtAuth) -> bool:
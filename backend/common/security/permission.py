@@ -1,10 +1,11 @@
-from typing import TYPE_CHECKING, Any
+from typing import Any
 
 from fastapi import Request
 from sqlalchemy import Alias, ColumnElement, Table, and_, or_
 from sqlalchemy.orm.util import AliasedClass
 from sqlalchemy_crud_plus.types import Model
 
+from backend.app.admin.utils.cache import user_cache_manager
 from backend.common.context import ctx
 from backend.common.enums import RoleDataRuleExpressionType, RoleDataRuleOperatorType
 from backend.common.exception import errors
@@ -12,9 +13,6 @@ from backend.core.conf import settings
 from backend.utils.dynamic_import import get_all_models
 from backend.utils.timezone import timezone
 
-if TYPE_CHECKING:
-    from backend.app.admin.model import DataRule
-
 
 class RequestPermission:
     """
@@ -54,7 +52,7 @@ def get_data_permission_models() -> dict[str, object]:
     return {getattr(model, '__name__', str(model)): model for model in get_all_models()}
 
 
-def filter_data_permission(  # noqa: C901
+async def filter_data_permission(  # noqa: C901
     request: Request, *models: type[Model] | AliasedClass | Alias | Table
 ) -> ColumnElement[bool]:
     """
@@ -71,21 +69,15 @@ def filter_data_permission(  # noqa: C901
     if request.user.is_superuser:
         return or_(1 == 1)
 
-    # 角色未启用数据权限过滤
-    for role in request.user.roles:
-        if role.status and not role.is_filter_scopes:
-            return or_(1 == 1)
-
     # 获取数据规则
-    data_rules: set[DataRule] = set()
-    for role in request.user.roles:
-        if not role.status:
-            continue
-        for scope in role.scopes:
-            if scope.status:
-                data_rules.update(rule for rule in scope.rules if rule is not None)
+    user_data_rules = await user_cache_manager.get_data_rules(user_id=request.user.id)
+
+    # 角色未启用数据权限过滤
+    if not user_data_rules['filter_scopes']:
+        return or_(1 == 1)
 
     # 启用数据权限过滤，但没有已启用的数据权限
+    data_rules = user_data_rules['rules']
     if not data_rules:
         return or_(1 != 1)
 
@@ -111,15 +103,15 @@ def filter_data_permission(  # noqa: C901
     where_or_list = []
 
     for data_rule in data_rules:
-        if data_rule.model == '__ALL__':
+        if data_rule['model'] == '__ALL__':
             target_models = list(target_model_map.values())
         else:
-            target_model = target_model_map.get(data_rule.model)
+            target_model = target_model_map.get(data_rule['model'])
             target_models = [target_model] if target_model is not None else []
 
         for target_model in target_models:
             table = target_model if isinstance(target_model, Table) else target_model.__table__
-            rule_column = column_template_resolvers.get(data_rule.column, data_rule.column)
+            rule_column = column_template_resolvers.get(data_rule['column'], data_rule['column'])
             if rule_column not in table.columns.keys():
                 continue
             if rule_column in settings.DATA_PERMISSION_COLUMN_EXCLUDE:
@@ -143,29 +135,29 @@ def filter_data_permission(  # noqa: C901
                     return value
 
             condition = None
-            match data_rule.expression:
+            match data_rule['expression']:
                 case RoleDataRuleExpressionType.eq:
-                    condition = column_obj == cast_value(data_rule.value)
+                    condition = column_obj == cast_value(data_rule['value'])
                 case RoleDataRuleExpressionType.ne:
-                    condition = column_obj != cast_value(data_rule.value)
+                    condition = column_obj != cast_value(data_rule['value'])
                 case RoleDataRuleExpressionType.gt:
-                    condition = column_obj > cast_value(data_rule.value)
+                    condition = column_obj > cast_value(data_rule['value'])
                 case RoleDataRuleExpressionType.ge:
-                    condition = column_obj >= cast_value(data_rule.value)
+                    condition = column_obj >= cast_value(data_rule['value'])
                 case RoleDataRuleExpressionType.lt:
-                    condition = column_obj < cast_value(data_rule.value)
+                    condition = column_obj < cast_value(data_rule['value'])
                 case RoleDataRuleExpressionType.le:
-                    condition = column_obj <= cast_value(data_rule.value)
+                    condition = column_obj <= cast_value(data_rule['value'])
                 case RoleDataRuleExpressionType.in_:
-                    values = [cast_value(v.strip()) for v in data_rule.value.split(',')]
+                    values = [cast_value(v.strip()) for v in data_rule['value'].split(',')]
                     condition = column_obj.in_(values)
                 case RoleDataRuleExpressionType.not_in:
-                    values = [cast_value(v.strip()) for v in data_rule.value.split(',')]
+                    values = [cast_value(v.strip()) for v in data_rule['value'].split(',')]
                     condition = column_obj.not_in(values)
 
             # 根据运算符添加到对应列表
             if condition is not None:
-                match data_rule.operator:
+                match data_rule['operator']:
                     case RoleDataRuleOperatorType.AND:
                         where_and_list.append(condition)
                     case RoleDataRuleOperatorType.OR:
@@ -199,4 +191,4 @@ class DataPermissionFilter:
         self.models = models
 
     async def __call__(self, request: Request) -> ColumnElement[bool]:
-        return filter_data_permission(request, *self.models)
+        return await filter_data_permission(request, *self.models)
@@ -1,9 +1,10 @@
 from fastapi import Depends, Request
 
+from backend.app.admin.utils.cache import user_cache_manager
 from backend.common.context import ctx
-from backend.common.enums import MethodType, StatusType
+from backend.common.enums import MethodType
 from backend.common.exception import errors
-from backend.common.security.jwt import DependsJwtAuth
+from backend.common.security.jwt import DependsJwtAuth, is_request_path_excluded
 from backend.core.conf import settings
 
 
@@ -15,14 +16,9 @@ async def rbac_verify(request: Request, _token: str = DependsJwtAuth) -> None:
     :param _token: JWT 令牌
     :return:
     """
-    path = request.url.path
-
     # API 鉴权白名单
-    if path in settings.TOKEN_REQUEST_PATH_EXCLUDE:
+    if is_request_path_excluded(request.url.path):
         return
-    for pattern in settings.TOKEN_REQUEST_PATH_EXCLUDE_PATTERN:
-        if pattern.match(path):
-            return
 
     # JWT 授权状态强制校验
     if not request.auth.scopes:
@@ -33,13 +29,12 @@ async def rbac_verify(request: Request, _token: str = DependsJwtAuth) -> None:
         return
 
     # 检测用户角色
-    user_roles = request.user.roles
-    enabled_roles = [role for role in user_roles if role.status == StatusType.enable]
-    if not enabled_roles:
+    if not request.user.role_ids:
         raise errors.AuthorizationError(msg='用户所属角色已被锁定，请联系系统管理员')
 
     # 检测用户所属角色菜单
-    if not any(len(role.menus) > 0 for role in enabled_roles):
+    user_menus = await user_cache_manager.get_menus(user_id=request.user.id)
+    if not user_menus.menu_ids:
         raise errors.AuthorizationError(msg='用户未分配菜单，请联系系统管理员')
 
     # 检测后台管理操作权限
@@ -59,18 +54,8 @@ async def rbac_verify(request: Request, _token: str = DependsJwtAuth) -> None:
         if path_auth_perm in settings.RBAC_ROLE_MENU_EXCLUDE:
             return
 
-        # 菜单去重
-        unique_menus = {}
-        for role in enabled_roles:
-            for menu in role.menus:
-                unique_menus[menu.id] = menu
-
         # 已分配菜单权限校验
-        allow_perms = []
-        for menu in list(unique_menus.values()):
-            if menu.perms and menu.status == StatusType.enable:
-                allow_perms.extend(menu.perms.split(','))
-        if path_auth_perm not in allow_perms:
+        if path_auth_perm not in user_menus.perms:
             raise errors.AuthorizationError
     else:
         # casbin 模式
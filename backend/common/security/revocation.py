@@ -0,0 +1,196 @@
+import asyncio
+import json
+import time
+
+from backend.common.exception import errors
+from backend.common.log import log
+from backend.core.conf import settings
+from backend.database.redis import RedisCli, redis_auth_client
+
+
+class TokenRevocationManager:
+    """
+    无状态 token 撤销管理器
+
+    已撤销的会话写入 Redis 有序集合（分值为撤销记录过期时间戳），并通过 Pub/Sub 同步到各节点的本地撤销集合；
+    每次订阅成功（包括重连）后从 Redis 重建本地撤销集合，补齐断线期间遗漏的通知。
+    撤销记录保留至会话访问 token 的最晚过期时间，之后 token 自然失效
+
+    订阅断开期间本地撤销集合不可信，节点标记为未同步：就绪检查返回 503，撤销判断回退为查询 Redis
+    """
+
+    _prune_interval: int = 60
+
+    def __init__(self) -> None:
+        self._revoked: dict[str, float] = {}
+        self._pruned_at: float = 0
+        self._listener_task: asyncio.Task | None = None
+        self._stopping: bool = False
+        self._synced: bool = False
+
+    @property
+    def ready(self) -> bool:
+        """本地撤销集合是否可用（未启用无状态模式时始终可用）"""
+        return not settings.TOKEN_STATELESS_ENABLED or self._synced
+
+    def is_revoked(self, user_id: int, session_uuid: str) -> bool:
+        """
+        判断会话是否已撤销
+
+        :param user_id: 用户 ID
+        :param session_uuid: 会话 UUID
+        :return:
+        """
+        expire_at = self._revoked.get(f'{user_id}:{session_uuid}')
+        return expire_at is not None and expire_at > time.time()
+
+    async def check(self, user_id: int, session_uuid: str) -> bool:
+        """
+        判断会话是否已撤销，本地撤销集合未同步时查询 Redis
+
+        :param user_id: 用户 ID
+        :param session_uuid: 会话 UUID
+        :return:
+        """
+        if self.is_revoked(user_id, session_uuid):
+            return True
+        if self._synced:
+            return False
+
+        try:
+            expire_at = await redis_auth_client.zscore(settings.TOKEN_REVOKED_REDIS_PREFIX, f'{user_id}:{session_uuid}')
+        except Exception as e:
+            log.error(f'[TokenRevocation] 撤销集合未同步且查询 Redis 失败: {e}')
+            raise errors.ServiceUnavailableError(msg='服务暂时不可用，请稍后重试')
+        return expire_at is not None and expire_at > time.time()
+
+    def _add(self, revoked: dict[str, float]) -> None:
+        """
+        添加撤销记录到本地撤销集合，并定期清理已过期的记录
+
+        :param revoked: 撤销记录
+        :return:
+        """
+        self._revoked.update(revoked)
+        now = time.time()
+        if now - self._pruned_at >= self._prune_interval:
+            self._revoked = {member: expire_at for member, expire_at in self._revoked.items() if expire_at > now}
+            self._pruned_at = now
+
+    async def revoke(self, user_id: int, session_uuids: list[str]) -> None:
+        """
+        撤销会话并通知其他节点
+
+        :param user_id: 用户 ID
+        :param session_uuids: 会话 UUID 列表
+        :return:
+        """
+        if not settings.TOKEN_STATELESS_ENABLED or not session_uuids:
+            return
+
+        expire_at = time.time() + settings.TOKEN_EXPIRE_SECONDS
+        revoked = {f'{user_id}:{session_uuid}': expire_at for session_uuid in session_uuids}
+        self._add(revoked)
+        async with redis_auth_client.batch() as pipe:
+            pipe.zadd(settings.TOKEN_REVOKED_REDIS_PREFIX, revoked)
+            pipe.zremrangebyscore(settings.TOKEN_REVOKED_REDIS_PREFIX, '-inf', time.time())
+            pipe.publish(settings.TOKEN_REVOKED_CHANNEL, json.dumps(revoked))
+
+    async def rebuild(self, client: RedisCli | None = None) -> None:
+        """
+        从 Redis 重建本地撤销集合
+
+        :param client: Redis 客户端，默认为认证客户端
+        :return:
+        """
+        client = client or redis_auth_client
+        entries = await client.zrangebyscore(settings.TOKEN_REVOKED_REDIS_PREFIX, time.time(), '+inf', withscores=True)
+        self._add(dict(entries))
+
+    async def _listen(self) -> None:
+        """订阅并监听撤销通知，断开后按指数退避持续重连"""
+        reconnect_attempts = 0
+
+        while not self._stopping:
+            client: RedisCli | None = None
+
+            try:
+                # 使用独立连接，阻塞读取不适用熔断；订阅占用一个连接，重建撤销集合使用另一个
+                client = RedisCli(circuit_breaker=False, pool_name='token_revocation', max_connections=2)
+                async with client.pubsub(ignore_subscribe_messages=True) as pubsub:
+                    await pubsub.subscribe(settings.TOKEN_REVOKED_CHANNEL)
+                    await self.rebuild(client)
+                    rebuilt_at = time.monotonic()
+
+                    # 订阅成功
+                    reconnect_attempts = 0
+                    self._synced = True
+
+                    while not self._stopping:
+                        # 超时需小于 REDIS_TIMEOUT
+                        message = await pubsub.get_message(timeout=1.0)
+
+                        # 定期重建，补齐 Pub/Sub 未送达的通知
+                        if time.monotonic() - rebuilt_at >= settings.TOKEN_REVOKED_REBUILD_INTERVAL:
+                            await self.rebuild(client)
+                            rebuilt_at = time.monotonic()
+
+                        if message is None:
+                            continue
+                        try:
+                            self._add(json.loads(message['data']))
+                        except Exception as e:
+                            log.warning(f'[TokenRevocation] 撤销通知处理失败: {e}')
+
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                self._synced = False
+                reconnect_attempts += 1
+                delay = min(
+                    settings.CACHE_PUBSUB_RECONNECT_DELAY * 2 ** (reconnect_attempts - 1),
+                    settings.TOKEN_REVOKED_RECONNECT_MAX_DELAY,
+                )
+                log.error(f'[TokenRevocation] 订阅异常，{delay} 秒后第 {reconnect_attempts} 次重连: {e}')
+                await asyncio.sleep(delay)
+            finally:
+                if client:
+                    try:
+                        await client.aclose()
+                    except Exception:
+                        pass
+
+        self._synced = False
+
+    async def start_listener(self) -> None:
+        """重建本地撤销集合，并启动撤销通知监听器"""
+        if not settings.TOKEN_STATELESS_ENABLED:
+            return
+
+        if self._listener_task is None or self._listener_task.done():
+            self._stopping = False
+            try:
+                await self.rebuild()
+            except Exception as e:
+                # 未同步期间撤销判断回退为查询 Redis，由监听器持续重试
+                log.error(f'[TokenRevocation] 重建本地撤销集合失败: {e}')
+            self._listener_task = asyncio.create_task(self._listen())
+
+    async def stop_listener(self) -> None:
+        """停止撤销通知监听器"""
+        if self._listener_task is None:
+            return
+
+        # 带超时读取消息时取消可能被吞掉，同时通过标记退出循环
+        self._stopping = True
+        if not self._listener_task.done():
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+
+        self._listener_task = None
+
+
+token_revocation_manager: TokenRevocationManager = TokenRevocationManager()
@@ -0,0 +1,148 @@
+# Token 生命周期 Lua 脚本，每个操作在 Redis 中一次往返原子执行
+#
+# KEYS[1]: 用户会话索引，KEYS[2]: 全局在线会话索引，KEYS[3]: 用户名在线会话索引（可选，撤销时同时从中移除）
+# ARGV[1-6]: 访问 token 前缀、刷新 token 前缀、附加信息前缀、用户 ID、当前时间戳、用户会话索引过期时间，其余为脚本参数
+#
+# 会话相关 key 由前缀在脚本内拼接，仅适用于单实例 Redis
+
+_TOKEN_SCRIPT_HEADER = """
+local token_prefix, refresh_prefix, extra_info_prefix = ARGV[1], ARGV[2], ARGV[3]
+local user_id, now, session_index_ttl = ARGV[4], ARGV[5], ARGV[6]
+local session_index, online_index, username_index = KEYS[1], KEYS[2], KEYS[3]
+
+local function session_key(prefix, session_uuid)
+    return prefix .. ':' .. user_id .. ':' .. session_uuid
+end
+
+local function remove_online(session_uuid)
+    local member = user_id .. ':' .. session_uuid
+    redis.call('ZREM', online_index, member)
+    if username_index then
+        redis.call('ZREM', username_index, member)
+    end
+end
+
+local function revoke_sessions(keep, refresh)
+    local revoked = {}
+    for _, session_uuid in ipairs(redis.call('ZRANGEBYSCORE', session_index, now, '+inf')) do
+        if session_uuid ~= keep then
+            redis.call('DEL', session_key(token_prefix, session_uuid), session_key(extra_info_prefix, session_uuid))
+            remove_online(session_uuid)
+            if refresh then
+                redis.call('DEL', session_key(refresh_prefix, session_uuid))
+                redis.call('ZREM', session_index, session_uuid)
+            end
+            table.insert(revoked, session_uuid)
+        end
+    end
+    return revoked
+end
+
+local function add_session(session_uuid, expire_at)
+    redis.call('ZADD', session_index, 'GT', expire_at, session_uuid)
+    redis.call('ZREMRANGEBYSCORE', session_index, '-inf', now)
+    redis.call('EXPIRE', session_index, session_index_ttl)
+end
+
+local function issue_access_token(session_uuid, token, ttl, expire_at, extra_info, online, multi_login)
+    local revoked = {}
+    if multi_login ~= '1' then
+        revoked = revoke_sessions('', false)
+    end
+    redis.call('SETEX', session_key(token_prefix, session_uuid), ttl, token)
+    add_session(session_uuid, expire_at)
+    if extra_info ~= '' then
+        redis.call('SETEX', session_key(extra_info_prefix, session_uuid), ttl, extra_info)
+    end
+    if online == '1' then
+        local member = user_id .. ':' .. session_uuid
+        redis.call('ZADD', online_index, expire_at, member)
+        if username_index then
+            redis.call('ZADD', username_index, expire_at, member)
+            redis.call('EXPIRE', username_index, ttl)
+        end
+    end
+    return revoked
+end
+
+local function issue_refresh_token(session_uuid, token, ttl, expire_at, multi_login)
+    local revoked = {}
+    if multi_login ~= '1' then
+        revoked = revoke_sessions(session_uuid, true)
+    end
+    redis.call('SETEX', session_key(refresh_prefix, session_uuid), ttl, token)
+    add_session(session_uuid, expire_at)
+    return revoked
+end
+"""
+
+# ARGV[7-13]: 会话 UUID、访问 token、过期时间、过期时间戳、附加信息、是否写入在线会话索引、是否允许多端登录
+# 返回被撤销的会话 UUID 列表
+ISSUE_ACCESS_TOKEN_SCRIPT = (
+    _TOKEN_SCRIPT_HEADER
+    + """
+return issue_access_token(ARGV[7], ARGV[8], ARGV[9], ARGV[10], ARGV[11], ARGV[12], ARGV[13])
+"""
+)
+
+# ARGV[7-11]: 会话 UUID、刷新 token、过期时间、过期时间戳、是否允许多端登录
+# 返回被撤销的会话 UUID 列表
+ISSUE_REFRESH_TOKEN_SCRIPT = (
+    _TOKEN_SCRIPT_HEADER
+    + """
+return issue_refresh_token(ARGV[7], ARGV[8], ARGV[9], ARGV[10], ARGV[11])
+"""
+)
+
+# ARGV[7-8]: 旧会话 UUID、旧刷新 token
+# ARGV[9-14]: 新会话 UUID、访问 token、过期时间、过期时间戳、附加信息、是否写入在线会话索引
+# ARGV[15-17]: 刷新 token、过期时间、过期时间戳
+# ARGV[18]: 是否允许多端登录
+# 返回被撤销的会话 UUID 列表（包含旧会话），旧刷新 token 校验失败时返回 0
+ROTATE_TOKEN_SCRIPT = (
+    _TOKEN_SCRIPT_HEADER
+    + """
+local old_session_uuid = ARGV[7]
+if redis.call('GET', session_key(refresh_prefix, old_session_uuid)) ~= ARGV[8] then
+    return 0
+end
+redis.call(
+    'DEL',
+    session_key(refresh_prefix, old_session_uuid),
+    session_key(token_prefix, old_session_uuid),
+    session_key(extra_info_prefix, old_session_uuid)
+)
+redis.call('ZREM', session_index, old_session_uuid)
+remove_online(old_session_uuid)
+local revoked = issue_access_token(ARGV[9], ARGV[10], ARGV[11], ARGV[12], ARGV[13], ARGV[14], ARGV[18])
+for _, session_uuid in ipairs(issue_refresh_token(ARGV[9], ARGV[15], ARGV[16], ARGV[17], ARGV[18])) do
+    table.insert(revoked, session_uuid)
+end
+table.insert(revoked, old_session_uuid)
+return revoked
+"""
+)
+
+# ARGV[7-8]: 会话 UUID、是否同时撤销刷新 token
+REVOKE_TOKEN_SCRIPT = (
+    _TOKEN_SCRIPT_HEADER
+    + """
+local session_uuid = ARGV[7]
+redis.call('DEL', session_key(token_prefix, session_uuid), session_key(extra_info_prefix, session_uuid))
+remove_online(session_uuid)
+if ARGV[8] == '1' then
+    redis.call('DEL', session_key(refresh_prefix, session_uuid))
+    redis.call('ZREM', session_index, session_uuid)
+end
+return 1
+"""
+)
+
+# ARGV[7-8]: 保留的会话 UUID、是否同时撤销刷新 token
+# 返回被撤销的会话 UUID 列表
+REVOKE_SESSIONS_SCRIPT = (
+    _TOKEN_SCRIPT_HEADER
+    + """
+return revoke_sessions(ARGV[7], ARGV[8] == '1')
+"""
+)
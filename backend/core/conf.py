@@ -66,18 +66,63 @@ class Settings(BaseSettings):
     REDIS_DATABASE: int
 
     # Redis
+    REDIS_USERNAME: str = ''  # ACL 用户名，为空时使用 default 用户
+    REDIS_SSL: bool = False  # 是否通过 TLS 连接
+    REDIS_SSL_CA_CERTS: str | None = None  # TLS CA 证书路径，为空时使用系统证书
     REDIS_TIMEOUT: int = 5
+    REDIS_POOL_MAX_CONNECTIONS: dict[str, int] = {  # 各连接池连接数上限，未配置的连接池使用 default
+        'default': 50,
+        'auth': 50,
+        'cache': 100,
+        'limiter': 30,
+        'background': 10,
+    }
+    REDIS_POOL_TIMEOUT: float = 2  # 连接池耗尽时等待空闲连接的超时（秒）
+    REDIS_CIRCUIT_BREAKER_ENABLED: bool = True
+    REDIS_CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = 5  # 连续失败或慢调用次数达到阈值时打开熔断
+    REDIS_CIRCUIT_BREAKER_SLOW_CALL_THRESHOLD: float = 1  # 慢调用阈值（秒）
+    REDIS_CIRCUIT_BREAKER_RECOVERY_TIMEOUT: int = 10  # 熔断打开后进入半开状态的时间（秒）
+    # 熔断期间的认证策略：reject 拒绝请求，allow 仅校验 Token 签名和有效期，并从数据库获取用户
+    REDIS_DEGRADED_AUTH_POLICY: Literal['reject', 'allow'] = 'reject'
 
     # 缓存
     CACHE_LOCAL_ENABLED: bool = True
     CACHE_LOCAL_MAXSIZE: int = 100000
     CACHE_LOCAL_TTL: int = 60 * 60 * 2  # 2 小时
+    CACHE_LOCAL_INDEX_REBUILD_MIN: int = 1024  # 前缀索引重建的最小残留 Key 数
+    CACHE_LOCAL_SNAPSHOT_ENABLED: bool = True  # 停止时保存本地缓存快照，启动时恢复
+    CACHE_LOCAL_MAX_MEMORY: int = 256 * 1024 * 1024  # 本地缓存估算内存上限（bytes），0 表示不限制
+    CACHE_LOCAL_NAMESPACE_QUOTAS: dict[str, int] = {}  # 命名空间内存配额（bytes），Key 为缓存名称
+    CACHE_WARMUP_ENABLED: bool = True  # 启动时预热缓存
+    CACHE_WARMUP_CONCURRENCY: int = 4  # 缓存预热最大并发数
+    CACHE_WARMUP_TIMEOUT: int = 30  # 单个缓存预热任务超时（秒）
     CACHE_REDIS_TTL: int = 60 * 60 * 2  # 2 小时
+    CACHE_REDIS_SHARDS: list[str] = []  # L2 缓存分片地址（仅用于缓存的 Redis 实例），为空时使用主 Redis
+    CACHE_REDIS_SHARD_HEALTH_CHECK_INTERVAL: int = 5  # 已摘除分片的健康检查间隔（秒）
+    CACHE_REDIS_SHARD_FAILURE_THRESHOLD: int = 3  # 分片连续连接异常达到阈值时摘除，熔断拒绝不计入，应小于熔断阈值
+    CACHE_REDIS_SHARD_MISSED_KEYS_MAX: int = 10000  # 分片摘除期间每个命名空间记录的 Key 上限，超过时改为失效命名空间
     CACHE_CONFIG_REDIS_PREFIX: str = 'fba:cache:config'
     CACHE_DICT_REDIS_PREFIX: str = 'fba:cache:dict'
-    CACHE_PUBSUB_CHANNEL: str = 'fba:cache:invalidate'
+    CACHE_USER_MENU_REDIS_PREFIX: str = 'fba:cache:user:menu'
+    CACHE_USER_DATA_RULE_REDIS_PREFIX: str = 'fba:cache:user:data_rule'
+    CACHE_INVALIDATION_STREAM: str = 'fba:cache:invalidate:stream'
+    CACHE_INVALIDATION_STREAM_MAXLEN: int = 10000  # 失效通知保留条数（近似）
+    CACHE_INVALIDATION_BATCH_INTERVAL: float = 0.05  # 失效通知合并窗口（秒）
+    CACHE_INVALIDATION_BATCH_SIZE: int = 500  # 单次消费失效通知的最大条数
+    CACHE_PUT_BROADCAST_MAX_SIZE: int = 64 * 1024  # 缓存写入通知携带新值的最大大小（bytes），超过时仅通知失效
+    CACHE_INDEX_ENABLED: bool = True  # 通过命名空间索引失效缓存，关闭时回退为 SCAN 前缀匹配
+    CACHE_INDEX_REDIS_PREFIX: str = 'fba:cache:index'
+    CACHE_INDEX_PRUNE_INTERVAL: int = 60 * 10  # 命名空间索引清理已过期成员的最小间隔（秒）
     CACHE_PUBSUB_RECONNECT_DELAY: int = 5  # 重连延迟（秒）
-    CACHE_PUBSUB_MAX_RECONNECT_ATTEMPTS: int = 10  # 最大重连次数
+    CACHE_PUBSUB_RECONNECT_MAX_DELAY: int = 60  # 失效通知断开后持续重连，重连及重新发布延迟指数增长的上限（秒）
+    CACHE_SINGLE_FLIGHT_ENABLED: bool = True  # 进程内合并相同 Key 的并发加载
+    CACHE_LOCK_REDIS_PREFIX: str = 'fba:cache:lock'
+    CACHE_LOCK_TIMEOUT: int = 10  # 加载租约超时（秒）
+    CACHE_LOCK_WAIT_TIMEOUT: float = 3  # 等待其他节点回填超时（秒）
+    CACHE_LOCK_POLL_INTERVAL: float = 0.05  # 等待其他节点回填轮询间隔（秒）
+    CACHE_EARLY_REFRESH_BETA: float = 1.0  # 概率提前刷新系数，值越大越倾向于提前刷新
+    CACHE_NEGATIVE_TTL: int = 60  # 空值缓存过期时间（秒）
+    CACHE_COMPRESS_THRESHOLD: int = 4096  # 启用压缩的缓存编解码器压缩阈值（bytes）
 
     # .env Snowflake
     SNOWFLAKE_ENABLED: bool = False
@@ -91,6 +136,10 @@ class Settings(BaseSettings):
 
     # .env Token
     TOKEN_SECRET_KEY: str  # 密钥 secrets.token_urlsafe(32)
+    TOKEN_STATELESS_ENABLED: bool = False  # 无状态 token 模式：非对称签名，进程内验签，通过本地撤销集合判断撤销
+    TOKEN_STATELESS_KID: str | None = None  # 当前签名密钥 ID，写入 token 头部 kid
+    TOKEN_STATELESS_PRIVATE_KEY: str | None = None  # 当前签名私钥（PEM）
+    TOKEN_STATELESS_PUBLIC_KEYS: dict[str, str] = {}  # 密钥轮换期间仍需验签的历史公钥（kid: PEM）
 
     # Token
     TOKEN_ALGORITHM: str = 'HS256'
@@ -100,6 +149,19 @@ class Settings(BaseSettings):
     TOKEN_EXTRA_INFO_REDIS_PREFIX: str = 'fba:token_extra_info'
     TOKEN_ONLINE_REDIS_PREFIX: str = 'fba:token_online'
     TOKEN_REFRESH_REDIS_PREFIX: str = 'fba:refresh_token'
+    TOKEN_SESSION_REDIS_PREFIX: str = 'fba:token_session'  # 用户会话索引
+    TOKEN_ONLINE_SESSION_REDIS_PREFIX: str = 'fba:token_online_session'  # 全局在线会话索引
+    TOKEN_LOCAL_CACHE_ENABLED: bool = True  # 进程内缓存已验证的 Token 及用户信息，依赖本地缓存失效通知
+    TOKEN_LOCAL_CACHE_TTL: int = 5  # 已验证 Token 本地缓存时间（秒）
+    TOKEN_LOCAL_CACHE_MAXSIZE: int = 10000  # 已验证 Token 本地缓存最大数量
+    TOKEN_LOCAL_CACHE_MAX_MEMORY: int = 16 * 1024 * 1024  # 已验证 Token 本地缓存估算内存上限（bytes）
+    TOKEN_LOCAL_CACHE_PREFIX: str = 'fba:token_verified'
+    TOKEN_STATELESS_ALGORITHM: str = 'ES256'  # 无状态 token 签名算法，仅支持非对称算法
+    TOKEN_STATELESS_LOCAL_CACHE_TTL: int = 300  # 无状态模式下已验证 Token 本地缓存时间（秒），撤销由撤销集合保证
+    TOKEN_REVOKED_REDIS_PREFIX: str = 'fba:token_revoked'  # 无状态模式下已撤销会话
+    TOKEN_REVOKED_CHANNEL: str = 'fba:token_revoked:channel'
+    TOKEN_REVOKED_RECONNECT_MAX_DELAY: int = 60  # 撤销通知订阅断开后持续重连，重连延迟指数增长的上限（秒）
+    TOKEN_REVOKED_REBUILD_INTERVAL: int = 60  # 定期从 Redis 重建本地撤销集合的间隔（秒）
     TOKEN_REQUEST_PATH_EXCLUDE: list[str] = [  # JWT / RBAC 路由白名单
         f'{FASTAPI_API_V1_PATH}/auth/login',
     ]
@@ -115,6 +177,8 @@ class Settings(BaseSettings):
     USER_PASSWORD_MIN_LENGTH: int = 6
     USER_PASSWORD_MAX_LENGTH: int = 32
     USER_PASSWORD_REQUIRE_SPECIAL_CHAR: bool = False
+    USER_PASSWORD_HASH_MAX_WORKERS: int = 4  # 密码哈希线程池大小，即并发执行的哈希计算上限
+    USER_PASSWORD_HASH_MAX_QUEUE_SIZE: int = 64  # 密码哈希排队上限，超出时拒绝请求
 
     # 登录
     LOGIN_CAPTCHA_ENABLED: bool = True
@@ -35,3 +35,6 @@ POSTGRESQL_SCRIPT_DIR = BASE_PATH / 'sql' / 'postgresql'
 
 # 热重载锁文件
 RELOAD_LOCK_FILE = BASE_PATH / '.reload.lock'
+
+# 本地缓存快照文件前缀，各进程快照文件名后缀为进程 ID
+CACHE_SNAPSHOT_FILE = BASE_PATH / '.cache.snapshot'
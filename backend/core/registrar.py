@@ -17,15 +17,19 @@ from starlette_context.plugins import RequestIdPlugin
 
 from backend import __version__
 from backend.common.cache.pubsub import cache_pubsub_manager
+from backend.common.cache.shard import cache_shard_manager
+from backend.common.cache.snapshot import cache_snapshot_manager
+from backend.common.cache.warmup import cache_warmup_manager
 from backend.common.exception.exception_handler import register_exception
 from backend.common.lifespan import lifespan_manager
 from backend.common.log import set_custom_logfile, setup_logging
 from backend.common.observability.otel import init_otel
 from backend.common.response.response_code import StandardResponseCode
+from backend.common.security.revocation import token_revocation_manager
 from backend.core.conf import settings
 from backend.core.path_conf import STATIC_DIR, UPLOAD_DIR
 from backend.database.db import create_tables
-from backend.database.redis import redis_client
+from backend.database.redis import close_redis_clients, redis_client
 from backend.middleware.access_middleware import AccessMiddleware
 from backend.middleware.i18n_middleware import I18nMiddleware
 from backend.middleware.jwt_auth_middleware import JwtAuthMiddleware
@@ -54,6 +58,9 @@ async def register_init(app: FastAPI) -> AsyncGenerator[None, None]:
     # 初始化 redis
     await redis_client.init()
 
+    # 初始化缓存分片
+    await cache_shard_manager.init()
+
     # 初始化 snowflake 节点
     if settings.SNOWFLAKE_ENABLED or settings.DATABASE_PK_MODE == 'snowflake':
         await snowflake.init()
@@ -61,20 +68,35 @@ async def register_init(app: FastAPI) -> AsyncGenerator[None, None]:
     # 创建操作日志任务
     create_task(OperaLogMiddleware.consumer())
 
-    # 启动缓存 Pub/Sub 监听器
-    cache_pubsub_manager.start_listener()
+    # 恢复本地缓存快照，并启动缓存 Pub/Sub 监听器重放快照之后的失效通知
+    cache_pubsub_manager.start_listener(cache_snapshot_manager.restore())
 
-    yield
+    # 无状态 token 模式下重建本地撤销集合，并启动撤销通知监听器
+    await token_revocation_manager.start_listener()
 
-    # 停止缓存 Pub/Sub 监听器
-    await cache_pubsub_manager.stop_listener()
+    # 后台预热缓存，完成前就绪检查返回 503
+    cache_warmup_manager.start()
 
-    # 释放 snowflake 节点
-    if settings.SNOWFLAKE_ENABLED or settings.DATABASE_PK_MODE == 'snowflake':
-        await snowflake.shutdown()
+    try:
+        yield
+    finally:
+        # 停止缓存预热
+        await cache_warmup_manager.stop()
+
+        # 停止 token 撤销通知监听器
+        await token_revocation_manager.stop_listener()
+
+        # 停止缓存 Pub/Sub 监听器，并保存本地缓存快照
+        await cache_pubsub_manager.stop_listener()
+        cache_snapshot_manager.save()
 
-    # 关闭 redis 连接
-    await redis_client.aclose()
+        # 释放 snowflake 节点
+        if settings.SNOWFLAKE_ENABLED or settings.DATABASE_PK_MODE == 'snowflake':
+            await snowflake.shutdown()
+
+        # 关闭缓存分片和 redis 连接
+        await cache_shard_manager.close()
+        await close_redis_clients()
 
 
 def register_app() -> FastAPI:
@@ -99,6 +121,7 @@ def register_app() -> FastAPI:
     register_router(app)
     register_page(app)
     register_exception(app)
+    register_health(app)
 
     # 初始化插件
     setup_plugins(app)
@@ -229,6 +252,36 @@ def register_socket_app(app: FastAPI) -> None:
     app.mount('/ws', socket_app)
 
 
+def register_health(app: FastAPI) -> None:
+    """
+    注册就绪检查
+
+    :param app: FastAPI 应用实例
+    :return:
+    """
+
+    @app.get('/ready', include_in_schema=False)
+    async def readiness() -> MsgSpecJSONResponse:
+        if not cache_warmup_manager.ready:
+            msg = 'WARMING_UP'
+        elif not token_revocation_manager.ready:
+            msg = 'TOKEN_REVOCATION_UNSYNCED'
+        else:
+            msg = 'READY'
+        code = StandardResponseCode.HTTP_200 if msg == 'READY' else StandardResponseCode.HTTP_503
+        return MsgSpecJSONResponse(
+            content={
+                'code': code,
+                'msg': msg,
+                'data': {
+                    'cache_warmup': cache_warmup_manager.get_status(),
+                    'token_revocation_synced': token_revocation_manager.ready,
+                },
+            },
+            status_code=code,
+        )
+
+
 def register_metrics(app: FastAPI) -> None:
     """
     注册指标
@@ -1,12 +1,180 @@
+import asyncio
 import sys
+import time
 
-from redis.asyncio import Redis
-from redis.exceptions import AuthenticationError, TimeoutError
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any
 
+from redis.asyncio import BlockingConnectionPool, Redis
+from redis.asyncio.client import NEVER_DECODE, Pipeline
+from redis.exceptions import AuthenticationError, ConnectionError, TimeoutError
+
+from backend.common.enums import RedisCircuitState
 from backend.common.log import log
+from backend.common.observability.prometheus.redis import (
+    inc_redis_pool_timeout,
+    observe_redis_pool_connections,
+    observe_redis_pool_wait_time,
+)
 from backend.core.conf import settings
 
 
+class RedisCircuitOpenError(ConnectionError):
+    """Redis 熔断器打开时拒绝执行命令"""
+
+
+class RedisPoolTimeoutError(ConnectionError):
+    """等待连接池空闲连接超时，属于本地资源不足，不代表 Redis 不可用"""
+
+
+# 当前命令等待连接池空闲连接的累计耗时（秒），计算命令耗时时扣除
+_pool_wait_time: ContextVar[float] = ContextVar('redis_pool_wait_time', default=0.0)
+
+
+class RedisCircuitBreaker:
+    """
+    Redis 熔断器
+
+    连续失败或慢调用次数达到阈值时打开，打开期间命令立即失败；经过恢复时间后进入半开状态，
+    仅允许一个探测命令通过，探测成功则关闭，失败则重新打开
+    """
+
+    def __init__(self) -> None:
+        self.state: RedisCircuitState = RedisCircuitState.closed
+        self._failures: int = 0
+        self._opened_at: float = 0
+        self._probing: bool = False
+
+    @property
+    def available(self) -> bool:
+        """是否允许执行命令"""
+        if self.state == RedisCircuitState.closed:
+            return True
+        if self.state == RedisCircuitState.open:
+            return time.monotonic() - self._opened_at >= settings.REDIS_CIRCUIT_BREAKER_RECOVERY_TIMEOUT
+        return not self._probing
+
+    def _set_state(self, state: RedisCircuitState) -> None:
+        """
+        切换熔断器状态
+
+        :param state: 熔断器状态
+        :return:
+        """
+        if state == self.state:
+            return
+        self.state = state
+        if state == RedisCircuitState.open:
+            self._opened_at = time.monotonic()
+            log.warning('[RedisCircuitBreaker] Redis 熔断器已打开，进入降级模式')
+        elif state == RedisCircuitState.closed:
+            log.info('[RedisCircuitBreaker] Redis 熔断器已关闭，退出降级模式')
+
+    def acquire(self) -> bool:
+        """
+        申请执行命令，半开状态下获得探测资格，不允许执行时抛出 RedisCircuitOpenError
+
+        :return: 是否获得探测资格，获得时执行结束后需调用 release 释放
+        """
+        if not self.available:
+            raise RedisCircuitOpenError('Redis 熔断器已打开')
+        if self.state == RedisCircuitState.closed:
+            return False
+        self._set_state(RedisCircuitState.half_open)
+        self._probing = True
+        return True
+
+    def release(self) -> None:
+        """释放探测资格，仅由获得探测资格的命令调用"""
+        self._probing = False
+
+    def record_success(self, elapsed: float, *, probe: bool = False) -> None:
+        """
+        记录命令执行成功，超过慢调用阈值时视为失败
+
+        :param elapsed: 执行耗时（秒）
+        :param probe: 是否为持有探测资格的命令
+        :return:
+        """
+        # 熔断器打开前开始的命令结果不代表 Redis 已恢复，仅由探测命令决定
+        if self.state != RedisCircuitState.closed and not probe:
+            return
+        if elapsed >= settings.REDIS_CIRCUIT_BREAKER_SLOW_CALL_THRESHOLD:
+            self.record_failure(probe=probe)
+            return
+        self._failures = 0
+        self._set_state(RedisCircuitState.closed)
+
+    def record_failure(self, *, probe: bool = False) -> None:
+        """
+        记录命令执行失败
+
+        :param probe: 是否为持有探测资格的命令
+        :return:
+        """
+        if self.state != RedisCircuitState.closed and not probe:
+            return
+        self._failures += 1
+        if (
+            self.state == RedisCircuitState.half_open
+            or self._failures >= settings.REDIS_CIRCUIT_BREAKER_FAILURE_THRESHOLD
+        ):
+            self._set_state(RedisCircuitState.open)
+            # 重新打开时刷新打开时间
+            self._opened_at = time.monotonic()
+
+
+class RedisConnectionPool(BlockingConnectionPool):
+    """
+    Redis 阻塞连接池
+
+    连接数达到上限时等待空闲连接，超过等待时间后抛出 RedisPoolTimeoutError，并记录等待耗时与连接池状态
+    """
+
+    def __init__(self, *, pool_name: str, **kwargs: Any) -> None:
+        """
+        初始化 Redis 连接池
+
+        :param pool_name: 连接池名称，用于指标统计
+        :param kwargs: BlockingConnectionPool 参数
+        """
+        super().__init__(**kwargs)
+        self.pool_name = pool_name
+
+    def _observe_connections(self) -> None:
+        """记录连接池状态"""
+        observe_redis_pool_connections(
+            pool_name=self.pool_name,
+            max_size=self.max_connections,
+            in_use=len(self._in_use_connections),
+            idle=len(self._available_connections),
+        )
+
+    async def get_connection(self, *args: Any, **kwargs: Any) -> Any:
+        """获取连接"""
+        start_time = time.perf_counter()
+        try:
+            connection = await super().get_connection(*args, **kwargs)
+        except ConnectionError as e:
+            if isinstance(e.__cause__, asyncio.TimeoutError):
+                inc_redis_pool_timeout(pool_name=self.pool_name)
+                raise RedisPoolTimeoutError(f'Redis 连接池 {self.pool_name} 等待空闲连接超时') from e
+            raise
+        finally:
+            elapsed = time.perf_counter() - start_time
+            _pool_wait_time.set(_pool_wait_time.get() + elapsed)
+            observe_redis_pool_wait_time(pool_name=self.pool_name, elapsed=elapsed)
+        self._observe_connections()
+        return connection
+
+    async def release(self, connection: Any) -> None:
+        """释放连接"""
+        await super().release(connection)
+        self._observe_connections()
+
+
 class RedisCli(Redis):
     """Redis 客户端"""
 
@@ -19,9 +187,15 @@ class RedisCli(Redis):
         socket_timeout: int = settings.REDIS_TIMEOUT,
         socket_connect_timeout: int = settings.REDIS_TIMEOUT,
         *,
+        username: str | None = settings.REDIS_USERNAME or None,
+        ssl: bool = settings.REDIS_SSL,
+        ssl_ca_certs: str | None = settings.REDIS_SSL_CA_CERTS,
         socket_keepalive: bool = True,
         health_check_interval: int = 30,
         decode_responses: bool = True,
+        circuit_breaker: bool = settings.REDIS_CIRCUIT_BREAKER_ENABLED,
+        pool_name: str = 'default',
+        max_connections: int | None = None,
     ) -> None:
         """
         初始化 Redis 客户端
@@ -32,21 +206,114 @@ class RedisCli(Redis):
         :param db: 使用的 Redis 逻辑数据库索引
         :param socket_timeout: Socket 读写操作的超时时间
         :param socket_connect_timeout: 建立 TCP 连接时的超时时间
+        :param username: Redis ACL 用户名，为空时使用 default 用户
+        :param ssl: 是否通过 TLS 连接
+        :param ssl_ca_certs: TLS CA 证书路径，为空时使用系统证书
         :param socket_keepalive: 是否开启 TCP Keepalive 探测
         :param health_check_interval: 健康检查间隔时间（秒）
         :param decode_responses: 是否自动将 Redis 返回的字节流（bytes）解码为字符串（utf-8）
+        :param circuit_breaker: 是否启用熔断器，执行阻塞命令的客户端应关闭
+        :param pool_name: 连接池名称，用于指标统计，默认连接数上限取自 REDIS_POOL_MAX_CONNECTIONS
+        :param max_connections: 连接数上限
         """
         super().__init__(
             host=host,
             port=port,
+            username=username,
             password=password,
             db=db,
+            ssl=ssl,
+            ssl_ca_certs=ssl_ca_certs,
             socket_timeout=socket_timeout,
             socket_connect_timeout=socket_connect_timeout,
             socket_keepalive=socket_keepalive,
             health_check_interval=health_check_interval,
             decode_responses=decode_responses,
         )
+        # 使用默认连接参数（含重试策略、TLS 及 ACL 认证）创建阻塞连接池，并由客户端负责关闭
+        self.connection_pool = RedisConnectionPool(
+            pool_name=pool_name,
+            max_connections=max_connections
+            or settings.REDIS_POOL_MAX_CONNECTIONS.get(pool_name, settings.REDIS_POOL_MAX_CONNECTIONS['default']),
+            timeout=settings.REDIS_POOL_TIMEOUT,
+            connection_class=self.connection_pool.connection_class,
+            **self.connection_pool.connection_kwargs,
+        )
+        self.auto_close_connection_pool = True
+        self.circuit_breaker = RedisCircuitBreaker() if circuit_breaker else None
+
+    @property
+    def available(self) -> bool:
+        """Redis 是否可用，熔断器打开时为 False"""
+        return self.circuit_breaker is None or self.circuit_breaker.available
+
+    async def _execute_with_breaker(self, func: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+        """
+        通过熔断器执行，启用熔断器时记录执行结果，熔断器打开时立即抛出 RedisCircuitOpenError
+
+        执行耗时不含等待连接池空闲连接的时间，连接池等待超时不计入失败
+
+        :param func: 执行函数
+        :param args: 位置参数
+        :param kwargs: 关键字参数
+        :return:
+        """
+        breaker = self.circuit_breaker
+        if breaker is None:
+            return await func(*args, **kwargs)
+
+        probing = breaker.acquire()
+        token = _pool_wait_time.set(0.0)
+        start_time = time.perf_counter()
+        try:
+            result = await func(*args, **kwargs)
+        except RedisPoolTimeoutError:
+            raise
+        except (ConnectionError, TimeoutError):
+            breaker.record_failure(probe=probing)
+            raise
+        except Exception:
+            # 服务端已响应的命令错误不计入失败
+            breaker.record_success(time.perf_counter() - start_time - _pool_wait_time.get(), probe=probing)
+            raise
+        finally:
+            # 熔断器关闭时开始的命令可能在半开状态下结束，不能释放探测命令持有的探测资格
+            if probing:
+                breaker.release()
+            elapsed = time.perf_counter() - start_time - _pool_wait_time.get()
+            _pool_wait_time.reset(token)
+        breaker.record_success(elapsed, probe=probing)
+        return result
+
+    async def execute_command(self, *args: Any, **options: Any) -> Any:
+        """
+        执行命令
+
+        :param args: 命令参数
+        :param options: 命令选项
+        :return:
+        """
+        return await self._execute_with_breaker(super().execute_command, *args, **options)
+
+    @asynccontextmanager
+    async def batch(self, *, transaction: bool = False) -> AsyncGenerator[Pipeline, None]:
+        """
+        批量执行相互独立的命令，退出上下文时通过一次 pipeline 提交，减少网络往返
+
+        命令结果在退出上下文后才可用，因此不适用于依赖前序命令结果的场景；上下文内抛出异常时不提交
+
+        :param transaction: 是否通过 MULTI/EXEC 原子执行
+        :return:
+        """
+        async with self.pipeline(transaction=transaction) as pipe:
+            try:
+                yield pipe
+            except BaseException:
+                # 丢弃已缓冲的命令
+                pipe.command_stack.clear()
+                raise
+            if len(pipe):
+                await self._execute_with_breaker(pipe.execute)
 
     async def init(self) -> None:
         """初始化 Redis 服务器"""
@@ -95,6 +362,34 @@ class RedisCli(Redis):
         """
         return [key async for key in self.scan_iter(match=f'{prefix}*', count=count)]
 
+    async def get_raw(self, name: str) -> bytes | None:
+        """
+        获取未解码的值，用于读取二进制数据
 
-# 创建 redis 客户端单例
+        :param name: 键名
+        :return:
+        """
+        return await self.execute_command('GET', name, **{NEVER_DECODE: True})
+
+    async def mget_raw(self, names: list[str]) -> list[bytes | None]:
+        """
+        批量获取未解码的值，用于读取二进制数据
+
+        :param names: 键名列表
+        :return:
+        """
+        return await self.execute_command('MGET', *names, **{NEVER_DECODE: True})
+
+
+# 创建 redis 客户端单例，按负载隔离连接池，避免 SCAN 循环或限流突增阻塞认证和缓存请求
 redis_client: RedisCli = RedisCli()
+redis_auth_client: RedisCli = RedisCli(pool_name='auth')
+redis_cache_client: RedisCli = RedisCli(pool_name='cache')
+redis_limiter_client: RedisCli = RedisCli(pool_name='limiter')
+redis_background_client: RedisCli = RedisCli(pool_name='background')
+
+
+async def close_redis_clients() -> None:
+    """关闭所有 redis 客户端单例"""
+    for client in (redis_client, redis_auth_client, redis_cache_client, redis_limiter_client, redis_background_client):
+        await client.aclose()
@@ -6,11 +6,10 @@ from starlette.authentication import AuthCredentials, AuthenticationBackend
 from starlette.authentication import AuthenticationError as StarletteAuthenticationError
 from starlette.requests import HTTPConnection
 
-from backend.app.admin.schema.user import GetUserInfoWithRelationDetail
-from backend.common.exception.errors import TokenError
+from backend.app.admin.schema.user import GetUserPrincipalDetail
+from backend.common.exception.errors import ServiceUnavailableError, TokenError
 from backend.common.log import log
-from backend.common.security.jwt import jwt_authentication
-from backend.core.conf import settings
+from backend.common.security.jwt import is_request_path_excluded, jwt_authentication
 from backend.utils.serializers import MsgSpecJSONResponse
 
 
@@ -63,12 +62,8 @@ class JwtAuthMiddleware(AuthenticationBackend):
         if not authorization:
             return None
 
-        path = request.url.path
-        if path in settings.TOKEN_REQUEST_PATH_EXCLUDE:
+        if is_request_path_excluded(request.url.path):
             return None
-        for pattern in settings.TOKEN_REQUEST_PATH_EXCLUDE_PATTERN:
-            if pattern.match(path):
-                return None
 
         scheme, token = get_authorization_scheme_param(authorization)
         if scheme.lower() != 'bearer':
@@ -76,7 +71,7 @@ class JwtAuthMiddleware(AuthenticationBackend):
 
         return token
 
-    async def authenticate(self, request: Request) -> tuple[AuthCredentials, GetUserInfoWithRelationDetail] | None:
+    async def authenticate(self, request: Request) -> tuple[AuthCredentials, GetUserPrincipalDetail] | None:
         """
         认证请求
 
@@ -91,6 +86,8 @@ class JwtAuthMiddleware(AuthenticationBackend):
             user = await jwt_authentication(token)
         except TokenError as exc:
             raise AuthenticationError(code=exc.code, msg=exc.detail, headers=exc.headers)
+        except ServiceUnavailableError as exc:
+            raise AuthenticationError(code=exc.code, msg=exc.msg)
         except Exception as e:
             log.exception(f'JWT 授权异常：{e}')
             raise AuthenticationError(code=getattr(e, 'code', 500), msg=getattr(e, 'msg', 'Internal Server Error'))
@@ -3,11 +3,14 @@ from typing import Any
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from backend.common.cache.decorator import cache_invalidate, cached
+from backend.common.cache.codec import CacheCodec
+from backend.common.cache.decorator import cache_invalidate, cache_put, cached
+from backend.common.cache.warmup import cache_warmup_manager
 from backend.common.exception import errors
 from backend.common.pagination import paging_data
 from backend.core.conf import settings
 from backend.plugin.config.crud.crud_config import config_dao
+from backend.plugin.config.enums import ConfigType
 from backend.plugin.config.model import Config
 from backend.plugin.config.schema.config import (
     CreateConfigParam,
@@ -20,7 +23,12 @@ class ConfigService:
     """参数配置服务类"""
 
     @staticmethod
-    @cached(settings.CACHE_CONFIG_REDIS_PREFIX, key='pk')
+    @cached(
+        settings.CACHE_CONFIG_REDIS_PREFIX,
+        key='pk',
+        negative_ttl=settings.CACHE_NEGATIVE_TTL,
+        negative_exceptions=(errors.NotFoundError,),
+    )
     async def get(*, db: AsyncSession, pk: int) -> Config:
         """
         获取参数配置详情
@@ -35,7 +43,13 @@ class ConfigService:
         return config
 
     @staticmethod
-    @cached(settings.CACHE_CONFIG_REDIS_PREFIX, key='type')
+    @cached(
+        settings.CACHE_CONFIG_REDIS_PREFIX,
+        key='type',
+        lock=True,
+        early_refresh=True,
+        codec=CacheCodec(format='msgpack'),
+    )
     async def get_all(*, db: AsyncSession, type: str | None) -> Sequence[Config | None]:
         """
         获取所有参数配置
@@ -60,6 +74,7 @@ class ConfigService:
         return await paging_data(db, config_select)
 
     @staticmethod
+    @cache_invalidate(settings.CACHE_CONFIG_REDIS_PREFIX)
     async def create(*, db: AsyncSession, obj: CreateConfigParam) -> None:
         """
         创建参数配置
@@ -74,7 +89,12 @@ class ConfigService:
         await config_dao.create(db, obj)
 
     @staticmethod
-    @cache_invalidate(settings.CACHE_CONFIG_REDIS_PREFIX)
+    @cache_put(
+        settings.CACHE_CONFIG_REDIS_PREFIX,
+        loader=lambda *, db, pk, obj: config_dao.get(db, pk),
+        key_builder=lambda config: config.id,
+        evict_key_builder=lambda config: config.type,
+    )
     async def update(*, db: AsyncSession, pk: int, obj: UpdateConfigParam) -> int:
         """
         更新参数配置
@@ -95,7 +115,12 @@ class ConfigService:
         return count
 
     @staticmethod
-    @cache_invalidate(settings.CACHE_CONFIG_REDIS_PREFIX)
+    @cache_put(
+        settings.CACHE_CONFIG_REDIS_PREFIX,
+        loader=lambda *, db, objs: config_dao.get_all_by_ids(db, list({obj.id for obj in objs})),
+        key_builder=lambda config: config.id,
+        evict_key_builder=lambda config: config.type,
+    )
     async def bulk_update(*, db: AsyncSession, objs: list[UpdateConfigsParam]) -> int:
         """
         批量更新参数配置
@@ -136,5 +161,18 @@ class ConfigService:
         count = await config_dao.delete(db, pks)
         return count
 
+    @staticmethod
+    async def warmup(*, db: AsyncSession) -> None:
+        """
+        预热参数配置缓存
+
+        :param db: 数据库会话
+        :return:
+        """
+        for config_type in ConfigType.get_member_values():
+            await ConfigService.get_all(db=db, type=config_type)
+
 
 config_service: ConfigService = ConfigService()
+
+cache_warmup_manager.register('config', config_service.warmup)
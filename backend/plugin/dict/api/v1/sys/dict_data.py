@@ -25,6 +25,15 @@ async def get_all_dict_datas(db: CurrentSession) -> ResponseSchemaModel[list[Get
     return response_base.success(data=data)
 
 
+@router.get('/type-codes', summary='批量获取字典数据列表', dependencies=[DependsJwtAuth])
+async def get_dict_data_by_type_codes(
+    db: CurrentSession,
+    codes: Annotated[list[str], Query(description='字典类型编码列表')],
+) -> ResponseSchemaModel[dict[str, list[GetDictDataDetail]]]:
+    data = await dict_data_service.get_by_type_codes(db=db, codes=codes)
+    return response_base.success(data=data)
+
+
 @router.get('/{pk}', summary='获取字典数据详情', dependencies=[DependsJwtAuth])
 async def get_dict_data(
     db: CurrentSession,
@@ -38,6 +38,22 @@ class CRUDDictData(CRUDPlus[DictData]):
             status=StatusType.enable.value,
         )
 
+    async def get_by_type_codes(self, db: AsyncSession, type_codes: list[str]) -> Sequence[DictData]:
+        """
+        通过字典类型编码列表批量获取字典数据
+
+        :param db: 数据库会话
+        :param type_codes: 字典类型编码列表
+        :return:
+        """
+        return await self.select_models_order(
+            db,
+            sort_columns='sort',
+            sort_orders='desc',
+            type_code__in=type_codes,
+            status=StatusType.enable.value,
+        )
+
     async def get_all(self, db: AsyncSession) -> Sequence[DictData]:
         """
         获取所有字典数据
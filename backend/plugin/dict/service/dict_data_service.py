@@ -3,7 +3,9 @@ from typing import Any
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from backend.common.cache.decorator import cache_invalidate, cached
+from backend.common.cache.codec import CacheCodec
+from backend.common.cache.decorator import cache_invalidate, cache_put, cached, cached_many
+from backend.common.cache.warmup import cache_warmup_manager
 from backend.common.exception import errors
 from backend.common.pagination import paging_data
 from backend.core.conf import settings
@@ -17,7 +19,12 @@ class DictDataService:
     """字典数据服务类"""
 
     @staticmethod
-    @cached(settings.CACHE_DICT_REDIS_PREFIX, key='pk')
+    @cached(
+        settings.CACHE_DICT_REDIS_PREFIX,
+        key='pk',
+        negative_ttl=settings.CACHE_NEGATIVE_TTL,
+        negative_exceptions=(errors.NotFoundError,),
+    )
     async def get(*, db: AsyncSession, pk: int) -> DictData:
         """
         获取字典数据详情
@@ -35,6 +42,11 @@ class DictDataService:
     @cached(
         settings.CACHE_DICT_REDIS_PREFIX,
         key_builder=lambda *, db, code: f'type:{code}',
+        lock=True,
+        early_refresh=True,
+        codec=CacheCodec(format='msgpack'),
+        negative_ttl=settings.CACHE_NEGATIVE_TTL,
+        negative_exceptions=(errors.NotFoundError,),
     )
     async def get_by_type_code(*, db: AsyncSession, code: str) -> Sequence[DictData]:
         """
@@ -49,6 +61,28 @@ class DictDataService:
             raise errors.NotFoundError(msg='字典数据不存在')
         return dict_datas
 
+    @staticmethod
+    @cached_many(
+        settings.CACHE_DICT_REDIS_PREFIX,
+        key='codes',
+        key_builder=lambda code: f'type:{code}',
+        early_refresh=True,
+        codec=CacheCodec(format='msgpack'),
+    )
+    async def get_by_type_codes(*, db: AsyncSession, codes: list[str]) -> dict[str, Sequence[DictData]]:
+        """
+        批量获取字典数据详情
+
+        :param db: 数据库会话
+        :param codes: 字典类型编码列表
+        :return:
+        """
+        dict_datas = await dict_data_dao.get_by_type_codes(db, codes)
+        data: dict[str, list[DictData]] = {}
+        for dict_data in dict_datas:
+            data.setdefault(dict_data.type_code, []).append(dict_data)
+        return data
+
     @staticmethod
     async def get_all(*, db: AsyncSession) -> Sequence[DictData]:
         """
@@ -91,6 +125,7 @@ class DictDataService:
         return await paging_data(db, dict_data_select)
 
     @staticmethod
+    @cache_invalidate(settings.CACHE_DICT_REDIS_PREFIX)
     async def create(*, db: AsyncSession, obj: CreateDictDataParam) -> None:
         """
         创建字典数据
@@ -108,7 +143,12 @@ class DictDataService:
         await dict_data_dao.create(db, obj, dict_type.code)
 
     @staticmethod
-    @cache_invalidate(settings.CACHE_DICT_REDIS_PREFIX)
+    @cache_put(
+        settings.CACHE_DICT_REDIS_PREFIX,
+        loader=lambda *, db, pk, obj: dict_data_dao.get(db, pk),
+        key_builder=lambda dict_data: dict_data.id,
+        evict_key_builder=lambda dict_data: f'type:{dict_data.type_code}',
+    )
     async def update(*, db: AsyncSession, pk: int, obj: UpdateDictDataParam) -> int:
         """
         更新字典数据
@@ -144,5 +184,20 @@ class DictDataService:
         count = await dict_data_dao.delete(db, obj.pks)
         return count
 
+    @staticmethod
+    async def warmup(*, db: AsyncSession) -> None:
+        """
+        预热字典数据缓存
+
+        :param db: 数据库会话
+        :return:
+        """
+        dict_types = await dict_type_dao.get_all(db)
+        codes = [dict_type.code for dict_type in dict_types]
+        if codes:
+            await DictDataService.get_by_type_codes(db=db, codes=codes)
+
 
 dict_data_service: DictDataService = DictDataService()
+
+cache_warmup_manager.register('dict_data', dict_data_service.warmup)
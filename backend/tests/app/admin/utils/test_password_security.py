@@ -0,0 +1,51 @@
+import asyncio
+import threading
+
+import pytest
+
+from backend.app.admin.utils.password_security import PasswordHashExecutor
+from backend.common.exception import errors
+from backend.core.conf import settings
+
+
+@pytest.fixture
+def executor(monkeypatch: pytest.MonkeyPatch) -> PasswordHashExecutor:
+    monkeypatch.setattr(settings, 'USER_PASSWORD_HASH_MAX_WORKERS', 1)
+    monkeypatch.setattr(settings, 'USER_PASSWORD_HASH_MAX_QUEUE_SIZE', 0)
+    executor = PasswordHashExecutor()
+    yield executor
+    executor._executor.shutdown()
+
+
+async def _wait_tasks(executor: PasswordHashExecutor, tasks: int) -> None:
+    for _ in range(500):
+        if executor._tasks == tasks:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f'tasks {executor._tasks} != {tasks}')
+
+
+@pytest.mark.anyio
+async def test_cancelled_task_holds_slot_until_finished(executor: PasswordHashExecutor) -> None:
+    started = threading.Event()
+    release = threading.Event()
+
+    def block() -> None:
+        started.set()
+        release.wait(5)
+
+    task = asyncio.create_task(executor.run(block))
+    await asyncio.to_thread(started.wait, 5)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    # 请求已取消但线程中的计算仍在执行
+    assert executor._tasks == 1
+    with pytest.raises(errors.ServiceUnavailableError):
+        await executor.run(lambda: None)
+
+    release.set()
+    await _wait_tasks(executor, 0)
+    assert await executor.run(lambda: 1) == 1
+    assert executor._tasks == 0
@@ -0,0 +1,20 @@
+from collections.abc import AsyncGenerator
+
+import pytest
+
+from backend.common.cache import decorator, pubsub, shard
+from backend.common.cache.local import local_cache_manager
+from backend.database.redis import RedisCli
+from backend.tests.utils.redis import create_fake_redis_client
+
+
+@pytest.fixture
+async def redis_cache(monkeypatch: pytest.MonkeyPatch) -> AsyncGenerator[RedisCli, None]:
+    client = create_fake_redis_client(pool_name='cache')
+    for module in (decorator, pubsub, shard):
+        monkeypatch.setattr(module, 'redis_cache_client', client)
+    local_cache_manager.clear()
+    yield client
+    await pubsub.cache_pubsub_manager.flush()
+    local_cache_manager.clear()
+    await client.aclose()
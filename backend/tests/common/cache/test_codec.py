@@ -0,0 +1,29 @@
+import sys
+
+import pytest
+
+from backend.common.cache.codec import CacheCodec
+from backend.common.exception import errors
+
+
+@pytest.mark.parametrize(['compression', 'module'], [['zstd', 'zstandard'], ['lz4', 'lz4.frame']])
+def test_missing_compression_dependency_fails_on_creation(
+    compression: str, module: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setitem(sys.modules, module, None)
+
+    with pytest.raises(errors.ServerError, match='cache-compression'):
+        CacheCodec(compression=compression)
+
+
+def test_invalid_codec_options() -> None:
+    with pytest.raises(errors.ServerError):
+        CacheCodec(format='pickle')
+    with pytest.raises(errors.ServerError):
+        CacheCodec(compression='gzip')
+
+
+def test_uncompressed_round_trip() -> None:
+    codec = CacheCodec(format='msgpack')
+
+    assert codec.decode(codec.pack(codec.encode({'id': 1}))) == {'id': 1}
@@ -0,0 +1,177 @@
+import asyncio
+import contextlib
+import operator
+
+from collections.abc import AsyncGenerator, Callable
+from typing import Any
+
+import pytest
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.common.cache import decorator
+from backend.common.cache.decorator import (
+    _prune_index,
+    cache_invalidate,
+    cache_put,
+    cached,
+    delete_cache,
+)
+from backend.common.cache.shard import get_index_key
+from backend.database.redis import RedisCli
+from backend.plugin.config.model import Config
+
+
+@pytest.mark.anyio
+@pytest.mark.usefixtures('redis_cache')
+async def test_single_flight_shares_detached_result() -> None:
+    calls = 0
+
+    @cached('test:single_flight', key='pk')
+    async def get(*, pk: int) -> Config:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        config = Config(name='name', type='type', key='key', value='value')
+        config.id = pk
+        return config
+
+    results = await asyncio.gather(*(get(pk=1) for _ in range(5)))
+
+    assert calls == 1
+    # 仅加载方获得 ORM 对象，其余等待者获得各自的反序列化副本
+    leaders = [result for result in results if isinstance(result, Config)]
+    followers = [result for result in results if not isinstance(result, Config)]
+    assert len(leaders) == 1
+    assert len(followers) == 4
+    assert all(isinstance(result, dict) and result['id'] == 1 for result in followers)
+
+
+async def _load_value(*, pk: int) -> dict[str, int]:
+    await asyncio.sleep(0)
+    return {'pk': pk}
+
+
+@pytest.mark.anyio
+async def test_delete_cache_removes_keys_from_namespace_index(redis_cache: RedisCli) -> None:
+    get = cached('test:index', key='pk')(_load_value)
+    await get(pk=1)
+    await get(pk=2)
+    index_key = get_index_key('test:index')
+    assert await redis_cache.smembers(index_key) == {'test:index:1', 'test:index:2'}
+
+    await delete_cache('test:index', 1)
+
+    assert await redis_cache.smembers(index_key) == {'test:index:2'}
+    assert not await redis_cache.exists('test:index:1')
+
+
+@pytest.mark.anyio
+async def test_prune_index_removes_missing_keys(redis_cache: RedisCli) -> None:
+    get = cached('test:prune', key='pk')(_load_value)
+    await get(pk=1)
+    await get(pk=2)
+    # 模拟自然过期
+    await redis_cache.delete('test:prune:1')
+
+    await _prune_index('test:prune')
+
+    assert await redis_cache.smembers(get_index_key('test:prune')) == {'test:prune:2'}
+
+
+@pytest.mark.anyio
+async def test_namespace_invalidation_deletes_indexed_and_legacy_keys(redis_cache: RedisCli) -> None:
+    get = cached('test:namespace', key='pk')(_load_value)
+    await get(pk=1)
+    # 启用索引前写入的缓存
+    await redis_cache.set('test:namespace:legacy', '{}')
+
+    await cache_invalidate('test:namespace')(_load_value)(pk=1)
+
+    assert not await redis_cache.exists('test:namespace:1', 'test:namespace:legacy')
+    assert not await redis_cache.exists(get_index_key('test:namespace'))
+    assert await redis_cache.exists(f'{get_index_key("test:namespace")}:scanned')
+
+    # 后续失效仅处理索引中登记的缓存
+    await get(pk=2)
+    await cache_invalidate('test:namespace')(_load_value)(pk=2)
+    assert not await redis_cache.exists('test:namespace:2')
+
+
+@contextlib.asynccontextmanager
+async def _dummy_db_session() -> AsyncGenerator[None, None]:
+    yield None
+
+
+async def _load_item(*, db: AsyncSession | None, pk: int, group: str) -> dict[str, int | str]:
+    await asyncio.sleep(0)
+    return {'pk': pk, 'group': group}
+
+
+async def _update(*, db: AsyncSession | None, pk: int, group: str) -> int:
+    await asyncio.sleep(0)
+    return 1
+
+
+def _put(name: str) -> Callable[..., Any]:
+    return cache_put(
+        name,
+        loader=_load_item,
+        key_builder=operator.itemgetter('pk'),
+        evict_key_builder=lambda item: f'group:{item["group"]}',
+    )(_update)
+
+
+@pytest.fixture
+def after_commit(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(decorator, 'async_db_session', _dummy_db_session)
+
+
+async def _wait_background_tasks() -> None:
+    await asyncio.gather(*decorator._background_tasks)
+
+
+@pytest.mark.anyio
+@pytest.mark.usefixtures('after_commit')
+async def test_cache_put_writes_after_commit(redis_cache: RedisCli) -> None:
+    await redis_cache.set('test:put:group:a', '[]')
+    db = AsyncSession()
+
+    async with db.begin():
+        await _put('test:put')(db=db, pk=1, group='a')
+        await _wait_background_tasks()
+        # 事务提交前不写入缓存
+        assert not await redis_cache.exists('test:put:1')
+        assert await redis_cache.exists('test:put:group:a')
+
+    await _wait_background_tasks()
+    assert await redis_cache.exists('test:put:1')
+    assert not await redis_cache.exists('test:put:group:a')
+
+
+@pytest.mark.anyio
+@pytest.mark.usefixtures('after_commit')
+async def test_cache_put_skips_rolled_back_transaction(redis_cache: RedisCli) -> None:
+    await redis_cache.set('test:put:group:a', '[]')
+    db = AsyncSession()
+
+    with pytest.raises(RuntimeError):
+        async with db.begin():
+            await _put('test:put')(db=db, pk=1, group='a')
+            raise RuntimeError
+
+    await _wait_background_tasks()
+    assert not await redis_cache.exists('test:put:1')
+    assert await redis_cache.exists('test:put:group:a')
+
+
+@pytest.mark.anyio
+async def test_cache_put_without_transaction_writes_immediately(redis_cache: RedisCli) -> None:
+    await redis_cache.set('test:put:group:a', '[]')
+    await redis_cache.set('test:put:group:b', '[]')
+
+    await _put('test:put')(db=None, pk=1, group='a')
+
+    assert await redis_cache.exists('test:put:1')
+    assert not await redis_cache.exists('test:put:group:a')
+    assert await redis_cache.exists('test:put:group:b')
@@ -0,0 +1,88 @@
+import pytest
+
+from backend.common.cache.local import LocalCacheManager
+from backend.core.conf import settings
+
+
+@pytest.fixture
+def cache(monkeypatch: pytest.MonkeyPatch) -> LocalCacheManager:
+    monkeypatch.setattr(settings, 'CACHE_LOCAL_MAX_MEMORY', 100)
+    monkeypatch.setattr(settings, 'CACHE_LOCAL_NAMESPACE_QUOTAS', {'quota': 50})
+    return LocalCacheManager()
+
+
+def test_set_rejects_oversize_value(cache: LocalCacheManager) -> None:
+    cache.set('a', 1, size=101)
+    assert cache.get('a') is None
+    assert cache.get_stats()['memory'] == 0
+
+
+def test_update_to_oversize_value_removes_old_value(cache: LocalCacheManager) -> None:
+    cache.set('a', 1, size=10)
+    cache.set('a', 2, size=101)
+    assert cache.get('a') is None
+    assert cache.get_stats()['memory'] == 0
+
+
+def test_update_to_oversize_quota_value_removes_old_value(cache: LocalCacheManager) -> None:
+    cache.set('quota:a', 1, size=10)
+    cache.set('quota:a', 2, size=51)
+    assert cache.get('quota:a') is None
+    assert cache.get_stats()['memory'] == 0
+
+
+def test_update_evicts_oldest_key_when_memory_exceeded(cache: LocalCacheManager) -> None:
+    cache.set('a', 1, size=40)
+    cache.set('b', 2, size=40)
+    cache.set('a', 3, size=70)
+    assert cache.get('a') == 3
+    assert cache.get('b') is None
+    assert cache.get_stats()['memory'] == 70
+
+
+def test_update_evicts_within_namespace_quota(cache: LocalCacheManager) -> None:
+    cache.set('quota:a', 1, size=20)
+    cache.set('quota:b', 2, size=20)
+    cache.set('other', 3, size=20)
+    cache.set('quota:b', 4, size=40)
+    assert cache.get('quota:a') is None
+    assert cache.get('quota:b') == 4
+    assert cache.get('other') == 3
+
+
+def test_admission_rejects_cold_key(cache: LocalCacheManager) -> None:
+    cache.get('a')
+    cache.set('a', 1, size=60)
+    cache.set('b', 2, size=60)
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+
+
+def test_admission_accepts_hot_key(cache: LocalCacheManager) -> None:
+    cache.set('a', 1, size=60)
+    for _ in range(3):
+        cache.get('b')
+    cache.set('b', 2, size=60)
+    assert cache.get('a') is None
+    assert cache.get('b') == 2
+
+
+def test_delete_prefix(cache: LocalCacheManager) -> None:
+    cache.set('ns:1', 1)
+    cache.set('ns:2', 2)
+    cache.set('ns_other:1', 3)
+    cache.delete_prefix('ns', exclude='ns:2')
+    assert cache.get('ns:1') is None
+    assert cache.get('ns:2') == 2
+    assert cache.get('ns_other:1') == 3
+
+
+def test_custom_limits() -> None:
+    cache = LocalCacheManager(2, ttl=5, max_memory=10)
+    cache.set('a', 1, size=11)
+    assert cache.get('a') is None
+
+    for key in ('a', 'b', 'c'):
+        cache.set(key, 1, size=1)
+    assert len(cache.hot_cache) == 2
+    assert 0 < cache.hot_cache.get_with_expire('c')[1] <= 5
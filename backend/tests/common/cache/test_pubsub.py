@@ -0,0 +1,155 @@
+import asyncio
+import json
+
+from collections.abc import Callable, Generator
+from typing import Any
+
+import pytest
+
+from fakeredis import FakeServer
+
+from backend.common.cache import pubsub
+from backend.common.cache.local import local_cache_manager, token_cache_manager
+from backend.common.cache.pubsub import CachePubSubManager
+from backend.core.conf import settings
+from backend.database.redis import RedisCli
+from backend.tests.utils.redis import create_fake_redis_client
+
+STREAM = settings.CACHE_INVALIDATION_STREAM
+
+
+@pytest.fixture
+def retry_delay(monkeypatch: pytest.MonkeyPatch) -> Generator[None, None, None]:
+    monkeypatch.setattr(settings, 'CACHE_PUBSUB_RECONNECT_DELAY', 0.01)
+    monkeypatch.setattr(settings, 'CACHE_PUBSUB_RECONNECT_MAX_DELAY', 0.02)
+    yield
+    CachePubSubManager._set_local_cache_bypass(bypass=False)
+
+
+async def _wait_until(predicate: Callable[[], bool]) -> None:
+    for _ in range(500):
+        if predicate():
+            return
+        await asyncio.sleep(0.01)
+    raise TimeoutError
+
+
+async def _add(client: RedisCli, count: int, **kwargs) -> list[str]:
+    return [await client.xadd(STREAM, {'keys': '[]'}, **kwargs) for _ in range(count)]
+
+
+@pytest.mark.anyio
+async def test_no_missed_notifications(redis_cache: RedisCli) -> None:
+    assert not await CachePubSubManager._is_missed(redis_cache, '0-0')
+
+    ids = await _add(redis_cache, 3)
+    assert not await CachePubSubManager._is_missed(redis_cache, ids[0])
+    # 最后消费的通知已被裁剪，但之后没有新的通知
+    await redis_cache.xtrim(STREAM, maxlen=0, approximate=False)
+    assert not await CachePubSubManager._is_missed(redis_cache, ids[-1])
+
+
+@pytest.mark.anyio
+async def test_missed_deleted_notification(redis_cache: RedisCli) -> None:
+    ids = await _add(redis_cache, 3)
+    await redis_cache.xdel(STREAM, ids[1])
+
+    assert await CachePubSubManager._is_missed(redis_cache, ids[0])
+    assert not await CachePubSubManager._is_missed(redis_cache, ids[1])
+
+
+@pytest.mark.anyio
+async def test_missed_trimmed_notification(redis_cache: RedisCli) -> None:
+    ids = await _add(redis_cache, 3)
+    await redis_cache.xtrim(STREAM, maxlen=1, approximate=False)
+
+    assert await CachePubSubManager._is_missed(redis_cache, ids[0])
+    assert not await CachePubSubManager._is_missed(redis_cache, ids[2])
+
+
+@pytest.mark.anyio
+async def test_missed_when_stream_removed(redis_cache: RedisCli) -> None:
+    assert await CachePubSubManager._is_missed(redis_cache, '1-0')
+
+
+def test_remote_invalidation_applies_to_token_cache() -> None:
+    prefix = f'{settings.TOKEN_LOCAL_CACHE_PREFIX}:1'
+    token_cache_manager.set(f'{prefix}:session:digest', 'user')
+    token_cache_manager.set(f'{settings.TOKEN_LOCAL_CACHE_PREFIX}:2:session:digest', 'user')
+
+    CachePubSubManager._handle_message({'node': 'other', 'prefixes': json.dumps([prefix])})
+
+    assert token_cache_manager.get(f'{prefix}:session:digest') is None
+    assert token_cache_manager.get(f'{settings.TOKEN_LOCAL_CACHE_PREFIX}:2:session:digest') == 'user'
+    token_cache_manager.clear()
+
+
+@pytest.mark.anyio
+async def test_failed_flush_is_published_next_time(redis_cache: RedisCli, monkeypatch: pytest.MonkeyPatch) -> None:
+    xadd = redis_cache.xadd
+    calls = 0
+
+    async def fail_once(*args: Any, **kwargs: Any) -> str:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise ConnectionError('redis unavailable')
+        return await xadd(*args, **kwargs)
+
+    monkeypatch.setattr(redis_cache, 'xadd', fail_once)
+    await CachePubSubManager.publish_invalidation('test:pubsub:1')
+    await CachePubSubManager.publish_invalidation('test:pubsub', is_delete_prefix=True)
+    assert not await CachePubSubManager.flush()
+
+    assert await CachePubSubManager.flush()
+    [(_, fields)] = await redis_cache.xrange(STREAM)
+    assert json.loads(fields['prefixes']) == ['test:pubsub']
+
+
+@pytest.mark.anyio
+async def test_requeue_keeps_newer_notifications(redis_cache: RedisCli) -> None:
+    await CachePubSubManager.publish_put('test:pubsub:2', b'new')
+    await CachePubSubManager.publish_invalidation('test:pubsub:3')
+
+    CachePubSubManager._requeue(
+        {'test:old'},
+        {'test:pubsub:1', 'test:pubsub:2'},
+        {'test:pubsub:2': ('old', False), 'test:pubsub:3': ('old', False), 'test:pubsub:4': ('old', False)},
+    )
+
+    assert CachePubSubManager._pending_prefixes == {'test:old'}
+    assert CachePubSubManager._pending_keys == {'test:pubsub:1', 'test:pubsub:3'}
+    assert CachePubSubManager._pending_puts == {
+        'test:pubsub:2': ('bmV3', False),
+        'test:pubsub:4': ('old', False),
+    }
+
+
+@pytest.mark.anyio
+@pytest.mark.usefixtures('retry_delay')
+async def test_listener_keeps_reconnecting_and_bypasses_local_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    server = FakeServer()
+    failures = 12
+    attempts = 0
+
+    def factory(**kwargs: Any) -> RedisCli:
+        nonlocal attempts
+        attempts += 1
+        if attempts <= failures:
+            raise ConnectionError('redis unavailable')
+        return create_fake_redis_client(server, **kwargs)
+
+    monkeypatch.setattr(pubsub, 'RedisCli', factory)
+    CachePubSubManager.start_listener()
+    try:
+        # 断开期间不读写本地缓存
+        local_cache_manager.set('test:pubsub:1', 1)
+        assert local_cache_manager.get('test:pubsub:1') is None
+
+        await _wait_until(lambda: not local_cache_manager.bypass)
+        assert attempts == failures + 1
+        local_cache_manager.set('test:pubsub:1', 1)
+        assert local_cache_manager.get('test:pubsub:1') == 1
+    finally:
+        await CachePubSubManager.stop_listener()
+        local_cache_manager.clear()
@@ -0,0 +1,75 @@
+import os
+import time
+
+from pathlib import Path
+
+import pytest
+
+from backend.common.cache import snapshot as snapshot_module
+from backend.common.cache.local import local_cache_manager
+from backend.common.cache.snapshot import CacheSnapshotManager
+from backend.core.conf import settings
+
+
+@pytest.fixture
+def manager(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> CacheSnapshotManager:
+    monkeypatch.setattr(settings, 'CACHE_LOCAL_ENABLED', True)
+    monkeypatch.setattr(settings, 'CACHE_LOCAL_SNAPSHOT_ENABLED', True)
+    monkeypatch.setattr(snapshot_module.cache_pubsub_manager, 'get_last_id', lambda: '1-0')
+    local_cache_manager.clear()
+    yield CacheSnapshotManager(tmp_path / '.cache.snapshot')
+    local_cache_manager.clear()
+
+
+def test_snapshot_restores_remaining_ttl(manager: CacheSnapshotManager) -> None:
+    local_cache_manager.register_namespace('test:snapshot')
+    local_cache_manager.set('test:snapshot:1', {'id': 1}, size=10, ttl=30)
+    manager.save()
+    local_cache_manager.clear()
+
+    assert manager.restore() == '1-0'
+    value, expire = local_cache_manager.hot_cache.get_with_expire('test:snapshot:1')
+    assert value == {'id': 1}
+    assert 0 < expire <= 30
+
+
+def test_snapshot_excludes_namespaces(manager: CacheSnapshotManager) -> None:
+    local_cache_manager.register_namespace('test:snapshot')
+    local_cache_manager.register_namespace('test:typed', snapshot=False)
+    local_cache_manager.set('test:snapshot:1', {'id': 1})
+    local_cache_manager.set('test:typed:1', {'id': 1})
+    local_cache_manager.set('test:unregistered:1', {'id': 1})
+    # 无法按 msgpack 编码的缓存值
+    local_cache_manager.set('test:snapshot:2', object())
+    manager.save()
+    local_cache_manager.clear()
+
+    manager.restore()
+
+    assert list(local_cache_manager.hot_cache.keys()) == ['test:snapshot:1']
+
+
+def test_snapshot_is_claimed_by_one_process(manager: CacheSnapshotManager) -> None:
+    local_cache_manager.register_namespace('test:snapshot')
+    local_cache_manager.set('test:snapshot:1', {'id': 1})
+    manager.save()
+
+    assert (manager.path.parent / f'.cache.snapshot.{os.getpid()}').exists()
+    assert manager.restore() == '1-0'
+    assert manager.restore() is None
+
+
+def test_snapshot_removes_expired_files(manager: CacheSnapshotManager) -> None:
+    expired = manager.path.parent / '.cache.snapshot.1'
+    expired.write_bytes(b'')
+    past = time.time() - settings.CACHE_LOCAL_TTL - 1
+    os.utime(expired, (past, past))
+
+    assert manager.restore() is None
+    assert not expired.exists()
+
+
+def test_snapshot_ignores_untrusted_format(manager: CacheSnapshotManager) -> None:
+    (manager.path.parent / '.cache.snapshot.1').write_bytes(b'\x80\x04\x95')
+
+    assert manager.restore() is None
@@ -0,0 +1,36 @@
+import re
+
+import pytest
+
+from backend.common.security import jwt
+from backend.common.security.jwt import is_request_path_excluded
+
+
+@pytest.fixture
+def exclude_patterns(monkeypatch: pytest.MonkeyPatch) -> None:
+    patterns = (
+        re.compile(r'(?i)^/api/v1/public/'),
+        re.compile(r'^/a/(?P<id>\d+)$'),
+        re.compile(r'^/b/(?P<id>\d+)/(\d)/\2$'),
+        re.compile(r'^/c/(\d)/\1$'),
+    )
+    monkeypatch.setattr(jwt, '_request_path_exclude_patterns', patterns)
+
+
+@pytest.mark.usefixtures('exclude_patterns')
+@pytest.mark.parametrize(
+    ['path', 'excluded'],
+    [
+        # 以全局标志开头的正则
+        ['/API/V1/Public/docs', True],
+        # 多个正则使用相同的命名分组
+        ['/a/1', True],
+        ['/b/1/2/2', True],
+        # 非首个正则中的编号反向引用
+        ['/c/1/1', True],
+        ['/c/1/2', False],
+        ['/d', False],
+    ],
+)
+def test_request_path_exclude_patterns(path: str, *, excluded: bool) -> None:
+    assert is_request_path_excluded(path) is excluded
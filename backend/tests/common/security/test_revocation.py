@@ -0,0 +1,122 @@
+import asyncio
+import json
+import time
+
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+
+from fakeredis import FakeServer
+
+from backend.common.exception import errors
+from backend.common.security import revocation
+from backend.common.security.revocation import TokenRevocationManager
+from backend.core.conf import settings
+from backend.database.redis import RedisCli
+from backend.tests.utils.redis import create_fake_redis_client
+
+
+@pytest.fixture
+def server(monkeypatch: pytest.MonkeyPatch) -> FakeServer:
+    server = FakeServer()
+    monkeypatch.setattr(settings, 'TOKEN_STATELESS_ENABLED', True)
+    monkeypatch.setattr(settings, 'CACHE_PUBSUB_RECONNECT_DELAY', 0.01)
+    monkeypatch.setattr(settings, 'TOKEN_REVOKED_RECONNECT_MAX_DELAY', 0.02)
+    monkeypatch.setattr(revocation, 'redis_auth_client', create_fake_redis_client(server))
+    return server
+
+
+def _fake_client_factory(server: FakeServer, *, failures: int = 0) -> Any:
+    attempts = 0
+
+    def factory(**kwargs: Any) -> RedisCli:
+        nonlocal attempts
+        attempts += 1
+        if attempts <= failures:
+            raise ConnectionError('redis unavailable')
+        return create_fake_redis_client(server, **kwargs)
+
+    return factory
+
+
+async def _wait_until(predicate: Callable[[], bool]) -> None:
+    for _ in range(500):
+        if predicate():
+            return
+        await asyncio.sleep(0.01)
+    raise TimeoutError
+
+
+@pytest.mark.anyio
+async def test_listener_applies_revocation_notifications(server: FakeServer, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(revocation, 'RedisCli', _fake_client_factory(server))
+    manager = TokenRevocationManager()
+    await manager.start_listener()
+    try:
+        await _wait_until(lambda: manager.ready)
+        publisher = create_fake_redis_client(server)
+        await publisher.publish(settings.TOKEN_REVOKED_CHANNEL, json.dumps({'1:uuid': time.time() + 60}))
+
+        await _wait_until(lambda: manager.is_revoked(1, 'uuid'))
+    finally:
+        await manager.stop_listener()
+
+    assert not manager.ready
+
+
+@pytest.mark.anyio
+async def test_listener_keeps_reconnecting(server: FakeServer, monkeypatch: pytest.MonkeyPatch) -> None:
+    failures = 12
+    monkeypatch.setattr(revocation, 'RedisCli', _fake_client_factory(server, failures=failures))
+    await revocation.redis_auth_client.zadd(settings.TOKEN_REVOKED_REDIS_PREFIX, {'1:uuid': time.time() + 60})
+    manager = TokenRevocationManager()
+    await manager.start_listener()
+    try:
+        await _wait_until(lambda: manager.ready)
+    finally:
+        await manager.stop_listener()
+
+    assert manager.is_revoked(1, 'uuid')
+
+
+@pytest.mark.anyio
+async def test_listener_rebuilds_periodically(server: FakeServer, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(revocation, 'RedisCli', _fake_client_factory(server))
+    monkeypatch.setattr(settings, 'TOKEN_REVOKED_REBUILD_INTERVAL', 0)
+    manager = TokenRevocationManager()
+    await manager.start_listener()
+    try:
+        await _wait_until(lambda: manager.ready)
+        # 写入撤销记录但不发布通知，模拟丢失的 Pub/Sub 消息
+        await revocation.redis_auth_client.zadd(settings.TOKEN_REVOKED_REDIS_PREFIX, {'1:uuid': time.time() + 60})
+
+        await _wait_until(lambda: manager.is_revoked(1, 'uuid'))
+    finally:
+        await manager.stop_listener()
+
+
+@pytest.mark.anyio
+@pytest.mark.usefixtures('server')
+async def test_check_queries_redis_when_unsynced() -> None:
+    manager = TokenRevocationManager()
+    await revocation.redis_auth_client.zadd(settings.TOKEN_REVOKED_REDIS_PREFIX, {'1:uuid': time.time() + 60})
+
+    assert not manager.ready
+    assert not manager.is_revoked(1, 'uuid')
+    assert await manager.check(1, 'uuid')
+    assert not await manager.check(1, 'other')
+
+
+@pytest.mark.anyio
+@pytest.mark.usefixtures('server')
+async def test_check_rejects_when_unsynced_and_redis_unavailable(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def zscore(*_args: Any) -> None:
+        await asyncio.sleep(0)
+        raise ConnectionError('redis unavailable')
+
+    monkeypatch.setattr(revocation.redis_auth_client, 'zscore', zscore)
+    manager = TokenRevocationManager()
+
+    with pytest.raises(errors.ServiceUnavailableError):
+        await manager.check(1, 'uuid')
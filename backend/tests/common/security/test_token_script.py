@@ -0,0 +1,122 @@
+import pytest
+
+from backend.common.exception import errors
+from backend.common.security import jwt
+from backend.core.conf import settings
+from backend.database.redis import RedisCli
+from backend.tests.utils.redis import create_fake_redis_client
+
+USERNAME_INDEX = f'{settings.TOKEN_ONLINE_SESSION_REDIS_PREFIX}:username:admin'
+
+
+@pytest.fixture
+def redis_auth(monkeypatch: pytest.MonkeyPatch) -> RedisCli:
+    client = create_fake_redis_client()
+    monkeypatch.setattr(jwt, 'redis_auth_client', client)
+    monkeypatch.setattr(settings, 'TOKEN_LOCAL_CACHE_ENABLED', False)
+    return client
+
+
+async def _login(*, multi_login: bool = True) -> tuple[str, str]:
+    access_token = await jwt.create_access_token(1, multi_login=multi_login, username='admin', ip='127.0.0.1')
+    refresh_token = await jwt.create_refresh_token(access_token.session_uuid, 1, multi_login=multi_login)
+    return access_token.session_uuid, refresh_token.refresh_token
+
+
+def _session_keys(session_uuid: str) -> list[str]:
+    return [
+        f'{settings.TOKEN_REDIS_PREFIX}:1:{session_uuid}',
+        f'{settings.TOKEN_EXTRA_INFO_REDIS_PREFIX}:1:{session_uuid}',
+        f'{settings.TOKEN_REFRESH_REDIS_PREFIX}:1:{session_uuid}',
+    ]
+
+
+@pytest.mark.anyio
+async def test_issue_access_token_writes_online_indexes(redis_auth: RedisCli) -> None:
+    session_uuid, _ = await _login()
+
+    assert await redis_auth.exists(*_session_keys(session_uuid)) == 3
+    assert await redis_auth.zscore(settings.TOKEN_ONLINE_SESSION_REDIS_PREFIX, f'1:{session_uuid}')
+    assert await redis_auth.zscore(USERNAME_INDEX, f'1:{session_uuid}')
+
+
+@pytest.mark.anyio
+async def test_revoke_user_sessions_cleans_all_indexes(redis_auth: RedisCli) -> None:
+    kept, _ = await _login()
+    revoked, _ = await _login()
+
+    await jwt.revoke_user_sessions(1, username='admin', exclude=kept)
+
+    assert not await redis_auth.exists(*_session_keys(revoked))
+    assert await redis_auth.exists(*_session_keys(kept)) == 3
+    assert await redis_auth.zrange(settings.TOKEN_ONLINE_SESSION_REDIS_PREFIX, 0, -1) == [f'1:{kept}']
+    assert await redis_auth.zrange(USERNAME_INDEX, 0, -1) == [f'1:{kept}']
+    assert await jwt.get_user_sessions(1) == [kept]
+
+
+@pytest.mark.anyio
+async def test_single_login_revokes_previous_sessions(redis_auth: RedisCli) -> None:
+    previous, _ = await _login(multi_login=False)
+    current, _ = await _login(multi_login=False)
+
+    assert not await redis_auth.exists(*_session_keys(previous))
+    assert await redis_auth.zrange(USERNAME_INDEX, 0, -1) == [f'1:{current}']
+
+
+@pytest.mark.anyio
+async def test_revoke_token_cleans_username_index(redis_auth: RedisCli) -> None:
+    session_uuid, _ = await _login()
+
+    await jwt.revoke_token(1, session_uuid, username='admin', refresh=True)
+
+    assert not await redis_auth.exists(*_session_keys(session_uuid))
+    assert not await redis_auth.exists(settings.TOKEN_ONLINE_SESSION_REDIS_PREFIX, USERNAME_INDEX)
+    assert await jwt.get_user_sessions(1) == []
+
+
+@pytest.mark.anyio
+async def test_rotate_token(redis_auth: RedisCli) -> None:
+    session_uuid, refresh_token = await _login()
+
+    new_token = await jwt.create_new_token(refresh_token, session_uuid, 1, multi_login=True, username='admin')
+
+    assert not await redis_auth.exists(*_session_keys(session_uuid))
+    assert await redis_auth.exists(*_session_keys(new_token.session_uuid)) == 3
+    assert await redis_auth.zrange(USERNAME_INDEX, 0, -1) == [f'1:{new_token.session_uuid}']
+
+    # 旧刷新 token 仅能使用一次
+    with pytest.raises(errors.TokenError):
+        await jwt.create_new_token(refresh_token, session_uuid, 1, multi_login=True, username='admin')
+
+
+@pytest.mark.anyio
+async def test_get_online_sessions_refills_page(redis_auth: RedisCli) -> None:
+    for _ in range(4):
+        await _login()
+    members = await redis_auth.zrevrange(USERNAME_INDEX, 0, -1)
+    # 第一页的会话 token 已删除但仍留在用户名在线会话索引中
+    for member in members[:2]:
+        await redis_auth.delete(f'{settings.TOKEN_REDIS_PREFIX}:{member}')
+
+    total, sessions = await jwt.get_online_sessions(username='admin', offset=0, limit=2)
+
+    assert total == 2
+    assert [f'{user_id}:{session_uuid}' for user_id, session_uuid, _ in sessions] == members[2:]
+    assert await redis_auth.zcard(USERNAME_INDEX) == 2
+
+
+@pytest.mark.anyio
+async def test_token_without_extra_info_is_online(redis_auth: RedisCli) -> None:
+    access_token = await jwt.create_access_token(2, multi_login=True)
+
+    assert not await redis_auth.exists(f'{settings.TOKEN_EXTRA_INFO_REDIS_PREFIX}:2:{access_token.session_uuid}')
+    total, sessions = await jwt.get_online_sessions()
+    assert total == 1
+    assert [(user_id, session_uuid) for user_id, session_uuid, _ in sessions] == [(2, access_token.session_uuid)]
+
+
+@pytest.mark.anyio
+async def test_swagger_token_is_not_online(redis_auth: RedisCli) -> None:
+    await jwt.create_access_token(2, multi_login=True, swagger=True)
+
+    assert await jwt.get_online_sessions() == (0, [])
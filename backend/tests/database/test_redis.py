@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+
+from redis.asyncio.connection import SSLConnection
+from redis.exceptions import ConnectionError
+
+from backend.common.enums import RedisCircuitState
+from backend.core.conf import settings
+from backend.database.redis import RedisCircuitOpenError, RedisCli, RedisConnectionPool, RedisPoolTimeoutError
+from backend.tests.utils.redis import create_fake_redis_client
+
+
+@pytest.fixture
+def client(monkeypatch: pytest.MonkeyPatch) -> RedisCli:
+    monkeypatch.setattr(settings, 'REDIS_POOL_TIMEOUT', 0.05)
+    monkeypatch.setattr(settings, 'REDIS_CIRCUIT_BREAKER_FAILURE_THRESHOLD', 2)
+    monkeypatch.setattr(settings, 'REDIS_CIRCUIT_BREAKER_SLOW_CALL_THRESHOLD', 0.05)
+    monkeypatch.setattr(settings, 'REDIS_CIRCUIT_BREAKER_RECOVERY_TIMEOUT', 0)
+    return create_fake_redis_client(max_connections=1)
+
+
+async def _fail() -> None:
+    await asyncio.sleep(0)
+    raise ConnectionError('redis unavailable')
+
+
+@pytest.mark.anyio
+async def test_breaker_opens_after_failures_and_closes_after_probe(client: RedisCli) -> None:
+    breaker = client.circuit_breaker
+    for _ in range(settings.REDIS_CIRCUIT_BREAKER_FAILURE_THRESHOLD):
+        with pytest.raises(ConnectionError):
+            await client._execute_with_breaker(_fail)
+    assert breaker.state == RedisCircuitState.open
+
+    # 半开状态下探测成功后关闭
+    await client.set('key', 'value')
+    assert breaker.state == RedisCircuitState.closed
+
+
+@pytest.mark.anyio
+async def test_breaker_rejects_while_open(client: RedisCli, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, 'REDIS_CIRCUIT_BREAKER_RECOVERY_TIMEOUT', 60)
+    for _ in range(settings.REDIS_CIRCUIT_BREAKER_FAILURE_THRESHOLD):
+        with pytest.raises(ConnectionError):
+            await client._execute_with_breaker(_fail)
+
+    with pytest.raises(RedisCircuitOpenError):
+        await client.get('key')
+    assert not client.available
+
+
+@pytest.mark.anyio
+async def test_pool_timeout_is_not_breaker_failure(client: RedisCli) -> None:
+    connection = await client.connection_pool.get_connection()
+    try:
+        for _ in range(settings.REDIS_CIRCUIT_BREAKER_FAILURE_THRESHOLD + 1):
+            with pytest.raises(RedisPoolTimeoutError):
+                await client.get('key')
+    finally:
+        await client.connection_pool.release(connection)
+
+    assert client.circuit_breaker.state == RedisCircuitState.closed
+    assert await client.set('key', 'value')
+
+
+@pytest.mark.anyio
+async def test_pool_wait_is_not_slow_call(client: RedisCli, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(client.connection_pool, 'timeout', 1)
+    connection = await client.connection_pool.get_connection()
+
+    async def release_later() -> None:
+        await asyncio.sleep(0.1)
+        await client.connection_pool.release(connection)
+
+    task = asyncio.create_task(release_later())
+    for _ in range(settings.REDIS_CIRCUIT_BREAKER_FAILURE_THRESHOLD):
+        await client.set('key', 'value')
+    await task
+
+    assert client.circuit_breaker._failures == 0
+
+
+@pytest.mark.anyio
+async def test_command_started_before_half_open_keeps_probe(client: RedisCli) -> None:
+    breaker = client.circuit_breaker
+    started = asyncio.Event()
+    finish = asyncio.Event()
+
+    async def slow() -> None:
+        started.set()
+        await finish.wait()
+
+    # 熔断器关闭时开始的命令
+    task = asyncio.create_task(client._execute_with_breaker(slow))
+    await started.wait()
+    for _ in range(settings.REDIS_CIRCUIT_BREAKER_FAILURE_THRESHOLD):
+        with pytest.raises(ConnectionError):
+            await client._execute_with_breaker(_fail)
+
+    # 半开状态下仅允许一个探测命令
+    assert breaker.acquire()
+    finish.set()
+    await task
+    # 之前开始的命令结束后不释放探测资格，也不改变熔断器状态
+    assert breaker.state == RedisCircuitState.half_open
+    with pytest.raises(RedisCircuitOpenError):
+        breaker.acquire()
+
+
+def test_pool_keeps_ssl_and_username() -> None:
+    client = RedisCli(username='acl', ssl=True, ssl_ca_certs='/etc/ssl/redis-ca.pem', pool_name='auth')
+    pool = client.connection_pool
+
+    assert isinstance(pool, RedisConnectionPool)
+    assert pool.connection_class is SSLConnection
+    assert pool.connection_kwargs['username'] == 'acl'
+    assert pool.connection_kwargs['ssl_ca_certs'] == '/etc/ssl/redis-ca.pem'
@@ -0,0 +1,33 @@
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeRedis
+
+from backend.core.conf import settings
+from backend.database.redis import RedisCli, RedisConnectionPool
+
+
+def create_fake_redis_client(
+    server: FakeServer | None = None,
+    *,
+    pool_name: str = 'default',
+    max_connections: int | None = None,
+    circuit_breaker: bool = True,
+) -> RedisCli:
+    """
+    创建连接 fakeredis 的 Redis 客户端，保留 RedisCli 的连接池、熔断器等行为
+
+    :param server: fakeredis 服务，多个客户端传入同一服务时共享数据
+    :param pool_name: 连接池名称
+    :param max_connections: 连接数上限
+    :param circuit_breaker: 是否启用熔断器
+    :return:
+    """
+    client = RedisCli(circuit_breaker=circuit_breaker, pool_name=pool_name, max_connections=max_connections)
+    fake_pool = FakeRedis(server=server or FakeServer(), decode_responses=True).connection_pool
+    client.connection_pool = RedisConnectionPool(
+        pool_name=pool_name,
+        max_connections=client.connection_pool.max_connections,
+        timeout=settings.REDIS_POOL_TIMEOUT,
+        connection_class=fake_pool.connection_class,
+        **fake_pool.connection_kwargs,
+    )
+    return client
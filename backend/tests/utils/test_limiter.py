@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from fastapi import Request, Response
+from pyrate_limiter import Duration, Rate
+from redis.exceptions import ConnectionError
+
+from backend.common.exception import errors
+from backend.core.conf import settings
+from backend.database.redis import RedisCli
+from backend.tests.utils.redis import create_fake_redis_client
+from backend.utils import limiter as limiter_module
+from backend.utils.limiter import RateLimiter
+
+
+@pytest.fixture
+def redis_limiter(monkeypatch: pytest.MonkeyPatch) -> RedisCli:
+    monkeypatch.setattr(settings, 'REDIS_CIRCUIT_BREAKER_FAILURE_THRESHOLD', 1)
+    monkeypatch.setattr(settings, 'REDIS_CIRCUIT_BREAKER_RECOVERY_TIMEOUT', 60)
+    client = create_fake_redis_client(pool_name='limiter')
+    monkeypatch.setattr(limiter_module, 'redis_limiter_client', client)
+    return client
+
+
+def _request() -> Request:
+    return Request({'type': 'http', 'path': '/login', 'headers': [], 'client': ('127.0.0.1', 0)})
+
+
+async def _fail() -> None:
+    await asyncio.sleep(0)
+    raise ConnectionError('redis unavailable')
+
+
+async def _call(limiter: RateLimiter) -> None:
+    await limiter(_request(), Response())
+
+
+@pytest.mark.anyio
+async def test_limiter_uses_redis(redis_limiter: RedisCli) -> None:
+    limiter = RateLimiter(Rate(1, Duration.MINUTE))
+
+    await _call(limiter)
+    with pytest.raises(errors.HTTPError):
+        await _call(limiter)
+    assert await redis_limiter.keys(f'{settings.REQUEST_LIMITER_REDIS_PREFIX}*')
+
+
+@pytest.mark.anyio
+async def test_limiter_falls_back_when_circuit_open(redis_limiter: RedisCli) -> None:
+    with pytest.raises(ConnectionError):
+        await redis_limiter._execute_with_breaker(_fail)
+    assert not redis_limiter.available
+    limiter = RateLimiter(Rate(1, Duration.MINUTE))
+
+    await _call(limiter)
+    with pytest.raises(errors.HTTPError):
+        await _call(limiter)
+
+
+@pytest.mark.anyio
+async def test_limiter_falls_back_when_redis_fails(redis_limiter: RedisCli, monkeypatch: pytest.MonkeyPatch) -> None:
+    limiter = RateLimiter(Rate(1, Duration.MINUTE))
+    await _call(limiter)
+    monkeypatch.setattr(redis_limiter, 'evalsha', lambda *_args, **_kwargs: _fail())
+
+    # Redis 不可用后按进程内限流计数
+    await _call(limiter)
+    with pytest.raises(errors.HTTPError):
+        await _call(limiter)
@@ -4,14 +4,15 @@ from typing import TypeAlias
 
 from fastapi import Request, Response
 from fastapi_pagination.utils import is_async_callable
-from pyrate_limiter import AbstractBucket, Limiter, Rate
+from pyrate_limiter import AbstractBucket, InMemoryBucket, Limiter, Rate
 from pyrate_limiter.buckets import RedisBucket
+from redis.exceptions import ConnectionError, TimeoutError
 from starlette.concurrency import run_in_threadpool
 
 from backend.common.exception import errors
 from backend.common.response.response_code import StandardResponseCode
 from backend.core.conf import settings
-from backend.database.redis import redis_client
+from backend.database.redis import redis_limiter_client
 from backend.utils.request_parse import get_request_ip
 
 IdentifierCallable: TypeAlias = Callable[[Request], str] | Callable[[Request], Awaitable[str]]
@@ -75,25 +76,66 @@ class RateLimiter:
         self.bucket = bucket
         self.limiter = limiter
         self.callback = callback
+        self._redis_bucket: AbstractBucket | None = None
+        self._redis_limiter: Limiter | None = None
+        self._local_bucket: AbstractBucket | None = None
+        self._local_limiter: Limiter | None = None
 
-    async def __call__(self, request: Request, response: Response) -> None:
-        if self.limiter is None:
-            if self.bucket is None:
-                self.bucket = await RedisBucket.init(  # type: ignore
+    def _get_local_limiter(self) -> tuple[Limiter, AbstractBucket]:
+        """
+        获取进程内限流器，Redis 不可用时使用，避免认证等接口在熔断期间失去限流保护
+
+        :return:
+        """
+        if self._local_limiter is None:
+            self._local_bucket = InMemoryBucket(self.rates)
+            self._local_limiter = Limiter(self._local_bucket)
+        return self._local_limiter, self._local_bucket
+
+    async def _get_limiter(self) -> tuple[Limiter, AbstractBucket | None, bool]:
+        """
+        获取限流器
+
+        :return: (限流器, 限流桶, 是否可回退到进程内限流器)
+        """
+        if self.limiter is not None:
+            return self.limiter, self.bucket, False
+        if self.bucket is not None:
+            self.limiter = Limiter(self.bucket)
+            return self.limiter, self.bucket, False
+
+        # 未指定限流桶时使用 Redis 限流，Redis 熔断期间回退到进程内限流
+        if not redis_limiter_client.available:
+            return *self._get_local_limiter(), False
+        if self._redis_limiter is None:
+            try:
+                self._redis_bucket = await RedisBucket.init(  # type: ignore
                     rates=self.rates,
-                    redis=redis_client,
+                    redis=redis_limiter_client,
                     bucket_key=f'{settings.REQUEST_LIMITER_REDIS_PREFIX}',
                 )
-            self.limiter = Limiter(self.bucket)
+            except (ConnectionError, TimeoutError):
+                return *self._get_local_limiter(), False
+            self._redis_limiter = Limiter(self._redis_bucket)
+        return self._redis_limiter, self._redis_bucket, True
 
+    async def __call__(self, request: Request, response: Response) -> None:
         if is_async_callable(self.identifier):
             identifier = await self.identifier(request)
         else:
             identifier = await run_in_threadpool(self.identifier, request)
 
-        acquired = await self.limiter.try_acquire_async(identifier, blocking=False)
+        limiter, bucket, fallback = await self._get_limiter()
+        try:
+            acquired = await limiter.try_acquire_async(identifier, blocking=False)
+        except (ConnectionError, TimeoutError):
+            if not fallback:
+                raise
+            # Redis 不可用时回退到进程内限流，限流阈值按单进程计算
+            limiter, bucket = self._get_local_limiter()
+            acquired = await limiter.try_acquire_async(identifier, blocking=False)
         if not acquired:
-            retry_after = ceil(self.bucket.failing_rate.interval / 1000)
+            retry_after = ceil(bucket.failing_rate.interval / 1000)
             if is_async_callable(self.callback):
                 await self.callback(request, response, retry_after)
             else:
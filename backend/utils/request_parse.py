@@ -89,21 +89,27 @@ async def parse_ip_info(request: Request) -> IpInfo:
     """
     country, region, city = None, None, None
     ip = get_request_ip(request)
-    location = await redis_client.get(f'{settings.IP_LOCATION_REDIS_PREFIX}:{ip}')
-    if location:
-        country, region, city = location.split('|')
-        return IpInfo(ip=ip, country=country, region=region, city=city)
+
+    # Redis 熔断期间跳过缓存，并使用离线解析
+    degraded = not redis_client.available
+    if not degraded:
+        location = await redis_client.get(f'{settings.IP_LOCATION_REDIS_PREFIX}:{ip}')
+        if location:
+            country, region, city = location.split('|')
+            return IpInfo(ip=ip, country=country, region=region, city=city)
 
     location_info = None
-    if settings.IP_LOCATION_PARSE == 'online':
+    if settings.IP_LOCATION_PARSE == 'online' and not degraded:
         location_info = await get_location_online(ip)
-    elif settings.IP_LOCATION_PARSE == 'offline':
+    elif settings.IP_LOCATION_PARSE != 'false':
         location_info = get_location_offline(ip)
 
     if location_info:
         country = location_info.get('country')
         region = location_info.get('regionName')
         city = location_info.get('city')
+        if degraded:
+            return IpInfo(ip=ip, country=country, region=region, city=city)
         await redis_client.set(
             f'{settings.IP_LOCATION_REDIS_PREFIX}:{ip}',
             f'{country}|{region}|{city}',
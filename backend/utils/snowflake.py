@@ -10,7 +10,7 @@ from backend.common.dataclasses import SnowflakeInfo
 from backend.common.exception import errors
 from backend.common.log import log
 from backend.core.conf import settings
-from backend.database.redis import redis_client
+from backend.database.redis import redis_background_client
 from backend.utils.timezone import timezone
 
 
@@ -53,7 +53,7 @@ class SnowflakeNodeManager:
     async def acquire_node_id(self) -> tuple[int, int]:
         """从 Redis 获取可用的 datacenter_id 和 worker_id"""
         occupied_nodes = set()
-        async for key in redis_client.scan_iter(match=f'{self.node_redis_prefix}:*'):
+        async for key in redis_background_client.scan_iter(match=f'{self.node_redis_prefix}:*'):
             parts = key.split(':')
             if len(parts) >= 5:
                 try:
@@ -74,7 +74,7 @@ class SnowflakeNodeManager:
     async def _register(self, datacenter_id: int, worker_id: int) -> bool:
         key = f'{self.node_redis_prefix}:{datacenter_id}:{worker_id}'
         value = f'pid:{os.getpid()}-ts:{timezone.now().timestamp()}'
-        return await redis_client.set(key, value, nx=True, ex=settings.SNOWFLAKE_NODE_TTL_SECONDS)
+        return await redis_background_client.set(key, value, nx=True, ex=settings.SNOWFLAKE_NODE_TTL_SECONDS)
 
     async def start_heartbeat(self, datacenter_id: int, worker_id: int) -> None:
         """启动节点心跳"""
@@ -86,7 +86,7 @@ class SnowflakeNodeManager:
             while True:
                 await asyncio.sleep(settings.SNOWFLAKE_HEARTBEAT_INTERVAL_SECONDS)
                 try:
-                    await redis_client.expire(key, settings.SNOWFLAKE_NODE_TTL_SECONDS)
+                    await redis_background_client.expire(key, settings.SNOWFLAKE_NODE_TTL_SECONDS)
                     log.debug(f'雪花算法节点心跳任务开始：datacenter_id={datacenter_id}, worker_id={worker_id}')
                 except Exception as e:
                     log.error(f'雪花算法节点心跳任务失败：{e}')
@@ -104,7 +104,7 @@ class SnowflakeNodeManager:
 
         if self.datacenter_id is not None and self.worker_id is not None:
             key = f'{self.node_redis_prefix}:{self.datacenter_id}:{self.worker_id}'
-            await redis_client.delete(key)
+            await redis_background_client.delete(key)
 
 
 class Snowflake: